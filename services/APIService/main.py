@@ -29,6 +29,7 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
     Query,
+    Request,
 )
 from shared.api_types import (
     ServiceType,
@@ -36,16 +37,36 @@ from shared.api_types import (
     StatusUpdate,
     TranscriptionParams,
     RAGRequest,
+    RAGResponse,
+    RAGResult,
+    RetrievalBackend,
+    DeliveryMode,
+    DownloadURL,
+    HistoryView,
 )
 from shared.prompt_types import PromptTracker
+from shared.prompt_tracker import history_filename, load_segments as load_prompt_segments
+from shared.retrieval import (
+    load_index as load_retrieval_index,
+    delete_index as delete_retrieval_index,
+)
 from shared.podcast_types import SavedPodcast, SavedPodcastWithAudio, Conversation
 from shared.connection import ConnectionManager
-from shared.storage import StorageManager
+from shared.storage import (
+    StorageManager,
+    AsyncStorageManager,
+    STORAGE_CHUNK_SIZE,
+    PRESIGNED_URL_EXPIRY,
+)
+from shared.storage_backends import MINIO_PUBLIC_ENDPOINT, STORAGE_BACKEND
+from shared.job import JobStatusManager
+from shared.redis_pool import get_redis, get_async_redis, get_pubsub, pool_stats
+from shared.compression import ARTIFACT_COMPRESSION, accepts_encoding, decompress
 from shared.otel import OpenTelemetryInstrumentation, OpenTelemetryConfig
 from opentelemetry.trace.status import StatusCode
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from pydantic import ValidationError
-import redis
 import requests
 import httpx
 import ujson as json
@@ -54,7 +75,7 @@ import os
 import logging
 import time
 import asyncio
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Optional, Union, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -79,13 +100,27 @@ config = OpenTelemetryConfig(
 telemetry.initialize(config, app)
 
 # Initialize other services
-redis_client = redis.Redis.from_url(
-    os.getenv("REDIS_URL", "redis://redis:6379"), decode_responses=False
-)
+# Sync client for background tasks running in the threadpool, async client for endpoints.
+# Both share the process-wide pools configured from REDIS_* env vars.
+redis_client = get_redis()
+async_redis_client = get_async_redis()
 
 # Initialize the connection manager
-manager = ConnectionManager(redis_client=redis_client)
+manager = ConnectionManager(redis_client=async_redis_client)
 storage_manager = StorageManager(telemetry=telemetry)
+# Used from async endpoints so MinIO latency never blocks the event loop
+async_storage_manager = AsyncStorageManager(storage_manager)
+
+# Job managers used to read results written by each service
+job_managers = {
+    service: JobStatusManager(
+        service, telemetry=telemetry, storage_manager=storage_manager
+    )
+    for service in ServiceType
+}
+# Expire old jobs continuously instead of waiting for /cleanup
+for job_manager in job_managers.values():
+    job_manager.start_reaper()
 
 # Service URLs
 PDF_SERVICE_URL = os.getenv("PDF_SERVICE_URL", "http://localhost:8003")
@@ -95,9 +130,29 @@ TTS_SERVICE_URL = os.getenv("TTS_SERVICE_URL", "http://localhost:8889")
 # MP3 Cache TTL
 MP3_CACHE_TTL = 60 * 60 * 4  # 4 hours
 
+# Default delivery of audio/PDF downloads: "proxy" streams bytes through the API,
+# "url" returns a presigned storage URL and "redirect" sends a 307 to it
+DOWNLOAD_DELIVERY_MODE = DeliveryMode(os.getenv("DOWNLOAD_DELIVERY_MODE", "proxy"))
+if (
+    DOWNLOAD_DELIVERY_MODE != DeliveryMode.PROXY
+    and STORAGE_BACKEND == "minio"
+    and not MINIO_PUBLIC_ENDPOINT
+):
+    logger.warning(
+        f"DOWNLOAD_DELIVERY_MODE is {DOWNLOAD_DELIVERY_MODE.value} but "
+        "MINIO_PUBLIC_ENDPOINT is unset, so download URLs point at the internal "
+        "MinIO host, which clients may not reach"
+    )
+
+# Retrieval: "local" answers /query_vector_db from chunk indexes built by the PDF
+# Service, "nv-ingest" forwards queries to NV-Ingest
+RETRIEVAL_BACKEND = RetrievalBackend(os.getenv("RETRIEVAL_BACKEND", "local"))
+
 # NV-Ingest
 DEFAULT_TIMEOUT = 600  # seconds
 NV_INGEST_RETRIEVE_URL = "https://nv-ingest-rest-endpoint.brevlab.com/v1"
+# Created on first use and reused by every query
+nv_ingest_client: Optional[httpx.AsyncClient] = None
 
 # CORS setup
 CORS_ORIGINS = os.getenv(
@@ -164,7 +219,7 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
                 f"Getting initial status for {job_id} {service} with key {hget_key}"
             )
 
-            status_data = redis_client.hgetall(hget_key)
+            status_data = await async_redis_client.hgetall(hget_key)
             if status_data:
                 status_msg = {
                     "service": service.value,
@@ -215,20 +270,22 @@ def process_pdf_task(
     """
     with telemetry.tracer.start_as_current_span("api.process_pdf_task") as span:
         span.set_attribute("job_id", job_id)
+        pubsub = None
         try:
-            pubsub = redis_client.pubsub()
+            # Held for the whole job, so kept out of the shared command pool
+            pubsub = get_pubsub()
             pubsub.subscribe("status_updates:all")
 
-            # Store all original PDFs
-            for idx, (content, _) in enumerate(files_and_types):
-                storage_manager.store_file(
-                    transcription_params.userId,
-                    job_id,
-                    content,
-                    f"{job_id}_{idx}.pdf",
-                    "application/pdf",
-                    transcription_params,
-                )
+            # Store all original PDFs concurrently
+            storage_manager.store_many(
+                transcription_params.userId,
+                job_id,
+                [
+                    (f"{job_id}_{idx}.pdf", content, "application/pdf")
+                    for idx, (content, _) in enumerate(files_and_types)
+                ],
+                transcription_params,
+            )
             logger.info(
                 f"Stored {len(files_and_types)} original PDFs for {job_id} in storage"
             )
@@ -298,6 +355,7 @@ def process_pdf_task(
                                     f"{job_id}_agent_result.json",
                                     "application/json",
                                     transcription_params,
+                                    compression=ARTIFACT_COMPRESSION,
                                 )
                                 logger.info(
                                     f"Stored agent result for {job_id} in minio, size: {len(json.dumps(agent_result).encode())} bytes"
@@ -318,23 +376,23 @@ def process_pdf_task(
                                 logger.info(
                                     f"TTS completed for {job_id}, fetching and storing result"
                                 )
-                                audio_content = requests.get(
-                                    f"{TTS_SERVICE_URL}/output/{job_id}"
-                                ).content
-
-                                # Store in DB
-                                storage_manager.store_audio(
-                                    transcription_params.userId,
-                                    job_id,
-                                    audio_content,
-                                    f"{job_id}.mp3",
-                                    transcription_params,
-                                )
+                                # Stream the audio straight into storage
+                                with requests.get(
+                                    f"{TTS_SERVICE_URL}/output/{job_id}", stream=True
+                                ) as response:
+                                    response.raise_for_status()
+                                    size = storage_manager.store_audio(
+                                        transcription_params.userId,
+                                        job_id,
+                                        response.iter_content(STORAGE_CHUNK_SIZE),
+                                        f"{job_id}.mp3",
+                                        transcription_params,
+                                    )
 
                                 logger.info(
-                                    f"Stored TTS result for {job_id}, size: {len(audio_content)} bytes, with TTL: {MP3_CACHE_TTL} seconds"
+                                    f"Stored TTS result for {job_id}, size: {size} bytes, with TTL: {MP3_CACHE_TTL} seconds"
                                 )
-                                return audio_content
+                                return
 
                 time.sleep(0.01)
 
@@ -343,6 +401,9 @@ def process_pdf_task(
             span.record_exception(e)
             logger.error(f"Job {job_id} failed: {str(e)}")
             raise
+        finally:
+            if pubsub is not None:
+                pubsub.close()
 
 
 @app.post("/process_pdf", status_code=202)
@@ -450,7 +511,7 @@ async def get_status(job_id: str, userId: str = Query(..., description="KAS User
             hget_key = f"status:{job_id}:{str(service)}"
             logger.info(f"Getting status for {job_id} {service} with key {hget_key}")
 
-            status = redis_client.hgetall(hget_key)
+            status = await async_redis_client.hgetall(hget_key)
             if status:
                 span.set_attribute(
                     f"{service.value}.status", status.get(b"status", b"").decode()
@@ -464,17 +525,41 @@ async def get_status(job_id: str, userId: str = Query(..., description="KAS User
         return statuses
 
 
+def presigned_response(url: str, mode: DeliveryMode) -> Union[Response, DownloadURL]:
+    """
+    Deliver a presigned storage URL, either in the body or as a redirect.
+
+    Args:
+        url (str): Presigned GET URL
+        mode (DeliveryMode): DeliveryMode.URL or DeliveryMode.REDIRECT
+
+    Returns:
+        Union[Response, DownloadURL]: 307 redirect, or the URL and its lifetime
+    """
+    if mode == DeliveryMode.REDIRECT:
+        return RedirectResponse(url, status_code=307)
+    return DownloadURL(url=url, expires_in=PRESIGNED_URL_EXPIRY)
+
+
 @app.get("/output/{job_id}")
-async def get_output(job_id: str, userId: str = Query(..., description="KAS User ID")):
+async def get_output(
+    job_id: str,
+    userId: str = Query(..., description="KAS User ID"),
+    delivery: Optional[DeliveryMode] = Query(
+        None, description="proxy, url or redirect. Defaults to DOWNLOAD_DELIVERY_MODE"
+    ),
+):
     """
     Get the final TTS output for a completed job.
     
     Args:
         job_id (str): Job identifier to get output for
         userId (str): User identifier for authorization
+        delivery (Optional[DeliveryMode]): How to deliver the audio
         
     Returns:
-        Response: Audio file response with appropriate headers
+        Response: Audio file response with appropriate headers, or a presigned URL
+            (in the body or as a redirect) once the audio is in storage
         
     Raises:
         HTTPException: If result is not found or TTS not completed
@@ -486,49 +571,75 @@ async def get_output(job_id: str, userId: str = Query(..., description="KAS User
         tts_status_key = f"status:{job_id}:{str(ServiceType.TTS)}"
         span.set_attribute("tts_status_key", tts_status_key)
 
-        tts_status = redis_client.hgetall(tts_status_key)
+        tts_status = await async_redis_client.hgetall(tts_status_key)
         if not tts_status:
             raise HTTPException(status_code=404, detail="Result not found")
         if tts_status.get(b"status", b"").decode() != str(JobStatus.COMPLETED):
             span.set_attribute("tts_status", tts_status.get(b"status", b"").decode())
             raise HTTPException(status_code=404, detail="TTS not completed")
 
-        get_tts_result_key = f"result:{job_id}:{str(ServiceType.TTS)}"
-        span.set_attribute("get_tts_result_key", get_tts_result_key)
+        mode = delivery or DOWNLOAD_DELIVERY_MODE
+        span.set_attribute("delivery", mode.value)
+        if mode != DeliveryMode.PROXY:
+            # Audio is only presignable once process_pdf_task has stored it,
+            # until then fall back to proxying the TTS result
+            url = await async_storage_manager.presigned_url(
+                userId,
+                job_id,
+                f"{job_id}.mp3",
+                download_name=f"{job_id}.mp3",
+                content_type="audio/mpeg",
+            )
+            if url:
+                return presigned_response(url, mode)
+
+        # With a local storage backend the stored MP3 is sent straight from disk
+        path = await async_storage_manager.local_file(userId, job_id, f"{job_id}.mp3")
+        if path:
+            return FileResponse(
+                path, media_type="audio/mpeg", filename=f"{job_id}.mp3"
+            )
 
-        result = redis_client.get(get_tts_result_key)
-        if not result:
+        # Spilled results are streamed from storage rather than loaded into memory.
+        # Opening the stream does sync Redis and storage calls, so it runs off the loop.
+        result = await asyncio.to_thread(
+            job_managers[ServiceType.TTS].get_result_stream, job_id
+        )
+        if result is None:
             logger.info(f"Final result not found in cache for {job_id}. Checking DB...")
-            result = storage_manager.get_podcast_audio(userId, job_id)
-            if not result:
+            result = await async_storage_manager.open_podcast_audio(userId, job_id)
+            if result is None:
                 span.set_status(StatusCode.ERROR, "result not found")
                 raise HTTPException(status_code=404, detail="Result not found")
 
-        return Response(
-            content=result,
+        return StreamingResponse(
+            result,
             media_type="audio/mpeg",
             headers={"Content-Disposition": f"attachment; filename={job_id}.mp3"},
         )
 
 
 @app.post("/cleanup")
-async def cleanup_jobs():
+async def cleanup_jobs(
+    max_age: int = Query(0, description="Only remove jobs older than this many seconds", ge=0),
+):
     """
     Clean up old jobs across all services.
     
-    Removes job status and result data from Redis for all services.
+    Removes job status and result data from Redis for all services. Jobs are
+    looked up by creation time, so only expired jobs are touched.
+
+    Args:
+        max_age (int): Minimum age in seconds of the jobs to remove. Defaults to 0 (all jobs).
     
     Returns:
         dict: Number of jobs removed
     """
     removed = 0
-    for service in ServiceType:
-        pattern = f"status:*:{service}"
-        for key in redis_client.scan_iter(match=pattern):
-            job_id = key.split(b":")[1].decode()  # Handle bytes key
-            redis_client.delete(key)
-            redis_client.delete(f"result:{job_id}:{service}")
-            removed += 1
+    for job_manager in job_managers.values():
+        removed += await asyncio.to_thread(
+            job_manager.cleanup_old_jobs, max_age=max_age
+        )
     return {"message": f"Removed {removed} old jobs"}
 
 
@@ -554,7 +665,9 @@ async def get_saved_podcasts(
                 raise HTTPException(status_code=400, detail="userId cannot be empty")
 
             # Pass userId to filter results - storage manager handles the filtering
-            saved_files = storage_manager.list_files_metadata(user_id=userId)
+            saved_files = await async_storage_manager.list_files_metadata(
+                user_id=userId
+            )
             span.set_attribute("num_files", len(saved_files))
             span.set_attribute("user_id", userId)
 
@@ -600,7 +713,9 @@ async def get_saved_podcast_metadata(
             "api.saved_podcast.metadata"
         ) as span:
             span.set_attribute("job_id", job_id)
-            saved_files = storage_manager.list_files_metadata(user_id=userId)
+            saved_files = await async_storage_manager.list_files_metadata(
+                user_id=userId
+            )
             podcast_metadata = next(
                 (file for file in saved_files if file["job_id"] == job_id), None
             )
@@ -625,7 +740,11 @@ async def get_saved_podcast_metadata(
 
 @app.get("/saved_podcast/{job_id}/audio", response_model=SavedPodcastWithAudio)
 async def get_saved_podcast(
-    job_id: str, userId: str = Query(..., description="KAS User ID")
+    job_id: str,
+    userId: str = Query(..., description="KAS User ID"),
+    delivery: Optional[DeliveryMode] = Query(
+        None, description="proxy, url or redirect. Defaults to DOWNLOAD_DELIVERY_MODE"
+    ),
 ):
     """
     Get a specific saved podcast with its audio data.
@@ -633,9 +752,12 @@ async def get_saved_podcast(
     Args:
         job_id (str): Job identifier for the podcast
         userId (str): User identifier for authorization
+        delivery (Optional[DeliveryMode]): How to deliver the audio
         
     Returns:
-        SavedPodcastWithAudio: Podcast metadata and audio content
+        SavedPodcastWithAudio: Podcast metadata and audio content, or a presigned
+            audio_url instead of audio_data in url mode. Redirect mode responds with a
+            307 to the audio instead.
         
     Raises:
         HTTPException: If podcast not found or retrieval fails
@@ -643,8 +765,21 @@ async def get_saved_podcast(
     try:
         with telemetry.tracer.start_as_current_span("api.saved_podcast.audio") as span:
             span.set_attribute("job_id", job_id)
+            mode = delivery or DOWNLOAD_DELIVERY_MODE
+            span.set_attribute("delivery", mode.value)
+
+            # Fall back to inline audio when the storage backend can't presign URLs
+            if mode == DeliveryMode.REDIRECT:
+                url = await async_storage_manager.presigned_podcast_audio_url(
+                    userId, job_id
+                )
+                if url:
+                    return presigned_response(url, mode)
+
             # Get metadata first
-            saved_files = storage_manager.list_files_metadata(user_id=userId)
+            saved_files = await async_storage_manager.list_files_metadata(
+                user_id=userId
+            )
             podcast_metadata = next(
                 (file for file in saved_files if file["job_id"] == job_id), None
             )
@@ -654,9 +789,18 @@ async def get_saved_podcast(
                     status_code=404, detail=f"Podcast with job_id {job_id} not found"
                 )
 
-            # Get audio data
-            audio_data = storage_manager.get_podcast_audio(userId, job_id)
-            if not audio_data:
+            # Get audio data, or a link to it
+            audio_data = None
+            audio_url = None
+            if mode == DeliveryMode.URL:
+                audio_url = await async_storage_manager.presigned_podcast_audio_url(
+                    userId, job_id
+                )
+            if not audio_url:
+                audio_data = await async_storage_manager.get_podcast_audio(
+                    userId, job_id
+                )
+            if not audio_data and not audio_url:
                 raise HTTPException(
                     status_code=404, detail=f"Audio data for podcast {job_id} not found"
                 )
@@ -668,6 +812,7 @@ async def get_saved_podcast(
                 size=podcast_metadata["size"],
                 transcription_params=podcast_metadata.get("transcription_params", {}),
                 audio_data=audio_data,
+                audio_url=audio_url,
             )
 
     except HTTPException:
@@ -680,14 +825,42 @@ async def get_saved_podcast(
         )
 
 
+def precompressed_response(
+    request: Request, data: bytes, encoding: str
+) -> Optional[Response]:
+    """
+    Build a response serving stored compressed bytes as is, if the client accepts them.
+
+    Args:
+        request (Request): Incoming request
+        data (bytes): Compressed file content
+        encoding (str): Content encoding of the data
+
+    Returns:
+        Optional[Response]: JSON response with a Content-Encoding header, or None
+            if the client does not accept the encoding
+    """
+    if not accepts_encoding(request.headers.get("accept-encoding"), encoding):
+        return None
+    return Response(
+        content=data,
+        media_type="application/json",
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+    )
+
+
 @app.get("/saved_podcast/{job_id}/transcript", response_model=Conversation)
 async def get_saved_podcast_transcript(
-    job_id: str, userId: str = Query(..., description="KAS User ID")
+    request: Request, job_id: str, userId: str = Query(..., description="KAS User ID")
 ):
     """
     Get a specific saved podcast transcript.
+
+    Transcripts stored compressed are sent without decompression to clients that
+    accept the stored encoding.
     
     Args:
+        request (Request): Incoming request, used for content negotiation
         job_id (str): Job identifier for the podcast
         userId (str): User identifier for authorization
         
@@ -702,13 +875,23 @@ async def get_saved_podcast_transcript(
             span.set_attribute("job_id", job_id)
             filename = f"{job_id}_agent_result.json"
             span.set_attribute("filename", filename)
-            raw_data = storage_manager.get_file(userId, job_id, filename)
+            stored = await async_storage_manager.get_file_encoded(
+                userId, job_id, filename
+            )
 
-            if not raw_data:
+            if not stored:
                 raise HTTPException(
                     status_code=404, detail=f"Transcript for {job_id} not found"
                 )
 
+            raw_data, encoding = stored
+            if encoding:
+                passthrough = precompressed_response(request, raw_data, encoding)
+                if passthrough is not None:
+                    span.set_attribute("encoding", encoding)
+                    return passthrough
+                raw_data = decompress(raw_data, encoding)
+
             agent_result = json.loads(raw_data)
             return Conversation.model_validate(agent_result)
 
@@ -728,14 +911,26 @@ async def get_saved_podcast_transcript(
 
 @app.get("/saved_podcast/{job_id}/history")
 async def get_saved_podcast_agent_workflow(
-    job_id: str, userId: str = Query(..., description="KAS User ID")
+    request: Request,
+    job_id: str,
+    userId: str = Query(..., description="KAS User ID"),
+    view: HistoryView = Query(
+        HistoryView.EXPANDED,
+        description="expanded for full prompts, compact to send large fragments once",
+    ),
 ):
     """
     Get a specific saved podcast agent workflow history.
+
+    The compact view returns the history as stored, with large prompt fragments sent
+    once and referenced from prompts. Stored compressed, it is sent without
+    decompression to clients that accept the stored encoding.
     
     Args:
+        request (Request): Incoming request, used for content negotiation
         job_id (str): Job identifier for the podcast
         userId (str): User identifier for authorization
+        view (HistoryView): Whether prompts are expanded or compact
         
     Returns:
         PromptTracker: Agent workflow history data
@@ -746,18 +941,40 @@ async def get_saved_podcast_agent_workflow(
     with telemetry.tracer.start_as_current_span("api.saved_podcast.history") as span:
         try:
             span.set_attribute("job_id", job_id)
-            filename = f"{job_id}_prompt_tracker.json"
+            span.set_attribute("view", view.value)
+            filename = history_filename(job_id)
             span.set_attribute("filename", filename)
-            raw_data = storage_manager.get_file(userId, job_id, filename)
+            stored = await async_storage_manager.get_file_encoded(
+                userId, job_id, filename
+            )
 
-            if not raw_data:
-                span.set_status(StatusCode.ERROR, "not found")
-                raise HTTPException(
-                    status_code=404, detail=f"History for {job_id} not found"
+            if not stored:
+                # Jobs still running, or not yet compacted, only have log segments
+                history = await asyncio.to_thread(
+                    load_prompt_segments, storage_manager, userId, job_id
                 )
+                if history is None:
+                    span.set_status(StatusCode.ERROR, "not found")
+                    raise HTTPException(
+                        status_code=404, detail=f"History for {job_id} not found"
+                    )
+                span.set_attribute("compacted", False)
+                return history.expand() if view == HistoryView.EXPANDED else history
 
-            return PromptTracker.model_validate_json(raw_data)
+            raw_data, encoding = stored
+            if encoding and view == HistoryView.COMPACT:
+                passthrough = precompressed_response(request, raw_data, encoding)
+                if passthrough is not None:
+                    span.set_attribute("encoding", encoding)
+                    return passthrough
+            if encoding:
+                raw_data = decompress(raw_data, encoding)
 
+            history = PromptTracker.model_validate_json(raw_data)
+            return history.expand() if view == HistoryView.EXPANDED else history
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to get history for {job_id}: {str(e)}")
             span.set_status(StatusCode.ERROR, "failed to get history")
@@ -768,7 +985,11 @@ async def get_saved_podcast_agent_workflow(
 
 @app.get("/saved_podcast/{job_id}/pdf")
 async def get_saved_podcast_pdf(
-    job_id: str, userId: str = Query(..., description="KAS User ID")
+    job_id: str,
+    userId: str = Query(..., description="KAS User ID"),
+    delivery: Optional[DeliveryMode] = Query(
+        None, description="proxy, url or redirect. Defaults to DOWNLOAD_DELIVERY_MODE"
+    ),
 ):
     """
     Get the original PDF file for a specific podcast.
@@ -776,9 +997,11 @@ async def get_saved_podcast_pdf(
     Args:
         job_id (str): Job identifier for the podcast
         userId (str): User identifier for authorization
+        delivery (Optional[DeliveryMode]): How to deliver the PDF
         
     Returns:
-        Response: PDF file response with appropriate headers
+        StreamingResponse: PDF file response with appropriate headers, or a presigned
+            URL (in the body or as a redirect)
         
     Raises:
         HTTPException: If PDF not found or retrieval fails
@@ -788,20 +1011,46 @@ async def get_saved_podcast_pdf(
             span.set_attribute("job_id", job_id)
             filename = f"{job_id}.pdf"
             span.set_attribute("filename", filename)
-            pdf_data = storage_manager.get_file(userId, job_id, filename)
+            mode = delivery or DOWNLOAD_DELIVERY_MODE
+            span.set_attribute("delivery", mode.value)
 
-            if not pdf_data:
+            if mode != DeliveryMode.PROXY:
+                url = await async_storage_manager.presigned_url(
+                    userId,
+                    job_id,
+                    filename,
+                    download_name=f"{job_id}.pdf",
+                    content_type="application/pdf",
+                )
+                # Without a URL (missing PDF or no presigning) fall back to proxying
+                if url:
+                    return presigned_response(url, mode)
+
+            # With a local storage backend the PDF is sent straight from disk
+            path = await async_storage_manager.local_file(userId, job_id, filename)
+            if path:
+                return FileResponse(
+                    path, media_type="application/pdf", filename=f"{job_id}.pdf"
+                )
+
+            pdf_stream = await async_storage_manager.open_stream(
+                userId, job_id, filename
+            )
+
+            if pdf_stream is None:
                 span.set_status(StatusCode.ERROR, "not found")
                 raise HTTPException(
                     status_code=404, detail=f"PDF for podcast {job_id} not found"
                 )
 
-            return Response(
-                content=pdf_data,
+            return StreamingResponse(
+                pdf_stream,
                 media_type="application/pdf",
                 headers={"Content-Disposition": f"attachment; filename={job_id}.pdf"},
             )
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to get PDF for {job_id}: {str(e)}")
             span.set_status(StatusCode.ERROR, "failed to get PDF")
@@ -819,7 +1068,9 @@ async def delete_saved_podcast(
         try:
             span.set_attribute("job_id", job_id)
             # Convert generator to list before checking length
-            saved_files = list(storage_manager.list_files_metadata(user_id=userId))
+            saved_files = await async_storage_manager.list_files_metadata(
+                user_id=userId
+            )
             podcast_metadata = next(
                 (file for file in saved_files if file["job_id"] == job_id), None
             )
@@ -830,18 +1081,22 @@ async def delete_saved_podcast(
                     status_code=404, detail=f"Podcast with job_id {job_id} not found"
                 )
 
-            success = storage_manager.delete_job_files(userId, job_id)
+            success = await async_storage_manager.delete_job_files(userId, job_id)
 
             if not success:
                 raise HTTPException(
                     status_code=500, detail=f"Failed to delete podcast {job_id}"
                 )
 
+            if not await asyncio.to_thread(
+                delete_retrieval_index, storage_manager, job_id
+            ):
+                logger.warning(f"Failed to delete retrieval index of {job_id}")
+
             # Also clean up any Redis entries
-            for service in ServiceType:
-                redis_client.delete(f"status:{job_id}:{service}")
-                redis_client.delete(f"result:{job_id}:{service}")
-            redis_client.delete(f"final_status:{job_id}")
+            for job_manager in job_managers.values():
+                await asyncio.to_thread(job_manager.delete_job, job_id)
+            await async_redis_client.delete(f"final_status:{job_id}")
 
             return {"message": f"Successfully deleted podcast {job_id}"}
 
@@ -855,40 +1110,86 @@ async def delete_saved_podcast(
             )
 
 
+async def query_nv_ingest(payload: RAGRequest, span) -> dict:
+    """Retrieve the top k results of a query from NV-Ingest"""
+    global nv_ingest_client
+    if nv_ingest_client is None:
+        nv_ingest_client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT)
+    try:
+        response = await nv_ingest_client.post(
+            f"{NV_INGEST_RETRIEVE_URL}/query",
+            json={
+                "query": payload.query,
+                "k": payload.k,
+                "job_id": payload.job_id,
+            },
+        )
+        if response.status_code != 200:
+            span.set_status(StatusCode.ERROR, "failed to retrieve from NV-Ingest")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"NV-Ingest error: {response.text}",
+            )
+        return response.json()
+    except HTTPException:
+        raise
+    except Exception as e:
+        span.set_status(StatusCode.ERROR, "failed to retrieve from NV-Ingest")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve from NV-Ingest: {str(e)}",
+        )
+
+
 @app.post("/query_vector_db")
 async def query_vector_db(
     payload: RAGRequest,
 ):
-    """RAG endpoint that interfaces with NV-Ingest to retrieve top k results"""
+    """RAG endpoint that retrieves the top k passages of a job's PDFs.
+
+    By default results come from the chunk index the PDF Service built for the job,
+    kept in memory after first use. Set RETRIEVAL_BACKEND=nv-ingest to query
+    NV-Ingest instead.
+    """
     with telemetry.tracer.start_as_current_span("api.query_vector_db") as span:
         span.set_attribute("job_id", payload.job_id)
         span.set_attribute("k", payload.k)
+        span.set_attribute("backend", RETRIEVAL_BACKEND.value)
 
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            try:
-                response = await client.post(
-                    f"{NV_INGEST_RETRIEVE_URL}/query",
-                    json={
-                        "query": payload.query,
-                        "k": payload.k,
-                        "job_id": payload.job_id,
-                    },
-                )
-                if response.status_code != 200:
-                    span.set_status(
-                        StatusCode.ERROR, "failed to retrieve from NV-Ingest"
-                    )
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"NV-Ingest error: {response.text}",
-                    )
-                return response.json()
-            except Exception as e:
-                span.set_status(StatusCode.ERROR, "failed to retrieve from NV-Ingest")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to retrieve from NV-Ingest: {str(e)}",
+        if RETRIEVAL_BACKEND == RetrievalBackend.NV_INGEST:
+            return await query_nv_ingest(payload, span)
+
+        try:
+            index = await asyncio.to_thread(
+                load_retrieval_index, storage_manager, payload.job_id
+            )
+        except Exception as e:
+            span.set_status(StatusCode.ERROR, "failed to load retrieval index")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to load retrieval index: {str(e)}"
+            )
+        if index is None:
+            span.set_status(StatusCode.ERROR, "retrieval index not found")
+            raise HTTPException(
+                status_code=404,
+                detail=f"No retrieval index found for job {payload.job_id}",
+            )
+
+        matches = index.search_scored(payload.query, payload.k)
+        span.set_attribute("results", len(matches))
+        return RAGResponse(
+            job_id=payload.job_id,
+            query=payload.query,
+            results=[
+                RAGResult(
+                    text=chunk.text,
+                    source=chunk.source,
+                    position=chunk.position,
+                    score=score,
                 )
+                for chunk, score in matches
+            ],
+        )
 
 
 @app.get("/health")
@@ -900,11 +1201,19 @@ async def health():
             with telemetry.tracer.start_as_current_span(
                 "api.redis_check"
             ) as redis_span:
-                redis_alive = redis_client.ping()
+                redis_alive = await async_redis_client.ping()
                 redis_span.set_attribute(
                     "redis.status", "up" if redis_alive else "down"
                 )
                 logger.info(f"Redis status: {'up' if redis_alive else 'down'}")
+                redis_pools = pool_stats()
+                for pool_name, stats in redis_pools.items():
+                    redis_span.set_attribute(
+                        f"redis.pool.{pool_name}.in_use", stats["in_use"]
+                    )
+                    redis_span.set_attribute(
+                        f"redis.pool.{pool_name}.utilization", stats["utilization"]
+                    )
 
             # Check dependent services
             services = {
@@ -947,6 +1256,8 @@ async def health():
             return {
                 "status": "healthy" if all_healthy else "unhealthy",
                 "redis": "up" if redis_alive else "down",
+                "redis_pools": redis_pools,
+                "storage_cache": storage_manager.cache_stats(),
                 "services": service_status,
                 "timestamp": time.time(),
             }
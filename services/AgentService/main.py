@@ -10,17 +10,9 @@ from shared.api_types import (
     ServiceType,
     JobStatus,
 )
-from shared.podcast_types import Conversation, PodcastOutline
+from shared.podcast_types import Conversation
 from shared.api_types import TranscriptionRequest
-from podcast_flow import (
-    podcast_summarize_pdfs,
-    podcast_generate_raw_outline,
-    podcast_generate_structured_outline,
-    podcast_process_segments,
-    podcast_generate_dialogue,
-    podcast_combine_dialogues,
-    podcast_create_final_conversation,
-)
+from podcast_flow import podcast_generate_conversation
 from monologue_flow import (
     monologue_summarize_pdfs,
     monologue_generate_raw_outline,
@@ -28,14 +20,20 @@ from monologue_flow import (
     monologue_create_final_conversation,
 )
 from shared.storage import StorageManager
-from shared.llmmanager import LLMManager
+from shared.compression import ARTIFACT_COMPRESSION
+from shared.llmmanager import get_llm_manager
+from shared.concurrency import limiter_stats, register_limiter_metrics
+from shared.balancer import balancer_stats
 from shared.job import JobStatusManager
 from shared.otel import OpenTelemetryInstrumentation, OpenTelemetryConfig
 from opentelemetry.trace.status import StatusCode
 import ujson as json
 import os
 import logging
+import asyncio
 from shared.prompt_tracker import PromptTracker
+from shared.llm_usage import JobUsageTracker
+from shared.dag import TaskGraph, GraphTiming
 
 
 # Configure logging
@@ -52,12 +50,32 @@ config = OpenTelemetryConfig(
     otlp_endpoint=os.getenv("OTLP_ENDPOINT", "http://jaeger:4317"),
     enable_redis=True,
     enable_requests=True,
+    metrics_endpoint=os.getenv("OTLP_METRICS_ENDPOINT"),
 )
 telemetry.initialize(config, app)
+register_limiter_metrics(telemetry.meter)
 
 # Initialize managers
-job_manager = JobStatusManager(ServiceType.AGENT, telemetry=telemetry)
 storage_manager = StorageManager(telemetry=telemetry)
+job_manager = JobStatusManager(
+    ServiceType.AGENT, telemetry=telemetry, storage_manager=storage_manager
+)
+
+
+def save_pipeline_timing(job_id: str, user_id: str, timing: GraphTiming):
+    """Store the task timings and critical path of a job next to its other artifacts."""
+    storage_manager.store_file(
+        user_id,
+        job_id,
+        timing.model_dump_json().encode(),
+        f"{job_id}_pipeline_timing.json",
+        "application/json",
+        compression=ARTIFACT_COMPRESSION,
+    )
+    logger.info(
+        f"Critical path of {job_id} ({timing.critical_path_time:.1f}s of "
+        f"{timing.total:.1f}s): {' -> '.join(timing.critical_path)}"
+    )
 
 
 async def process_transcription(job_id: str, request: TranscriptionRequest):
@@ -80,9 +98,13 @@ async def process_transcription(job_id: str, request: TranscriptionRequest):
         Exception: If any step in the process fails, with error details in job status
     """
     with telemetry.tracer.start_as_current_span("agent.process_transcription") as span:
+        prompt_tracker = None
+        graph = None
+        job_usage = JobUsageTracker(job_id, request.userId, storage_manager)
+        job_usage_token = job_usage.start()
         try:
-            # Initialize LLM manager and prompt tracker
-            llm_manager = LLMManager(
+            # Get the shared LLM manager and a prompt tracker for this job
+            llm_manager = get_llm_manager(
                 api_key=os.getenv("NVIDIA_API_KEY"),
                 telemetry=telemetry,
                 config_path=os.getenv("MODEL_CONFIG_PATH"),
@@ -133,94 +155,34 @@ async def process_transcription(job_id: str, request: TranscriptionRequest):
 
                 # Store result
                 job_manager.set_result_with_expiration(
-                    job_id, final_conversation.model_dump_json().encode(), ex=120
+                    job_id,
+                    final_conversation.model_dump_json().encode(),
+                    ex=120,
+                    compression=ARTIFACT_COMPRESSION,
                 )
                 job_manager.update_status(
                     job_id, JobStatus.COMPLETED, "Transcription completed successfully"
                 )
 
             else:
-                # Summarize PDFs
-                summarized_pdfs = await podcast_summarize_pdfs(
-                    request.pdf_metadata,
-                    job_id,
-                    llm_manager,
-                    prompt_tracker,
-                    job_manager,
-                    logger,
-                )
-
-                # Generate initial outline
-                raw_outline = await podcast_generate_raw_outline(
-                    summarized_pdfs,
-                    request,
-                    llm_manager,
-                    prompt_tracker,
-                    job_id,
-                    job_manager,
-                    logger,
-                )
-
-                # Convert outline to structured format
-                outline: PodcastOutline = await podcast_generate_structured_outline(
-                    raw_outline,
-                    request,
-                    llm_manager,
-                    prompt_tracker,
-                    job_id,
-                    job_manager,
-                    logger,
-                )
-
-                # Process segments in parallel
-                segments = await podcast_process_segments(
-                    outline,
-                    request,
-                    llm_manager,
-                    prompt_tracker,
-                    job_id,
-                    job_manager,
-                    logger,
-                )
-
-                # Generate dialogues from segments in parallel
-                segment_dialogues = await podcast_generate_dialogue(
-                    segments,
-                    outline,
+                # Run the flow as a task graph, so each step starts as soon as
+                # the steps it needs are done instead of at stage barriers
+                graph = TaskGraph("agent.podcast", telemetry)
+                final_conversation: Conversation = await podcast_generate_conversation(
                     request,
                     llm_manager,
                     prompt_tracker,
                     job_id,
                     job_manager,
                     logger,
-                )
-
-                # Combine transcripts iteratively
-                combined_dialogues = await podcast_combine_dialogues(
-                    segment_dialogues,
-                    outline,
-                    llm_manager,
-                    prompt_tracker,
-                    job_id,
-                    job_manager,
-                    logger,
-                )
-
-                # Create final conversation by formatting as JSON
-                final_conversation: Conversation = (
-                    await podcast_create_final_conversation(
-                        combined_dialogues,
-                        request,
-                        llm_manager,
-                        prompt_tracker,
-                        job_id,
-                        job_manager,
-                        logger,
-                    )
+                    graph,
                 )
                 # Store result
                 job_manager.set_result_with_expiration(
-                    job_id, final_conversation.model_dump_json().encode(), ex=120
+                    job_id,
+                    final_conversation.model_dump_json().encode(),
+                    ex=120,
+                    compression=ARTIFACT_COMPRESSION,
                 )
                 job_manager.update_status(
                     job_id, JobStatus.COMPLETED, "Transcription completed successfully"
@@ -232,6 +194,29 @@ async def process_transcription(job_id: str, request: TranscriptionRequest):
             logger.error(f"Error processing job {job_id}: {str(e)}")
             job_manager.update_status(job_id, JobStatus.FAILED, str(e))
             raise
+        finally:
+            job_usage.stop(job_usage_token)
+            # Flush remaining prompt history and compact it into one file
+            if prompt_tracker is not None:
+                try:
+                    await asyncio.to_thread(prompt_tracker.close)
+                except Exception as e:
+                    logger.error(f"Failed to close prompt tracker for {job_id}: {e}")
+            try:
+                await asyncio.to_thread(job_usage.save)
+            except Exception as e:
+                logger.error(f"Failed to save token usage for {job_id}: {e}")
+            if graph is not None:
+                timing = graph.timing()
+                span.set_attribute("critical_path", timing.critical_path)
+                span.set_attribute("critical_path_time", timing.critical_path_time)
+                span.set_attribute("pipeline_time", timing.total)
+                try:
+                    await asyncio.to_thread(
+                        save_pipeline_timing, job_id, request.userId, timing
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to save pipeline timing for {job_id}: {e}")
 
 
 # API Endpoints
@@ -311,10 +296,12 @@ def health():
     Simple health check endpoint.
 
     Returns:
-        dict: Service health status
+        dict: Service health status, LLM endpoint concurrency and health
     """
     return {
         "status": "healthy",
+        "llm_concurrency": limiter_stats(),
+        "llm_endpoints": balancer_stats(),
     }
 
 
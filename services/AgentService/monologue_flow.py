@@ -15,10 +15,28 @@ import ujson as json  # Fast JSON processing
 import logging  # Logging utilities
 from shared.prompt_tracker import PromptTracker  # Tracks prompts sent to LLM
 from monologue_prompts import FinancialSummaryPrompts  # Prompt templates
+from summarizer import (  # Oversized documents
+    CACHED_MAP_REDUCE_PROMPT,
+    map_reduce_summarize,
+    needs_map_reduce,
+    summary_prompt_version,
+)
+from shared.summary_cache import get_summary_cache  # Summaries shared across jobs
+from transcript_parser import (  # Local JSON formatting
+    LOCAL_PARSER_MODEL,
+    try_parse_transcript,
+)
 from langchain_core.messages import AIMessage  # LLM message type
 import asyncio  # Async functionality
 
 
+# Version of the summary prompts in summary cache keys
+SUMMARY_PROMPT_VERSION = summary_prompt_version(
+    FinancialSummaryPrompts().monologue_summary_prompt,
+    FinancialSummaryPrompts().monologue_summary_reduce_prompt,
+)
+
+
 async def monologue_summarize_pdf(
     pdf_metadata: PDFMetadata, llm_manager: LLMManager, prompt_tracker: PromptTracker
 ) -> AIMessage:
@@ -34,22 +52,54 @@ async def monologue_summarize_pdf(
         AIMessage: The LLM's summary response
 
     The function uses a template to generate a summary prompt and tracks both the
-    prompt and response for monitoring purposes.
+    prompt and response for monitoring purposes. Documents over SUMMARY_TOKEN_BUDGET
+    are summarized in chunks whose summaries are then merged. Summaries are shared
+    through the summary cache, so concurrent jobs on the same document make one call
+    and later jobs reuse it.
     """
     template = FinancialSummaryPrompts.get_template("monologue_summary_prompt")
-    prompt = template.render(text=pdf_metadata.markdown)
-
-    summary_response: AIMessage = await llm_manager.query_async(
-        "reasoning",
-        [{"role": "user", "content": prompt}],
-        f"summarize_{pdf_metadata.filename}",
+    step_name = f"summarize_{pdf_metadata.filename}"
+    model = llm_manager.model_configs["reasoning"].name
+    map_reduce = needs_map_reduce(pdf_metadata.markdown)
+    # Only documents within the budget are sent as a single prompt; map-reduce tracks
+    # its own prompts and only needs a stand-in for cache hits
+    prompt = (
+        CACHED_MAP_REDUCE_PROMPT
+        if map_reduce
+        else template.render(text=pdf_metadata.markdown)
     )
-    prompt_tracker.track(
-        f"summarize_{pdf_metadata.filename}",
-        prompt,
-        llm_manager.model_configs["reasoning"].name,
+
+    async def generate() -> str:
+        if map_reduce:
+            summary_response = await map_reduce_summarize(
+                pdf_metadata.markdown,
+                step_name,
+                template,
+                FinancialSummaryPrompts.get_template("monologue_summary_reduce_prompt"),
+                llm_manager,
+                prompt_tracker,
+            )
+            return summary_response.content
+
+        summary_response: AIMessage = await llm_manager.query_async(
+            "reasoning",
+            [{"role": "user", "content": prompt}],
+            step_name,
+        )
+        prompt_tracker.track(
+            step_name,
+            prompt,
+            model,
+            fragments=[pdf_metadata.markdown],
+        )
+        return summary_response.content
+
+    summary, created = await get_summary_cache().get_or_create(
+        pdf_metadata.markdown, SUMMARY_PROMPT_VERSION, model, generate
     )
-    return summary_response
+    if not created:
+        prompt_tracker.track(step_name, prompt, model, fragments=[pdf_metadata.markdown])
+    return AIMessage(content=summary)
 
 
 async def monologue_summarize_pdfs(
@@ -227,12 +277,24 @@ async def monologue_create_final_conversation(
         Conversation: Structured conversation object
 
     Formats the monologue into a JSON structure that matches the Conversation
-    schema, handling proper text escaping and validation.
+    schema, handling proper text escaping and validation. The monologue is parsed
+    locally where possible, and only formatted by the LLM otherwise.
     """
     job_manager.update_status(
         job_id, JobStatus.PROCESSING, "Formatting final conversation"
     )
 
+    conversation = try_parse_transcript(monologue, [request.speaker_1_name])
+    if conversation is not None:
+        # Record the step the parser stood in for, so the tracked prompts stay complete
+        prompt_tracker.track(
+            "create_final_conversation",
+            monologue,
+            LOCAL_PARSER_MODEL,
+            conversation.model_dump_json(),
+        )
+        return conversation
+
     schema = Conversation.model_json_schema()
     template = FinancialSummaryPrompts.get_template("monologue_dialogue_prompt")
     prompt = template.render(
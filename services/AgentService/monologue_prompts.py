@@ -49,6 +49,24 @@ Condense the information into metrics easily digestible on a audiobook format wi
 You are presenting to the board of directors. Speak in a way that is engaging and informative, but not too technical and speak in the first person.
 """
 
+# Template for merging analyses of consecutive sections of one oversized document
+MONOLOGUE_SUMMARY_REDUCE_PROMPT_STR = """
+You are a knowledgeable analyst. The following are analyses of consecutive sections of a single document, in document order. Combine them into one targeted analysis of the whole document.
+
+{% for summary in summaries %}
+<section_analysis index="{{ loop.index }}">
+{{ summary }}
+</section_analysis>
+{% endfor %}
+
+Requirements for the combined analysis:
+1. Keep the key metrics, trends, projections and strategic insights; merge repeated points instead of listing them twice
+2. Keep the document type, entities, time period and stakeholders
+3. Preserve exact values, dates and terminology, with numbers, currency and percentages in spoken word form
+
+Format the analysis using markdown with clear headers and bullet points. Focus on the company's growth areas and trends.
+"""
+
 # Template for synthesizing multiple document summaries into an outline
 MONOLOGUE_MULTI_DOC_SYNTHESIS_PROMPT_STR = """
 Create a structured monologue outline synthesizing the following document summaries. The monologue should be 30-45 seconds long.
@@ -175,6 +193,7 @@ Please output the JSON following the provided schema, maintaining all financial
 # Dictionary mapping template names to their content
 PROMPT_TEMPLATES = {
     "monologue_summary_prompt": MONOLOGUE_SUMMARY_PROMPT_STR,
+    "monologue_summary_reduce_prompt": MONOLOGUE_SUMMARY_REDUCE_PROMPT_STR,
     "monologue_multi_doc_synthesis_prompt": MONOLOGUE_MULTI_DOC_SYNTHESIS_PROMPT_STR,
     "monologue_transcript_prompt": MONOLOGUE_TRANSCRIPT_PROMPT_STR,
     "monologue_dialogue_prompt": MONOLOGUE_DIALOGUE_PROMPT_STR,
@@ -10,13 +10,33 @@ from shared.podcast_types import Conversation, PodcastOutline
 from shared.api_types import JobStatus, TranscriptionRequest
 from shared.llmmanager import LLMManager
 from shared.job import JobStatusManager
-from typing import List, Dict, Any, Coroutine
+from typing import List, Dict, Any, Coroutine, Optional
 import ujson as json
 import logging
 from shared.prompt_tracker import PromptTracker
 from podcast_prompts import PodcastPrompts
+from summarizer import (
+    CACHED_MAP_REDUCE_PROMPT,
+    map_reduce_summarize,
+    needs_map_reduce,
+    summary_prompt_version,
+)
+from shared.summary_cache import get_summary_cache
+from shared.retrieval import ChunkIndex, RETRIEVAL_CHUNK_TOKENS, RETRIEVAL_TOP_K
+from shared.tokens import estimate_tokens
+from shared.dag import TaskGraph
+from structurer import needs_chunking, structure_in_chunks
+from transcript_parser import LOCAL_PARSER_MODEL, try_parse_transcript
 from langchain_core.messages import AIMessage
 import asyncio
+from functools import partial
+
+
+# Version of the summary prompts in summary cache keys
+SUMMARY_PROMPT_VERSION = summary_prompt_version(
+    PodcastPrompts().podcast_summary_prompt,
+    PodcastPrompts().podcast_summary_reduce_prompt,
+)
 
 
 async def podcast_summarize_pdf(
@@ -34,22 +54,56 @@ async def podcast_summarize_pdf(
         AIMessage: The LLM's summary response
 
     The function uses a template to generate a summary prompt and tracks both the
-    prompt and response for monitoring purposes.
+    prompt and response for monitoring purposes. Documents over SUMMARY_TOKEN_BUDGET
+    are summarized in chunks whose summaries are then merged. Summaries are shared
+    through the summary cache, so concurrent jobs on the same document make one call
+    and later jobs reuse it.
     """
     template = PodcastPrompts.get_template("podcast_summary_prompt")
-    prompt = template.render(text=pdf_metadata.markdown)
-
-    summary_response: AIMessage = await llm_manager.query_async(
-        "reasoning",
-        [{"role": "user", "content": prompt}],
-        f"summarize_{pdf_metadata.filename}",
+    step_name = f"summarize_{pdf_metadata.filename}"
+    model = llm_manager.model_configs["reasoning"].name
+    map_reduce = needs_map_reduce(pdf_metadata.markdown)
+    # Only documents within the budget are sent as a single prompt; map-reduce tracks
+    # its own prompts and only needs a stand-in for cache hits
+    prompt = (
+        CACHED_MAP_REDUCE_PROMPT
+        if map_reduce
+        else template.render(text=pdf_metadata.markdown)
     )
-    prompt_tracker.track(
-        f"summarize_{pdf_metadata.filename}",
-        prompt,
-        llm_manager.model_configs["reasoning"].name,
+
+    async def generate() -> str:
+        if map_reduce:
+            summary_response = await map_reduce_summarize(
+                pdf_metadata.markdown,
+                step_name,
+                template,
+                PodcastPrompts.get_template("podcast_summary_reduce_prompt"),
+                llm_manager,
+                prompt_tracker,
+            )
+            return summary_response.content
+
+        summary_response: AIMessage = await llm_manager.query_async(
+            "reasoning",
+            [{"role": "user", "content": prompt}],
+            step_name,
+        )
+        prompt_tracker.track(
+            step_name,
+            prompt,
+            model,
+            fragments=[pdf_metadata.markdown],
+        )
+        return summary_response.content
+
+    summary, created = await get_summary_cache().get_or_create(
+        pdf_metadata.markdown, SUMMARY_PROMPT_VERSION, model, generate
     )
-    return summary_response
+    if not created:
+        prompt_tracker.track(
+            step_name, prompt, model, fragments=[pdf_metadata.markdown]
+        )
+    return AIMessage(content=summary)
 
 
 async def podcast_summarize_pdfs(
@@ -226,6 +280,7 @@ async def podcast_process_segment(
     request: TranscriptionRequest,
     llm_manager: LLMManager,
     prompt_tracker: PromptTracker,
+    reference_index: Optional[ChunkIndex] = None,
 ) -> tuple[str, str]:
     """
     Process a single outline segment to generate initial content.
@@ -236,12 +291,16 @@ async def podcast_process_segment(
         request (TranscriptionRequest): Original transcription request
         llm_manager (LLMManager): Manager for LLM interactions
         prompt_tracker (PromptTracker): Tracks prompts and responses
+        reference_index (Optional[ChunkIndex]): Chunk index over the request's PDFs
 
     Returns:
         tuple[str, str]: Tuple of (segment_id, generated_content)
 
     Generates initial content for a segment, incorporating referenced PDF content
     if available. Uses different templates based on whether references exist.
+    When the referenced PDFs are larger than RETRIEVAL_TOP_K chunks and an index
+    is given, only the chunks most relevant to the segment's topics and points are
+    included instead of the whole documents.
     """
     # Get reference content if it exists
     text_content = []
@@ -254,6 +313,23 @@ async def podcast_process_segment(
             if pdf:
                 text_content.append(pdf.markdown)
 
+    if (
+        reference_index is not None
+        and sum(estimate_tokens(text) for text in text_content)
+        > RETRIEVAL_TOP_K * RETRIEVAL_CHUNK_TOKENS
+    ):
+        query = "\n".join(
+            [segment.section]
+            + [topic.title for topic in segment.topics]
+            + [point.description for topic in segment.topics for point in topic.points]
+        )
+        chunks = reference_index.search(query, sources=segment.references)
+        # Without any match, fall back to the whole documents
+        if chunks:
+            text_content = [
+                f"Excerpt from {chunk.source}:\n{chunk.text}" for chunk in chunks
+            ]
+
     # Choose template based on whether we have references
     template_name = (
         "podcast_prompt_with_references"
@@ -286,11 +362,36 @@ async def podcast_process_segment(
         prompt,
         llm_manager.model_configs["iteration"].name,
         response.content,
+        fragments=text_content,
     )
 
     return f"segment_transcript_{idx}", response.content
 
 
+async def podcast_build_reference_index(
+    request: TranscriptionRequest,
+) -> Optional[ChunkIndex]:
+    """
+    Build the chunk index that segment prompts take reference excerpts from.
+
+    Args:
+        request (TranscriptionRequest): Original transcription request
+
+    Returns:
+        Optional[ChunkIndex]: Index over the request's PDFs, None if they all fit
+            in the retrieval budget together and would be included whole anyway
+
+    The index is built in a worker thread to keep the event loop free.
+    """
+    total_tokens = sum(estimate_tokens(pdf.markdown) for pdf in request.pdf_metadata)
+    if total_tokens <= RETRIEVAL_TOP_K * RETRIEVAL_CHUNK_TOKENS:
+        return None
+    return await asyncio.to_thread(
+        ChunkIndex.build,
+        [(pdf.filename, pdf.markdown) for pdf in request.pdf_metadata],
+    )
+
+
 async def podcast_process_segments(
     outline: PodcastOutline,
     request: TranscriptionRequest,
@@ -316,8 +417,13 @@ async def podcast_process_segments(
         Dict[str, str]: Dictionary mapping segment IDs to their generated content
 
     Creates tasks for processing each segment and executes them in parallel using
-    asyncio.gather.
+    asyncio.gather. Segments with references share one chunk index over the PDFs,
+    built off the event loop.
     """
+    reference_index = None
+    if any(segment.references for segment in outline.segments):
+        reference_index = await podcast_build_reference_index(request)
+
     # Create tasks for processing each segment
     segment_tasks: List[Coroutine] = []
     for idx, segment in enumerate(outline.segments):
@@ -333,6 +439,7 @@ async def podcast_process_segments(
             request,
             llm_manager,
             prompt_tracker,
+            reference_index,
         )
         segment_tasks.append(task)
 
@@ -472,6 +579,58 @@ async def podcast_generate_dialogue(
     return list(dialogues)
 
 
+async def podcast_combine_dialogue_step(
+    current_dialogue: str,
+    segment_dialogue: Dict[str, str],
+    idx: int,
+    outline: PodcastOutline,
+    llm_manager: LLMManager,
+    prompt_tracker: PromptTracker,
+) -> str:
+    """
+    Merge the dialogue of one segment into the dialogue combined so far.
+
+    Args:
+        current_dialogue (str): Dialogue of the segments before this one
+        segment_dialogue (Dict[str, str]): Section name and dialogue of the segment
+        idx (int): Index of the segment
+        outline (PodcastOutline): Structured outline
+        llm_manager (LLMManager): Manager for LLM interactions
+        prompt_tracker (PromptTracker): Tracks prompts and responses
+
+    Returns:
+        str: Combined dialogue up to and including this segment
+    """
+    next_section = segment_dialogue["dialogue"]
+    prompt_tracker.update_result(f"segment_dialogue_{idx}", next_section)
+    current_section = segment_dialogue["section"]
+
+    template = PodcastPrompts.get_template("podcast_combine_dialogues_prompt")
+    outline_json = outline.model_dump_json()
+    prompt = template.render(
+        outline=outline_json,
+        dialogue_transcript=current_dialogue,
+        next_section=next_section,
+        current_section=current_section,
+    )
+
+    combined: AIMessage = await llm_manager.query_async(
+        "iteration",
+        [{"role": "user", "content": prompt}],
+        f"combine_dialogues_{idx}",
+    )
+
+    prompt_tracker.track(
+        f"combine_dialogues_{idx}",
+        prompt,
+        llm_manager.model_configs["iteration"].name,
+        combined.content,
+        fragments=[outline_json],
+    )
+
+    return combined.content
+
+
 async def podcast_combine_dialogues(
     segment_dialogues: List[Dict[str, str]],
     outline: PodcastOutline,
@@ -516,34 +675,15 @@ async def podcast_combine_dialogues(
             JobStatus.PROCESSING,
             f"Combining segment {idx + 1}/{len(segment_dialogues)} with existing dialogue",
         )
-
-        next_section = segment_dialogues[idx]["dialogue"]
-        prompt_tracker.update_result(f"segment_dialogue_{idx}", next_section)
-        current_section = segment_dialogues[idx]["section"]
-
-        template = PodcastPrompts.get_template("podcast_combine_dialogues_prompt")
-        prompt = template.render(
-            outline=outline.model_dump_json(),
-            dialogue_transcript=current_dialogue,
-            next_section=next_section,
-            current_section=current_section,
-        )
-
-        combined: AIMessage = await llm_manager.query_async(
-            "iteration",
-            [{"role": "user", "content": prompt}],
-            f"combine_dialogues_{idx}",
-        )
-
-        prompt_tracker.track(
-            f"combine_dialogues_{idx}",
-            prompt,
-            llm_manager.model_configs["iteration"].name,
-            combined.content,
+        current_dialogue = await podcast_combine_dialogue_step(
+            current_dialogue,
+            segment_dialogues[idx],
+            idx,
+            outline,
+            llm_manager,
+            prompt_tracker,
         )
 
-        current_dialogue = combined.content
-
     return current_dialogue
 
 
@@ -572,12 +712,41 @@ async def podcast_create_final_conversation(
         Conversation: Structured conversation following the Conversation schema
 
     Formats the dialogue into a structured conversation format with proper speaker
-    attribution and timing information.
+    attribution and timing information. Dialogues are parsed locally where possible;
+    otherwise the LLM formats them, long ones in chunks of speaker turns, concurrently.
     """
     job_manager.update_status(
         job_id, JobStatus.PROCESSING, "Formatting final conversation"
     )
 
+    conversation = try_parse_transcript(
+        dialogue, [request.speaker_1_name, request.speaker_2_name]
+    )
+    if conversation is not None:
+        # Record the step the parser stood in for, so the tracked prompts stay complete
+        prompt_tracker.track(
+            "create_final_conversation",
+            dialogue,
+            LOCAL_PARSER_MODEL,
+            conversation.model_dump_json(),
+        )
+        return conversation
+
+    if needs_chunking(dialogue):
+        return await structure_in_chunks(
+            dialogue,
+            [request.speaker_1_name, request.speaker_2_name],
+            PodcastPrompts.get_template("podcast_dialogue_prompt"),
+            {
+                "speaker_1_name": request.speaker_1_name,
+                "speaker_2_name": request.speaker_2_name,
+            },
+            "create_final_conversation",
+            llm_manager,
+            prompt_tracker,
+            unescape_unicode_string,
+        )
+
     schema = Conversation.model_json_schema()
     template = PodcastPrompts.get_template("podcast_dialogue_prompt")
     prompt = template.render(
@@ -611,6 +780,184 @@ async def podcast_create_final_conversation(
     return Conversation.model_validate(conversation_json)
 
 
+async def podcast_generate_conversation(
+    request: TranscriptionRequest,
+    llm_manager: LLMManager,
+    prompt_tracker: PromptTracker,
+    job_id: str,
+    job_manager: JobStatusManager,
+    logger: logging.Logger,
+    graph: TaskGraph,
+) -> Conversation:
+    """
+    Run the whole podcast flow as a graph of tasks, each starting once its inputs are ready.
+
+    Args:
+        request (TranscriptionRequest): Original transcription request
+        llm_manager (LLMManager): Manager for LLM interactions
+        prompt_tracker (PromptTracker): Tracks prompts and responses
+        job_id (str): ID for tracking job progress
+        job_manager (JobStatusManager): Manages job status updates
+        logger (logging.Logger): Logger for tracking progress
+        graph (TaskGraph): Empty graph to run the tasks in; its timing() afterwards
+            gives the critical path of the job
+
+    Returns:
+        Conversation: Structured conversation following the Conversation schema
+
+    Runs the same steps as calling the stage functions in order, without waiting
+    at stage boundaries where it isn't needed. The reference index is built while
+    the PDFs are summarized. Once the structured outline is ready, each segment's
+    dialogue conversion starts as soon as its own transcript is done, and each
+    combine step as soon as the previous combine and that segment's dialogue are.
+    """
+    job_manager.update_status(
+        job_id, JobStatus.PROCESSING, f"Summarizing {len(request.pdf_metadata)} PDFs"
+    )
+
+    def summarize(pdf: PDFMetadata):
+        async def run() -> PDFMetadata:
+            summary = await podcast_summarize_pdf(pdf, llm_manager, prompt_tracker)
+            pdf.summary = summary.content
+            prompt_tracker.update_result(f"summarize_{pdf.filename}", pdf.summary)
+            logger.info(f"Successfully summarized {pdf.filename}")
+            return pdf
+
+        return run
+
+    summaries = [
+        graph.add(f"summarize_{idx}", summarize(pdf))
+        for idx, pdf in enumerate(request.pdf_metadata)
+    ]
+
+    async def raw_outline(*summarized_pdfs: PDFMetadata) -> str:
+        return await podcast_generate_raw_outline(
+            list(summarized_pdfs),
+            request,
+            llm_manager,
+            prompt_tracker,
+            job_id,
+            job_manager,
+            logger,
+        )
+
+    async def reference_index() -> Optional[ChunkIndex]:
+        return await podcast_build_reference_index(request)
+
+    async def structured_outline(raw: str) -> PodcastOutline:
+        outline = await podcast_generate_structured_outline(
+            raw, request, llm_manager, prompt_tracker, job_id, job_manager, logger
+        )
+        if not outline.segments:
+            raise ValueError("Outline has no segments")
+        add_segment_tasks(outline)
+        return outline
+
+    def add_segment_tasks(outline: PodcastOutline):
+        total = len(outline.segments)
+        previous = None
+        for idx, segment in enumerate(outline.segments):
+
+            async def transcript(
+                outline: PodcastOutline,
+                index: Optional[ChunkIndex],
+                idx=idx,
+                segment=segment,
+            ) -> str:
+                job_manager.update_status(
+                    job_id,
+                    JobStatus.PROCESSING,
+                    f"Processing segment {idx + 1}/{total}: {segment.section}",
+                )
+                name, text = await podcast_process_segment(
+                    segment, idx, request, llm_manager, prompt_tracker, index
+                )
+                prompt_tracker.update_result(name, text)
+                return text
+
+            async def dialogue(
+                text: str, idx=idx, segment=segment
+            ) -> Optional[Dict[str, str]]:
+                if not text:
+                    logger.warning(
+                        f"Segment segment_transcript_{idx} has no transcript"
+                    )
+                    return None
+                job_manager.update_status(
+                    job_id,
+                    JobStatus.PROCESSING,
+                    f"Converting segment {idx + 1}/{total} to dialogue",
+                )
+                return await podcast_generate_dialogue_segment(
+                    segment, idx, text, request, llm_manager, prompt_tracker
+                )
+
+            async def combine(
+                current: Optional[str],
+                segment_dialogue: Optional[Dict[str, str]],
+                idx=idx,
+            ) -> Optional[str]:
+                if segment_dialogue is None:
+                    return current
+                if current is None:
+                    prompt_tracker.update_result(
+                        f"segment_dialogue_{idx}", segment_dialogue["dialogue"]
+                    )
+                    return segment_dialogue["dialogue"]
+                job_manager.update_status(
+                    job_id,
+                    JobStatus.PROCESSING,
+                    f"Combining segment {idx + 1}/{total} with existing dialogue",
+                )
+                return await podcast_combine_dialogue_step(
+                    current, segment_dialogue, idx, outline, llm_manager, prompt_tracker
+                )
+
+            graph.add(
+                f"segment_transcript_{idx}",
+                transcript,
+                ["structured_outline", "reference_index"],
+            )
+            graph.add(
+                f"segment_dialogue_{idx}", dialogue, [f"segment_transcript_{idx}"]
+            )
+            if previous is None:
+                # The first dialogue starts the combined dialogue as is
+                previous = graph.add(
+                    f"combine_dialogues_{idx}",
+                    partial(combine, None),
+                    [f"segment_dialogue_{idx}"],
+                )
+            else:
+                previous = graph.add(
+                    f"combine_dialogues_{idx}",
+                    combine,
+                    [previous, f"segment_dialogue_{idx}"],
+                )
+
+        async def final_conversation(dialogue: Optional[str]) -> Conversation:
+            if dialogue is None:
+                raise ValueError("No segment produced a dialogue")
+            return await podcast_create_final_conversation(
+                dialogue,
+                request,
+                llm_manager,
+                prompt_tracker,
+                job_id,
+                job_manager,
+                logger,
+            )
+
+        graph.add("final_conversation", final_conversation, [previous])
+
+    graph.add("raw_outline", raw_outline, summaries)
+    graph.add("reference_index", reference_index)
+    graph.add("structured_outline", structured_outline, ["raw_outline"])
+
+    results = await graph.run()
+    return results["final_conversation"]
+
+
 def unescape_unicode_string(s: str) -> str:
     """
     Convert escaped Unicode sequences to actual Unicode characters.
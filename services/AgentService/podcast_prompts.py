@@ -44,6 +44,25 @@ Please format the summary using markdown, with appropriate headers, lists, and e
 Note: Focus on extracting and organizing the most essential information while ensuring no critical details are omitted. Maintain the original document's tone and context in your summary.
 """
 
+# Template for merging summaries of consecutive sections of one oversized document
+PODCAST_SUMMARY_REDUCE_PROMPT_STR = """
+The following are summaries of consecutive sections of a single document, in document order. Combine them into one comprehensive summary of the whole document.
+
+{% for summary in summaries %}
+<section_summary index="{{ loop.index }}">
+{{ summary }}
+</section_summary>
+{% endfor %}
+
+Requirements for the combined summary:
+1. Preserve the document metadata (title/type, organization, author, period covered, identifiers) wherever it appears
+2. Keep every key finding, statistic, recommendation, trend and risk; merge repeated points instead of listing them twice
+3. Keep all numerical values, dates, names and verbatim quotes exactly as given
+4. Follow the order of the document
+
+Please format the summary using markdown, with appropriate headers, lists, and emphasis for better readability.
+"""
+
 # Template for synthesizing multiple document summaries into an outline
 PODCAST_MULTI_PDF_OUTLINE_PROMPT_STR = """
 Create a structured podcast outline synthesizing the following document summaries. The podcast should be {{total_duration}} minutes long.
@@ -308,6 +327,7 @@ Please output the JSON following the provided schema, maintaining all conversati
 # Dictionary mapping prompt names to their template strings
 PROMPT_TEMPLATES = {
     "podcast_summary_prompt": PODCAST_SUMMARY_PROMPT_STR,
+    "podcast_summary_reduce_prompt": PODCAST_SUMMARY_REDUCE_PROMPT_STR,
     "podcast_multi_pdf_outline_prompt": PODCAST_MULTI_PDF_OUTLINE_PROMPT_STR,
     "podcast_multi_pdf_structured_outline_prompt": PODCAST_MULTI_PDF_STRUCUTRED_OUTLINE_PROMPT_STR,
     "podcast_prompt_with_references": PODCAST_PROMPT_WITH_REFERENCES_STR,
@@ -0,0 +1,179 @@
+"""
+Chunked conversion of long transcripts into the Conversation schema.
+
+The transcript is split at speaker turns into chunks of at most
+FINAL_CONVERSATION_CHUNK_TOKENS estimated tokens. Chunks are converted to dialogue
+entries concurrently with the regular formatting template, validated locally, and
+concatenated in transcript order. A chunk whose response fails validation is
+retried on its own, without redoing the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+from collections.abc import Sequence
+from typing import Any, Callable
+
+import jinja2
+import ujson as json
+from shared.llmmanager import LLMManager
+from shared.podcast_types import Conversation, DialogueEntry
+from shared.prompt_tracker import PromptTracker
+from shared.tokens import estimate_tokens, split_markdown
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Transcripts over this many estimated tokens are formatted in chunks of this size;
+# 0 formats every transcript in a single call
+FINAL_CONVERSATION_CHUNK_TOKENS = int(
+    os.getenv("FINAL_CONVERSATION_CHUNK_TOKENS", "2000")
+)
+# Extra attempts for a chunk whose response doesn't validate
+FINAL_CONVERSATION_CHUNK_RETRIES = int(
+    os.getenv("FINAL_CONVERSATION_CHUNK_RETRIES", "2")
+)
+
+
+def needs_chunking(transcript: str) -> bool:
+    """Check whether a transcript is formatted in chunks."""
+    return (
+        FINAL_CONVERSATION_CHUNK_TOKENS > 0
+        and estimate_tokens(transcript) > FINAL_CONVERSATION_CHUNK_TOKENS
+    )
+
+
+def turn_pattern(speaker_names: Sequence[str]) -> re.Pattern:
+    """Match the marker opening a speaker turn, e.g. "Name:" or "**Name**:".
+
+    The speaker name is captured as "name", matched case-insensitively.
+    """
+    names = "|".join(re.escape(name.strip()) for name in speaker_names if name.strip())
+    return re.compile(
+        rf"(?im)^[ \t]*[*_]*[ \t]*(?P<name>{names})[ \t]*[*_]*[ \t]*:[ \t]*[*_]*"
+    )
+
+
+def split_turns(text: str, speaker_names: Sequence[str], max_tokens: int) -> list[str]:
+    """Split a transcript into chunks of whole speaker turns.
+
+    Consecutive turns share a chunk up to max_tokens estimated tokens. A single turn
+    over the limit is split at paragraphs, lines or words. Joining the chunks gives
+    back the original text.
+
+    Args:
+        text (str): Transcript with turns starting with a speaker name and a colon
+        speaker_names (Sequence[str]): Names the turns start with
+        max_tokens (int): Estimated token limit per chunk
+
+    Returns:
+        List[str]: Chunks in transcript order
+    """
+    starts = [match.start() for match in turn_pattern(speaker_names).finditer(text)]
+    bounds = [0] + [start for start in starts if start > 0] + [len(text)]
+    turns = [text[start:end] for start, end in zip(bounds, bounds[1:]) if start < end]
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for turn in turns:
+        for part in split_markdown(turn, max_tokens):
+            part_tokens = estimate_tokens(part)
+            if current and current_tokens + part_tokens > max_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+async def structure_in_chunks(
+    transcript: str,
+    speaker_names: Sequence[str],
+    template: jinja2.Template,
+    template_vars: dict[str, Any],
+    step_name: str,
+    llm_manager: LLMManager,
+    prompt_tracker: PromptTracker,
+    unescape: Callable[[str], str],
+) -> Conversation:
+    """
+    Convert a long transcript into a Conversation by formatting its chunks concurrently.
+
+    Args:
+        transcript (str): Transcript to convert
+        speaker_names (Sequence[str]): Names its speaker turns start with
+        template (jinja2.Template): Formatting prompt, rendered with text=chunk,
+            schema and template_vars
+        template_vars (Dict[str, Any]): Other template variables, e.g. speaker names
+        step_name (str): Chunks are tracked as "{step_name}_chunk_{i}"
+        llm_manager (LLMManager): Manager for LLM interactions
+        prompt_tracker (PromptTracker): Tracks prompts and responses
+        unescape (Callable[[str], str]): Cleans up escaped sequences in entry texts
+
+    Returns:
+        Conversation: Dialogue entries of all chunks in order, with their
+            scratchpads joined
+
+    Raises:
+        RuntimeError: If a chunk still fails after FINAL_CONVERSATION_CHUNK_RETRIES
+            retries
+    """
+    schema = Conversation.model_json_schema()
+    chunks = split_turns(transcript, speaker_names, FINAL_CONVERSATION_CHUNK_TOKENS)
+    logger.info(
+        f"Formatting {step_name} in {len(chunks)} chunks of up to "
+        f"{FINAL_CONVERSATION_CHUNK_TOKENS} estimated tokens"
+    )
+
+    async def structure_chunk(i: int, chunk: str) -> Conversation:
+        name = f"{step_name}_chunk_{i}"
+        prompt = template.render(
+            text=chunk, schema=json.dumps(schema, indent=2), **template_vars
+        )
+        for attempt in range(FINAL_CONVERSATION_CHUNK_RETRIES + 1):
+            try:
+                conversation_json: dict = await llm_manager.stream_async(
+                    "json",
+                    [{"role": "user", "content": prompt}],
+                    name,
+                    json_schema=schema,
+                )
+                prompt_tracker.track(
+                    name,
+                    prompt,
+                    llm_manager.model_configs["json"].name,
+                    json.dumps(conversation_json),
+                )
+                conversation = Conversation.model_validate(conversation_json)
+                if chunk.strip() and not conversation.dialogue:
+                    raise ValueError("No dialogue entries in response")
+            except Exception as e:
+                if attempt == FINAL_CONVERSATION_CHUNK_RETRIES:
+                    raise RuntimeError(
+                        f"Failed to format {name} after {attempt + 1} attempts"
+                    ) from e
+                logger.warning(f"Retrying {name} after invalid response: {e}")
+                continue
+            for entry in conversation.dialogue:
+                entry.text = unescape(entry.text)
+            return conversation
+
+    conversations: list[Conversation] = await asyncio.gather(
+        *[structure_chunk(i, chunk) for i, chunk in enumerate(chunks)]
+    )
+
+    dialogue: list[DialogueEntry] = [
+        entry for conversation in conversations for entry in conversation.dialogue
+    ]
+    scratchpad = "\n\n".join(
+        conversation.scratchpad.strip()
+        for conversation in conversations
+        if conversation.scratchpad.strip()
+    )
+    return Conversation.model_validate({"scratchpad": scratchpad, "dialogue": dialogue})
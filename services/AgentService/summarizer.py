@@ -0,0 +1,178 @@
+"""
+Map-reduce summarization for documents too large for a single summary prompt.
+
+The markdown is split at heading and paragraph boundaries into chunks of at most
+SUMMARY_CHUNK_TOKENS estimated tokens. Chunks are summarized concurrently with the
+regular summary template, and the chunk summaries are merged in groups with a reduce
+template, level by level, until a single summary is left.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+import jinja2
+from langchain_core.messages import AIMessage
+from shared.llmmanager import LLMManager
+from shared.prompt_tracker import PromptTracker
+from shared.summary_cache import prompt_version
+from shared.tokens import estimate_tokens, split_markdown
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Documents over this many estimated tokens are summarized by map-reduce
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "32000"))
+# Estimated token size of the chunks, and of the summaries merged by one reduce call
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "8000"))
+
+# Tracked as the prompt of a map-reduced summary served by the summary cache, since
+# none of its chunk or merge prompts were sent by the job
+CACHED_MAP_REDUCE_PROMPT = "Map-reduce summary reused from the summary cache"
+
+
+def needs_map_reduce(markdown: str) -> bool:
+    """Check whether a document is over the budget of a single summary prompt."""
+    return estimate_tokens(markdown) > SUMMARY_TOKEN_BUDGET
+
+
+def summary_prompt_version(summary_source: str, reduce_source: str) -> str:
+    """Version of a summary prompt pair for the summary cache.
+
+    Covers the map-reduce settings too, since they change how summaries come out.
+    """
+    return prompt_version(
+        summary_source,
+        reduce_source,
+        str(SUMMARY_TOKEN_BUDGET),
+        str(SUMMARY_CHUNK_TOKENS),
+    )
+
+
+def _group_summaries(summaries: list[str], max_tokens: int) -> list[list[str]]:
+    """Group consecutive summaries to merge, each group within max_tokens.
+
+    A group is only closed once it holds two summaries, so every level merges at
+    least half of them and the reduction always ends.
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _summarize(
+    step_name: str,
+    prompt: str,
+    llm_manager: LLMManager,
+    prompt_tracker: PromptTracker,
+    fragments: list[str],
+) -> AIMessage:
+    response: AIMessage = await llm_manager.query_async(
+        "reasoning",
+        [{"role": "user", "content": prompt}],
+        step_name,
+    )
+    prompt_tracker.track(
+        step_name,
+        prompt,
+        llm_manager.model_configs["reasoning"].name,
+        fragments=fragments,
+    )
+    return response
+
+
+async def map_reduce_summarize(
+    markdown: str,
+    step_name: str,
+    summary_template: jinja2.Template,
+    reduce_template: jinja2.Template,
+    llm_manager: LLMManager,
+    prompt_tracker: PromptTracker,
+) -> AIMessage:
+    """
+    Summarize a large document by summarizing its chunks and merging the summaries.
+
+    Args:
+        markdown (str): Document to summarize
+        step_name (str): Name of the final step; chunk and merge steps are tracked
+            as "{step_name}_chunk_{i}" and "{step_name}_reduce{level}_{i}"
+        summary_template (jinja2.Template): Summary prompt, rendered with text=chunk
+        reduce_template (jinja2.Template): Merge prompt, rendered with summaries=[...]
+        llm_manager (LLMManager): Manager for LLM interactions
+        prompt_tracker (PromptTracker): Tracks prompts and responses
+
+    Returns:
+        AIMessage: The final summary response, whose result the caller records
+            under step_name like a single-prompt summary
+
+    Chunk and merge calls of a level run concurrently; the per-endpoint concurrency
+    limit of the LLM manager keeps them from flooding the model.
+    """
+    chunks = split_markdown(markdown, SUMMARY_CHUNK_TOKENS)
+    logger.info(
+        f"Summarizing {step_name} in {len(chunks)} chunks of up to "
+        f"{SUMMARY_CHUNK_TOKENS} estimated tokens"
+    )
+
+    async def summarize_chunk(i: int, chunk: str) -> str:
+        name = f"{step_name}_chunk_{i}"
+        response = await _summarize(
+            name,
+            summary_template.render(text=chunk),
+            llm_manager,
+            prompt_tracker,
+            fragments=[chunk],
+        )
+        prompt_tracker.update_result(name, response.content)
+        return response.content
+
+    summaries: list[str] = await asyncio.gather(
+        *[summarize_chunk(i, chunk) for i, chunk in enumerate(chunks)]
+    )
+
+    level = 0
+    while True:
+        groups = _group_summaries(summaries, SUMMARY_CHUNK_TOKENS)
+        if len(groups) == 1:
+            return await _summarize(
+                step_name,
+                reduce_template.render(summaries=groups[0]),
+                llm_manager,
+                prompt_tracker,
+                fragments=groups[0],
+            )
+
+        level += 1
+
+        async def reduce_group(level: int, i: int, group: list[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            name = f"{step_name}_reduce{level}_{i}"
+            response = await _summarize(
+                name,
+                reduce_template.render(summaries=group),
+                llm_manager,
+                prompt_tracker,
+                fragments=group,
+            )
+            prompt_tracker.update_result(name, response.content)
+            return response.content
+
+        summaries = await asyncio.gather(
+            *[reduce_group(level, i, group) for i, group in enumerate(groups)]
+        )
+        logger.info(
+            f"Merged {step_name} summaries to {len(summaries)} at level {level}"
+        )
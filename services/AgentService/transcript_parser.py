@@ -0,0 +1,444 @@
+"""
+Local conversion of transcripts into the Conversation schema, without an LLM.
+
+Transcripts come out of the pipeline as "Name: line" turns. The parser maps the
+speaker names to "speaker-1"/"speaker-2" and spells numbers, currency, percentages
+and symbols out with fixed rules, the way the formatting prompt asks the model to.
+It also rates how much of the transcript it could attribute and normalize; below
+TRANSCRIPT_PARSER_MIN_CONFIDENCE the caller falls back to the LLM.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from shared.podcast_types import Conversation, DialogueEntry
+from structurer import turn_pattern
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Share of the transcript the parser must attribute and normalize for its result to
+# be used; anything above 1 always formats with the LLM
+TRANSCRIPT_PARSER_MIN_CONFIDENCE = float(
+    os.getenv("TRANSCRIPT_PARSER_MIN_CONFIDENCE", "0.95")
+)
+
+# Model name recorded for conversations the parser formatted, in place of the LLM's
+LOCAL_PARSER_MODEL = "local-transcript-parser"
+
+_ONES = [
+    "zero",
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+    "ten",
+    "eleven",
+    "twelve",
+    "thirteen",
+    "fourteen",
+    "fifteen",
+    "sixteen",
+    "seventeen",
+    "eighteen",
+    "nineteen",
+]
+_TENS = [
+    "",
+    "",
+    "twenty",
+    "thirty",
+    "forty",
+    "fifty",
+    "sixty",
+    "seventy",
+    "eighty",
+    "ninety",
+]
+_SCALES = ["", "thousand", "million", "billion", "trillion", "quadrillion"]
+_ORDINALS = {
+    "one": "first",
+    "two": "second",
+    "three": "third",
+    "five": "fifth",
+    "eight": "eighth",
+    "nine": "ninth",
+    "twelve": "twelfth",
+}
+
+# Singular and plural unit, and subunit, of each currency symbol
+_CURRENCIES = {
+    "$": ("dollar", "dollars", ("cent", "cents")),
+    "€": ("euro", "euros", ("cent", "cents")),
+    "£": ("pound", "pounds", ("penny", "pence")),
+    "¥": ("yen", "yen", None),
+    "₹": ("rupee", "rupees", None),
+}
+_SCALE_SUFFIXES = {
+    "k": "thousand",
+    "thousand": "thousand",
+    "m": "million",
+    "mn": "million",
+    "million": "million",
+    "b": "billion",
+    "bn": "billion",
+    "billion": "billion",
+    "t": "trillion",
+    "tn": "trillion",
+    "trillion": "trillion",
+}
+
+_NUM = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_CURRENCY = re.compile(
+    rf"(?P<sign>-)?(?P<symbol>[$€£¥₹])\s?(?P<num>{_NUM})"
+    r"(?:\s?(?P<scale>thousand|million|billion|trillion|bn|mn|tn|[KkMmBbTt])\b)?"
+)
+_PERCENT = re.compile(rf"(?P<sign>(?<![\w)])-)?(?<![\w.])(?P<num>{_NUM})\s?%")
+_ORDINAL = re.compile(r"\b(?P<num>\d+)(?:st|nd|rd|th)\b")
+_MULTIPLIER = re.compile(rf"(?<![\w.])(?P<num>{_NUM})x\b")
+_DECADE = re.compile(r"\b(?P<num>1[1-9]\d0|20\d0)'?s\b")
+# Clock times, e.g. "3:30", "9:05 am" or "14:00". A period after the meridiem that
+# ends the sentence is left in place.
+_TIME = re.compile(
+    r"(?<![\w.:])(?P<hour>[01]?\d|2[0-3]):(?P<minute>[0-5]\d)"
+    r"(?:\s?(?P<meridiem>[AaPp])\.?[Mm](?:\.(?!\s|$))?(?!\w))?(?![\w:]|\.\d)"
+)
+# Quarters and halves, e.g. "Q3" or "H1"
+_PERIOD = re.compile(r"\b(?P<letter>[QqHh])(?P<num>[1-4])\b")
+_RANGE = re.compile(
+    rf"(?<![\w.])(?P<start>{_NUM})\s?[-–—]\s?(?P<end>{_NUM})(?![\w]|\.\d)"
+)
+_NUMBER = re.compile(
+    rf"(?P<sign>(?<![\w)])[-−])?(?<![\w.])(?P<num>{_NUM})(?![\w]|\.\d)"
+)
+_MONTHS = (
+    r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+# Words, and period tokens like "Q3", "H1" or "March 15,", after which a four digit
+# number is read as a year
+_YEAR_CUE = re.compile(
+    r"(?i)\b(?:in|since|by|from|until|till|through|during|before|after|year|"
+    r"circa|early|late|mid|fiscal|fy|around|q[1-4]|h[12]|"
+    rf"(?:{_MONTHS})\.?(?:\s+\d{{1,2}}(?:st|nd|rd|th)?,?)?)[\s,-]+$"
+)
+_SYMBOLS = [
+    (re.compile(r"°\s?C\b"), " degrees Celsius"),
+    (re.compile(r"°\s?F\b"), " degrees Fahrenheit"),
+    (re.compile(r"°"), " degrees"),
+    (re.compile(r"\s*\+\s*"), " plus "),
+    (re.compile(r"\s*=\s*"), " equals "),
+    (re.compile(r"\s*×\s*"), " times "),
+    (re.compile(r"\s*&\s*"), " and "),
+    (re.compile(r"~\s*(?=\w)"), "about "),
+    (re.compile(r"#(?=\d)"), "number "),
+]
+# Anything still holding a digit or a symbol the rules don't cover
+_UNRESOLVED = re.compile(r"\S*[\d$€£¥₹%=+<>^|\\]\S*")
+# Punctuation touching a digit that the rules neither spell out nor read naturally,
+# e.g. "3/4" or "3:1", which would end up as "three/four". Clock times are removed
+# before checking; symbols _UNRESOLVED already counts are left to it.
+_DIGIT_PUNCTUATION = re.compile(
+    r"\d(?:[^\w\s,.;:!?%)\]}\"'’°×\-–—$€£¥₹=+<>^|\\]|:(?=\S))"
+    r"|[^\w\s([{\"'’#~×\-–—−$€£¥₹=+<>^|\\]\d"
+)
+_TOKEN = re.compile(r"\S+")
+
+_EMPHASIS = re.compile(r"\*+|(?<!\w)_+|_+(?!\w)")
+_DECORATION = re.compile(r"^(?:#{1,6}\s.*|[-*_=]{3,})$")
+# A line opening a turn of a speaker not in the request, e.g. "Narrator:"
+_OTHER_SPEAKER = re.compile(
+    r"^[ \t]*[*_]*[ \t]*[A-Z][\w.'-]*(?: [A-Z][\w.'-]*){0,2}[ \t]*[*_]*[ \t]*:\s"
+)
+
+
+def _hundreds(n: int) -> list[str]:
+    words: list[str] = []
+    if n >= 100:
+        words += [_ONES[n // 100], "hundred"]
+        n %= 100
+    if n >= 20:
+        words.append(_TENS[n // 10])
+        n %= 10
+        if n:
+            words.append(_ONES[n])
+    elif n or not words:
+        words.append(_ONES[n])
+    return words
+
+
+def int_to_words(n: int) -> str:
+    """Spell out an integer, e.g. 1250 as "one thousand two hundred fifty"."""
+    if n < 0:
+        return f"minus {int_to_words(-n)}"
+    if n == 0:
+        return "zero"
+    if n >= 1000 ** len(_SCALES):
+        return " ".join(_ONES[int(digit)] for digit in str(n))
+    words: list[str] = []
+    for power in range(len(_SCALES) - 1, -1, -1):
+        group = (n // 1000**power) % 1000
+        if group:
+            words += _hundreds(group)
+            if _SCALES[power]:
+                words.append(_SCALES[power])
+    return " ".join(words)
+
+
+def number_to_words(number: str) -> str:
+    """Spell out a number as written, e.g. "1,000" or "3.14" ("three point one four")."""
+    whole, _, fraction = number.replace(",", "").partition(".")
+    words = int_to_words(int(whole))
+    if fraction:
+        words += " point " + " ".join(_ONES[int(digit)] for digit in fraction)
+    return words
+
+
+def year_to_words(year: int) -> str:
+    """Spell out a year the way it's spoken, e.g. 1995 as "nineteen ninety five"."""
+    if 2000 <= year < 2010 or not 1100 <= year < 2100:
+        return int_to_words(year)
+    century, rest = divmod(year, 100)
+    if rest == 0:
+        return f"{int_to_words(century)} hundred"
+    if rest < 10:
+        return f"{int_to_words(century)} oh {_ONES[rest]}"
+    return f"{int_to_words(century)} {int_to_words(rest)}"
+
+
+def _ordinal(words: str) -> str:
+    head, _, last = words.rpartition(" ")
+    if last in _ORDINALS:
+        last = _ORDINALS[last]
+    elif last.endswith("y"):
+        last = last[:-1] + "ieth"
+    else:
+        last += "th"
+    return f"{head} {last}" if head else last
+
+
+def _plural(words: str) -> str:
+    return words[:-1] + "ies" if words.endswith("y") else words + "s"
+
+
+def _in_year_range(number: str) -> bool:
+    return len(number) == 4 and number.isdigit() and 1100 <= int(number) < 2100
+
+
+def _is_year(number: str, preceding: str) -> bool:
+    return _in_year_range(number) and _YEAR_CUE.search(preceding[-24:]) is not None
+
+
+def _currency(match: re.Match) -> str:
+    unit, units, subunits = _CURRENCIES[match.group("symbol")]
+    number = match.group("num").replace(",", "")
+    sign = "minus " if match.group("sign") else ""
+    scale = match.group("scale")
+    if scale:
+        return (
+            f"{sign}{number_to_words(number)} {_SCALE_SUFFIXES[scale.lower()]} {units}"
+        )
+
+    whole, _, fraction = number.partition(".")
+    if fraction and (len(fraction) != 2 or subunits is None):
+        return f"{sign}{number_to_words(number)} {units}"
+    amount = int(whole)
+    words = f"{int_to_words(amount)} {unit if amount == 1 else units}"
+    cents = int(fraction) if fraction else 0
+    if cents:
+        cents_words = (
+            f"{int_to_words(cents)} {subunits[0] if cents == 1 else subunits[1]}"
+        )
+        words = cents_words if amount == 0 else f"{words} and {cents_words}"
+    return sign + words
+
+
+def _range(match: re.Match) -> str:
+    start, end = match.group("start"), match.group("end")
+    if _in_year_range(start) and _in_year_range(end):
+        return f"{year_to_words(int(start))} to {year_to_words(int(end))}"
+    return f"{number_to_words(start)} to {number_to_words(end)}"
+
+
+def _time(match: re.Match) -> str:
+    hour, minute = int(match.group("hour")), int(match.group("minute"))
+    words = int_to_words(hour)
+    if minute == 0 and not match.group("meridiem"):
+        words += " o'clock"
+    elif minute:
+        words += f" oh {_ONES[minute]}" if minute < 10 else f" {int_to_words(minute)}"
+    if match.group("meridiem"):
+        words += f" {match.group('meridiem').upper()}M"
+    return words
+
+
+def _number(match: re.Match) -> str:
+    number = match.group("num")
+    sign = "minus " if match.group("sign") else ""
+    if not sign and _is_year(number, match.string[: match.start()]):
+        return year_to_words(int(number))
+    return sign + number_to_words(number)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Rewrite numbers and symbols in spoken form, e.g. "$2.5M" as "two point five
+    million dollars" and "50%" as "fifty percent".
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str: Text with currency, percentages, ordinals, times, ranges, years,
+            decades, quarters, numbers and common symbols spelled out
+    """
+    text = _CURRENCY.sub(_currency, text)
+    text = _PERCENT.sub(
+        lambda m: (
+            ("minus " if m.group("sign") else "")
+            + number_to_words(m.group("num"))
+            + " percent"
+        ),
+        text,
+    )
+    text = _ORDINAL.sub(lambda m: _ordinal(int_to_words(int(m.group("num")))), text)
+    text = _MULTIPLIER.sub(lambda m: number_to_words(m.group("num")) + " times", text)
+    text = _DECADE.sub(lambda m: _plural(year_to_words(int(m.group("num")))), text)
+    text = _TIME.sub(_time, text)
+    text = _RANGE.sub(_range, text)
+    text = _NUMBER.sub(_number, text)
+    text = _PERIOD.sub(
+        lambda m: f"{m.group('letter').upper()} {_ONES[int(m.group('num'))]}", text
+    )
+    for pattern, replacement in _SYMBOLS:
+        text = pattern.sub(replacement, text)
+    return re.sub(r"[ \t]{2,}", " ", text).strip()
+
+
+@dataclass
+class ParsedTranscript:
+    """Result of parsing a transcript locally.
+
+    Attributes:
+        conversation (Conversation): Parsed dialogue entries
+        confidence (float): Share of the transcript's characters that were
+            attributed to a speaker and fully normalized, from 0 to 1
+    """
+
+    conversation: Conversation
+    confidence: float
+
+
+def _unhandled_punctuation(text: str) -> int:
+    """Characters of the tokens where a digit touches punctuation the rules miss."""
+    text = _TIME.sub(" ", text)
+    return sum(
+        len(token) for token in _TOKEN.findall(text) if _DIGIT_PUNCTUATION.search(token)
+    )
+
+
+def parse_transcript(text: str, speaker_names: Sequence[str]) -> ParsedTranscript:
+    """
+    Parse a "Name: line" transcript into a Conversation with normalized text.
+
+    Args:
+        text (str): Transcript to parse
+        speaker_names (Sequence[str]): Names of speaker-1 and, for dialogues,
+            speaker-2
+
+    Returns:
+        ParsedTranscript: The conversation and how confident the parse is
+
+    Each turn becomes one entry. With a single speaker, lines without a name
+    belong to that speaker and every paragraph becomes an entry. Headings and
+    rules are skipped; lines of unknown speakers, and text before the first turn of
+    a dialogue, count against the confidence, as do numbers and symbols the
+    normalizer leaves behind and digits next to punctuation it doesn't handle.
+    """
+    speakers = {
+        name.strip().lower(): f"speaker-{i + 1}"
+        for i, name in enumerate(speaker_names)
+        if name and name.strip()
+    }
+    single_speaker = len(speakers) == 1
+    marker = turn_pattern(speaker_names)
+
+    dialogue: list[DialogueEntry] = []
+    attributed = 0
+    unattributed = 0
+    speaker: str | None = "speaker-1" if single_speaker else None
+    lines: list[str] = []
+
+    def flush():
+        nonlocal attributed, unattributed
+        raw = " ".join(lines).strip()
+        lines.clear()
+        if not raw or speaker is None:
+            return
+        plain = _EMPHASIS.sub("", raw)
+        spoken = normalize_text(plain)
+        if not spoken:
+            return
+        unresolved = sum(
+            len(token) for token in _UNRESOLVED.findall(spoken)
+        ) + _unhandled_punctuation(plain)
+        attributed += max(len(raw) - unresolved, 0)
+        unattributed += unresolved
+        dialogue.append(DialogueEntry(speaker=speaker, text=spoken))
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            if single_speaker:
+                flush()
+            continue
+        match = marker.match(line)
+        if match:
+            flush()
+            speaker = speakers[match.group("name").strip().lower()]
+            lines.append(line[match.end() :].strip())
+        elif _DECORATION.match(stripped):
+            continue
+        elif _OTHER_SPEAKER.match(line) or speaker is None:
+            flush()
+            if not single_speaker:
+                speaker = None
+            unattributed += len(stripped)
+        else:
+            lines.append(stripped)
+    flush()
+
+    total = attributed + unattributed
+    confidence = attributed / total if dialogue and total else 0.0
+    return ParsedTranscript(
+        conversation=Conversation(scratchpad="", dialogue=dialogue),
+        confidence=confidence,
+    )
+
+
+def try_parse_transcript(
+    text: str, speaker_names: Sequence[str]
+) -> Conversation | None:
+    """Parse a transcript locally, or return None if the LLM should format it."""
+    parsed = parse_transcript(text, speaker_names)
+    if parsed.confidence < TRANSCRIPT_PARSER_MIN_CONFIDENCE:
+        logger.info(
+            f"Local transcript parse confidence {parsed.confidence:.2f} is below "
+            f"{TRANSCRIPT_PARSER_MIN_CONFIDENCE}, formatting with the LLM"
+        )
+        return None
+    logger.info(
+        f"Parsed transcript locally into {len(parsed.conversation.dialogue)} entries "
+        f"with confidence {parsed.confidence:.2f}"
+    )
+    return parsed.conversation
@@ -1,5 +1,7 @@
 from fastapi import FastAPI, BackgroundTasks, HTTPException, Form, File, UploadFile
 from shared.job import JobStatusManager
+from shared.storage import StorageManager
+from shared.compression import ARTIFACT_COMPRESSION
 from shared.otel import OpenTelemetryInstrumentation, OpenTelemetryConfig
 from opentelemetry.trace.status import StatusCode
 import httpx
@@ -8,9 +10,10 @@ import os
 import logging
 import asyncio
 import ujson as json
-from typing import List
+from typing import List, Set
 from shared.pdf_types import PDFConversionResult, ConversionStatus, PDFMetadata
-from shared.api_types import ServiceType, JobStatus, StatusResponse
+from shared.api_types import ServiceType, JobStatus, StatusResponse, RetrievalBackend
+from shared.retrieval import ChunkIndex, save_index
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,13 +29,18 @@ config = OpenTelemetryConfig(
 )
 telemetry.initialize(config, app)
 
-job_manager = JobStatusManager(ServiceType.PDF, telemetry=telemetry)
+storage_manager = StorageManager(telemetry=telemetry)
+job_manager = JobStatusManager(
+    ServiceType.PDF, telemetry=telemetry, storage_manager=storage_manager
+)
 
 # Configuration
 MODEL_API_URL = os.getenv(
     "MODEL_API_URL", "https://nv-ingest-rest-endpoint.brevlab.com/v1"
 )
 DEFAULT_TIMEOUT = 600  # seconds
+# With the local backend, converted markdown is indexed for /query_vector_db
+RETRIEVAL_BACKEND = RetrievalBackend(os.getenv("RETRIEVAL_BACKEND", "local"))
 
 
 async def convert_pdfs_to_markdown(
@@ -153,6 +161,30 @@ async def convert_pdfs_to_markdown(
                 )
 
 
+def build_and_save_index(job_id: str, documents: List[PDFMetadata]):
+    """Index converted markdown and persist the index for retrieval"""
+    index = ChunkIndex.build(
+        (pdf.filename, pdf.markdown) for pdf in documents if pdf.markdown
+    )
+    save_index(storage_manager, job_id, index)
+
+
+# Running index builds, referenced so they aren't garbage collected mid-run
+_index_tasks: Set[asyncio.Task] = set()
+
+
+async def index_markdown(job_id: str, documents: List[PDFMetadata]):
+    """Build the job's retrieval index off the event loop. Failures don't fail the job."""
+    with telemetry.tracer.start_as_current_span("pdf.index_markdown") as span:
+        span.set_attribute("job_id", job_id)
+        try:
+            await asyncio.to_thread(build_and_save_index, job_id, documents)
+        except Exception as e:
+            logger.error(f"Failed to build retrieval index for job {job_id}: {e}")
+            span.set_status(StatusCode.ERROR)
+            span.record_exception(e)
+
+
 async def convert_pdfs(
     job_id: str,
     contents: List[bytes],
@@ -229,6 +261,7 @@ async def convert_pdfs(
                 job_manager.set_result(
                     job_id,
                     json.dumps(serialized_metadata).encode(),
+                    compression=ARTIFACT_COMPRESSION,
                 )
                 logger.info(f"Successfully stored results for job {job_id}")
 
@@ -237,6 +270,14 @@ async def convert_pdfs(
                 )
                 logger.info(f"Job {job_id} marked as completed successfully")
 
+                # Indexing isn't needed to continue the job, so it runs afterwards
+                if RETRIEVAL_BACKEND == RetrievalBackend.LOCAL:
+                    task = asyncio.create_task(
+                        index_markdown(job_id, pdf_metadata_list)
+                    )
+                    _index_tasks.add(task)
+                    task.add_done_callback(_index_tasks.discard)
+
             finally:
                 # Clean up all temporary files
                 logger.info(f"Starting cleanup of {len(temp_files)} temporary files")
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, BackgroundTasks, HTTPException
 from shared.api_types import ServiceType, JobStatus
 from shared.job import JobStatusManager
-from fastapi.responses import Response
+from shared.storage import StorageManager
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import logging
@@ -33,7 +34,10 @@ config = OpenTelemetryConfig(
 )
 telemetry.initialize(config, app)
 
-job_manager = JobStatusManager(ServiceType.TTS, telemetry=telemetry)
+storage_manager = StorageManager(telemetry=telemetry)
+job_manager = JobStatusManager(
+    ServiceType.TTS, telemetry=telemetry, storage_manager=storage_manager
+)
 
 
 class DialogueEntry(BaseModel):
@@ -237,12 +241,12 @@ async def get_output(job_id: str):
     """Get the generated audio file"""
     with telemetry.tracer.start_as_current_span("tts.get_output") as span:
         span.set_attribute("job_id", job_id)
-        result = job_manager.get_result(job_id)
+        result = job_manager.get_result_stream(job_id)
         if result is None:
             span.set_status(StatusCode.ERROR, "result not found")
             raise HTTPException(status_code=404, detail="Result not found")
-        return Response(
-            content=result,
+        return StreamingResponse(
+            result,
             media_type="audio/mpeg",
             headers={"Content-Disposition": "attachment; filename=output.mp3"},
         )
@@ -15,9 +15,14 @@ setup(
     packages=find_packages(),
     install_requires=[
         "redis",  # For caching and message queuing
+        "minio",  # For object storage
         "pydantic",  # For data validation and serialization
         "httpx",  # For async HTTP requests
         "requests",  # For sync HTTP requests
         "langchain-nvidia-ai-endpoints",  # For AI model integration
+        "numpy",  # For the in-memory retrieval index
     ],
+    extras_require={
+        "zstd": ["zstandard"],  # For ARTIFACT_COMPRESSION=zstd
+    },
 )
@@ -19,6 +19,31 @@ class ServiceType(str, Enum):
     TTS = "tts"  # Text-to-speech service
 
 
+class DeliveryMode(str, Enum):
+    """Enum representing how downloadable files are delivered to clients."""
+    PROXY = "proxy"  # Bytes are streamed through the API
+    URL = "url"  # A presigned storage URL is returned in the response body
+    REDIRECT = "redirect"  # The client is redirected (307) to a presigned storage URL
+
+
+class HistoryView(str, Enum):
+    """Enum representing how agent workflow history is returned to clients."""
+    EXPANDED = "expanded"  # Prompts contain the full text of every fragment
+    COMPACT = "compact"  # Fragments are sent once and referenced from prompts
+
+
+class RetrievalBackend(str, Enum):
+    """Enum representing where /query_vector_db retrieves results from."""
+    LOCAL = "local"  # Chunk index built in-process when PDFs are converted
+    NV_INGEST = "nv-ingest"  # Remote NV-Ingest retrieval service
+
+
+class DownloadURL(BaseModel):
+    """Model for a short-lived presigned download link."""
+    url: str  # Presigned GET URL served by object storage
+    expires_in: int  # Seconds until the URL expires
+
+
 class StatusUpdate(BaseModel):
     """Model for job status updates sent between services."""
     job_id: str
@@ -130,3 +155,18 @@ class RAGRequest(BaseModel):
     query: str = Field(..., description="The search query to process")
     k: int = Field(..., description="Number of results to retrieve", ge=1)
     job_id: str = Field(..., description="The unique job identifier")
+
+
+class RAGResult(BaseModel):
+    """Model for a passage retrieved by the local retrieval backend."""
+    text: str  # Markdown of the passage
+    source: str  # File the passage comes from
+    position: int  # Index of the passage within its file
+    score: float  # Hybrid relevance score, higher is better
+
+
+class RAGResponse(BaseModel):
+    """Model for the results of a RAG request answered by the local backend."""
+    job_id: str
+    query: str
+    results: List[RAGResult]  # Best match first
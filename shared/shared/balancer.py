@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Collection
+from typing import Any
+
+from .concurrency import get_limiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Consecutive failed calls after which an endpoint is taken out of rotation
+LLM_EJECT_FAILURES = int(os.getenv("LLM_EJECT_FAILURES", "3"))
+# Seconds an ejected endpoint stays out of rotation
+LLM_EJECT_SECONDS = float(os.getenv("LLM_EJECT_SECONDS", "30"))
+# Successful call latencies kept per model and query stage for the hedging percentile
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+# Latency samples of a stage needed before its requests are hedged
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+
+def endpoint_key(api_base: str, model: str) -> str:
+    """Key of a model served by one endpoint, shared with its concurrency limiter."""
+    return f"{api_base}|{model}"
+
+
+class EndpointBalancer:
+    """Spread calls to one model across its endpoints.
+
+    Picks the endpoint with the fewest outstanding calls relative to its weight, using
+    the in-flight and queued counts of the endpoint's concurrency limiter. Endpoints
+    that fail LLM_EJECT_FAILURES calls in a row are ejected for LLM_EJECT_SECONDS; if
+    all are ejected, all are used. Latencies of successful calls are kept per query
+    stage, since stages differ widely in length, to decide when a request of that
+    stage should be hedged.
+
+    Attributes:
+        model (str): Name of the model served by the endpoints
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._lock = threading.Lock()
+        self._failures: dict[str, int] = {}
+        self._ejected_until: dict[str, float] = {}
+        self._latencies: dict[str, deque[float]] = {}
+
+    def is_ejected(self, api_base: str) -> bool:
+        """Check whether an endpoint is currently out of rotation."""
+        return self._ejected_until.get(api_base, 0.0) > time.monotonic()
+
+    def choose(
+        self, endpoints: list[tuple[str, float]], exclude: Collection[str] = ()
+    ) -> str | None:
+        """Pick the endpoint for the next call.
+
+        Args:
+            endpoints (List[Tuple[str, float]]): API base URLs and their weights
+            exclude (Collection[str]): Endpoints not to use, e.g. the one being hedged
+
+        Returns:
+            Optional[str]: API base URL, None if every endpoint is excluded
+        """
+        candidates = [
+            (base, weight) for base, weight in endpoints if base not in exclude
+        ]
+        if not candidates:
+            return None
+        healthy = [
+            (base, weight) for base, weight in candidates if not self.is_ejected(base)
+        ]
+        candidates = healthy or candidates
+
+        def load(candidate: tuple[str, float]) -> float:
+            base, weight = candidate
+            limiter = get_limiter(endpoint_key(base, self.model))
+            return (limiter.in_flight + limiter.queued + 1) / max(weight, 1e-6)
+
+        lowest = min(load(candidate) for candidate in candidates)
+        least_loaded = [c for c in candidates if load(c) == lowest]
+        # Among equally loaded endpoints, prefer heavier weights
+        return random.choices(
+            [base for base, _ in least_loaded],
+            weights=[weight for _, weight in least_loaded],
+        )[0]
+
+    def record(
+        self,
+        api_base: str,
+        latency: float,
+        error: BaseException | None,
+        stage: str | None = None,
+    ):
+        """Record the outcome of a call to an endpoint.
+
+        Args:
+            api_base (str): Endpoint that served the call
+            latency (float): Seconds the call took
+            error (Optional[BaseException]): Exception raised by the call, if any
+            stage (Optional[str]): Query stage, see llm_usage.query_stage. The
+                latency is only kept for hedging when given.
+        """
+        with self._lock:
+            if error is None:
+                self._failures[api_base] = 0
+                if stage is not None:
+                    window = self._latencies.get(stage)
+                    if window is None:
+                        window = deque(maxlen=LLM_LATENCY_WINDOW)
+                        self._latencies[stage] = window
+                    window.append(latency)
+                return
+            failures = self._failures.get(api_base, 0) + 1
+            self._failures[api_base] = failures
+            if failures >= LLM_EJECT_FAILURES and not self.is_ejected(api_base):
+                self._ejected_until[api_base] = time.monotonic() + LLM_EJECT_SECONDS
+                logger.warning(
+                    f"Ejecting {api_base} for {self.model} for {LLM_EJECT_SECONDS}s "
+                    f"after {failures} failed calls: {error}"
+                )
+
+    def latency_percentile(self, percentile: float, stage: str) -> float | None:
+        """Latency below which the given percentage of a stage's recent calls finished.
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+            stage (str): Query stage, see llm_usage.query_stage
+
+        Returns:
+            Optional[float]: Latency in seconds, None until LLM_HEDGE_MIN_SAMPLES calls
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(stage, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        index = min(int(len(samples) * percentile / 100.0), len(samples) - 1)
+        return samples[index]
+
+    def stats(self) -> dict[str, Any]:
+        """Ejected endpoints and recent latency percentiles per stage."""
+        with self._lock:
+            stages = list(self._latencies)
+        return {
+            "ejected": [base for base in self._ejected_until if self.is_ejected(base)],
+            "latency": {
+                stage: {
+                    "p50": self.latency_percentile(50, stage),
+                    "p95": self.latency_percentile(95, stage),
+                }
+                for stage in stages
+            },
+        }
+
+
+_registry_lock = threading.Lock()
+_balancers: dict[str, EndpointBalancer] = {}
+
+
+def get_balancer(model: str) -> EndpointBalancer:
+    """Get the process-wide balancer of a model, creating it on first use.
+
+    Args:
+        model (str): Name of the model
+
+    Returns:
+        EndpointBalancer: Balancer shared by every caller of the model
+    """
+    with _registry_lock:
+        balancer = _balancers.get(model)
+        if balancer is None:
+            balancer = _balancers[model] = EndpointBalancer(model)
+        return balancer
+
+
+def balancer_stats() -> dict[str, dict[str, Any]]:
+    """Stats of every balancer in the process, by model name."""
+    with _registry_lock:
+        balancers = list(_balancers.values())
+    return {balancer.model: balancer.stats() for balancer in balancers}
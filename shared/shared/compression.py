@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import logging
+import os
+import zlib
+from collections.abc import Iterable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GZIP = "gzip"
+ZSTD = "zstd"
+SUPPORTED_ENCODINGS = {GZIP, ZSTD}
+
+# Compression applied to JSON artifacts (results, transcripts, prompt history).
+# Empty disables compression. zstd needs the "zstd" extra of the shared package
+# (zstandard) and falls back to gzip, with a warning, when it is not installed.
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "")
+
+
+@functools.cache
+def _warn_zstd_fallback():
+    """Warn once per process that zstd requests are served with gzip."""
+    logger.warning(
+        "zstd compression was requested but zstandard is not installed, using gzip; "
+        'install the shared package with the "zstd" extra to enable it'
+    )
+
+
+if ARTIFACT_COMPRESSION.lower() == ZSTD and zstandard is None:
+    _warn_zstd_fallback()
+
+
+def resolve_encoding(encoding: str | None) -> str | None:
+    """Normalize a requested encoding to one that can be used in this process.
+
+    Args:
+        encoding (Optional[str]): Requested encoding name, e.g. "gzip" or "zstd"
+
+    Returns:
+        Optional[str]: Encoding to use, None if compression is disabled
+
+    Raises:
+        ValueError: If the encoding is not supported
+    """
+    if not encoding:
+        return None
+    encoding = encoding.lower()
+    if encoding not in SUPPORTED_ENCODINGS:
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+    if encoding == ZSTD and zstandard is None:
+        _warn_zstd_fallback()
+        return GZIP
+    return encoding
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data with the given encoding.
+
+    Args:
+        data (bytes): Data to compress
+        encoding (str): "gzip" or "zstd"
+
+    Returns:
+        bytes: Compressed data
+    """
+    if encoding == GZIP:
+        return gzip.compress(data, compresslevel=6)
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str | None) -> bytes:
+    """Decompress data with the given encoding. Data is returned as is if encoding is None.
+
+    Args:
+        data (bytes): Data to decompress
+        encoding (Optional[str]): "gzip", "zstd" or None
+
+    Returns:
+        bytes: Decompressed data
+    """
+    if not encoding:
+        return data
+    if encoding == GZIP:
+        return gzip.decompress(data)
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd encoded data")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def iter_decompress(chunks: Iterable[bytes], encoding: str | None) -> Iterator[bytes]:
+    """Decompress a stream of chunks without buffering the whole payload.
+
+    Args:
+        chunks (Iterable[bytes]): Compressed chunks
+        encoding (Optional[str]): "gzip", "zstd" or None
+
+    Yields:
+        bytes: Decompressed chunks
+    """
+    if not encoding:
+        yield from chunks
+        return
+    if encoding == GZIP:
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    elif encoding == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd encoded data")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    for chunk in chunks:
+        out = decompressor.decompress(chunk)
+        if out:
+            yield out
+    if encoding == GZIP:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def accepts_encoding(accept_encoding: str | None, encoding: str | None) -> bool:
+    """Check whether an Accept-Encoding header allows serving data in an encoding as is.
+
+    Args:
+        accept_encoding (Optional[str]): Value of the client's Accept-Encoding header
+        encoding (Optional[str]): Encoding of the stored data
+
+    Returns:
+        bool: True if the client accepts the encoding
+    """
+    if not accept_encoding or not encoding:
+        return False
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() != encoding:
+            continue
+        # Honor an explicit q=0 refusal
+        return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bounds and starting point of the concurrency limit per LLM endpoint
+LLM_CONCURRENCY_INITIAL = float(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+LLM_CONCURRENCY_MIN = float(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = float(os.getenv("LLM_CONCURRENCY_MAX", "64"))
+# Multiplicative decrease on 429/5xx/timeouts, and on calls slower than
+# LLM_CONCURRENCY_LATENCY_TOLERANCE times the smoothed latency
+LLM_CONCURRENCY_ERROR_BACKOFF = float(os.getenv("LLM_CONCURRENCY_ERROR_BACKOFF", "0.5"))
+LLM_CONCURRENCY_LATENCY_BACKOFF = float(
+    os.getenv("LLM_CONCURRENCY_LATENCY_BACKOFF", "0.9")
+)
+LLM_CONCURRENCY_LATENCY_TOLERANCE = float(
+    os.getenv("LLM_CONCURRENCY_LATENCY_TOLERANCE", "2.0")
+)
+
+# Errors that mean the endpoint is overloaded rather than the request being bad
+_OVERLOAD_PATTERN = re.compile(
+    r"\b(429|500|502|503|504)\b|too many requests|timed? ?out|timeout", re.IGNORECASE
+)
+_OVERLOAD_STATUS_CODES = {429, 500, 502, 503, 504}
+# Weight of the newest sample in the smoothed latency
+_LATENCY_SMOOTHING = 0.2
+
+
+def is_overload_error(error: BaseException | str) -> bool:
+    """Check whether an error signals endpoint overload (429, 5xx or timeout).
+
+    Args:
+        error (Union[BaseException, str]): Exception or its message
+
+    Returns:
+        bool: True if the endpoint should get less concurrency
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    for source in (error, getattr(error, "response", None)):
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if isinstance(status, int) and status in _OVERLOAD_STATUS_CODES:
+            return True
+    return bool(_OVERLOAD_PATTERN.search(str(error)))
+
+
+@dataclass
+class Slot:
+    """A concurrency slot held by a call.
+
+    Attributes:
+        latency (Optional[float]): Seconds the call spent waiting on the endpoint.
+            Left None, the time the slot was held is used. Streams set it to leave out
+            the time their consumer takes between chunks.
+    """
+
+    latency: float | None = None
+
+
+class AdaptiveLimiter:
+    """Concurrency limit for one endpoint, adjusted by AIMD.
+
+    Each successful call at normal latency raises the limit by 1/limit, about one
+    slot per limit's worth of calls. Overload errors and slow calls cut it by a
+    factor, at most once per smoothed latency so one burst counts once. Callers
+    over the limit wait in FIFO order. Slots can be taken from threads and from
+    any event loop.
+
+    Attributes:
+        name (str): Endpoint the limiter governs, for logs and metrics
+        limit (float): Current concurrency limit
+        in_flight (int): Calls holding a slot
+        latency (Optional[float]): Smoothed latency of successful calls in seconds
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: float = LLM_CONCURRENCY_INITIAL,
+        min_limit: float = LLM_CONCURRENCY_MIN,
+        max_limit: float = LLM_CONCURRENCY_MAX,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min(max(initial, min_limit), max_limit)
+        self.in_flight = 0
+        self.latency: float | None = None
+        self._lock = threading.Lock()
+        self._waiters: deque[threading.Event | tuple[Any, asyncio.Future]] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Number of callers waiting for a slot."""
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _wake(self):
+        """Hand free slots to waiters in order. Caller holds the lock."""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if isinstance(waiter, threading.Event):
+                self.in_flight += 1
+                waiter.set()
+                continue
+            loop, future = waiter
+            if future.done():
+                # Cancelled while queued
+                continue
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: asyncio.Future):
+        """Complete a woken waiter on its own loop, passing the slot on if it left."""
+        if future.cancelled():
+            with self._lock:
+                self.in_flight -= 1
+                self._wake()
+        else:
+            future.set_result(None)
+
+    def _release(self, latency: float | None, error: BaseException | None):
+        with self._lock:
+            self.in_flight -= 1
+            if error is not None:
+                if is_overload_error(error):
+                    self._decrease(LLM_CONCURRENCY_ERROR_BACKOFF, "overload error")
+            elif latency is not None:
+                self._observe_latency(latency)
+            self._wake()
+
+    def _observe_latency(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+            return
+        if latency > self.latency * LLM_CONCURRENCY_LATENCY_TOLERANCE:
+            self._decrease(
+                LLM_CONCURRENCY_LATENCY_BACKOFF, f"slow call ({latency:.1f}s)"
+            )
+        else:
+            self.limit = min(self.limit + 1.0 / self.limit, self.max_limit)
+        self.latency += _LATENCY_SMOOTHING * (latency - self.latency)
+
+    def _decrease(self, factor: float, reason: str):
+        now = time.monotonic()
+        if self.latency is not None and now - self._last_decrease < self.latency:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.limit * factor, self.min_limit)
+        logger.info(
+            f"Concurrency limit for {self.name} lowered from {previous:.1f} to "
+            f"{self.limit:.1f}: {reason}"
+        )
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for a blocking call, waiting while the endpoint is at its limit.
+
+        Yields the Slot, on which the call may report its latency.
+        """
+        event = None
+        with self._lock:
+            if not self._waiters and self._has_capacity():
+                self.in_flight += 1
+            else:
+                event = threading.Event()
+                self._waiters.append(event)
+        if event is not None:
+            event.wait()
+        start = time.monotonic()
+        slot = Slot()
+        try:
+            yield slot
+        except BaseException as e:
+            self._release(None, e)
+            raise
+        self._release(self._latency(slot, start), None)
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Hold a slot for an async call, waiting while the endpoint is at its limit.
+
+        Yields the Slot, on which the call may report its latency.
+        """
+        future = None
+        with self._lock:
+            if not self._waiters and self._has_capacity():
+                self.in_flight += 1
+            else:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+        if future is not None:
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if not future.cancelled():
+                        # Granted, then cancelled before resuming; give the slot back
+                        self.in_flight -= 1
+                        self._wake()
+                    elif (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+                raise
+        start = time.monotonic()
+        slot = Slot()
+        try:
+            yield slot
+        except BaseException as e:
+            self._release(None, e)
+            raise
+        self._release(self._latency(slot, start), None)
+
+    @staticmethod
+    def _latency(slot: Slot, start: float) -> float:
+        """Latency reported for a slot, or else how long it was held."""
+        return slot.latency if slot.latency is not None else time.monotonic() - start
+
+    def stats(self) -> dict[str, Any]:
+        """Current limit, in-flight calls, queue depth and smoothed latency."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+        }
+
+
+_registry_lock = threading.Lock()
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(name: str) -> AdaptiveLimiter:
+    """Get the process-wide limiter for an endpoint, creating it on first use.
+
+    Args:
+        name (str): Endpoint key, e.g. "<api_base>|<model>"
+
+    Returns:
+        AdaptiveLimiter: Limiter shared by every caller of the endpoint
+    """
+    with _registry_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = AdaptiveLimiter(name)
+        return limiter
+
+
+def limiter_stats() -> dict[str, dict[str, Any]]:
+    """Stats of every limiter in the process, by endpoint key."""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def register_limiter_metrics(meter) -> None:
+    """Expose limit, in-flight and queue depth gauges of all limiters.
+
+    Args:
+        meter: OpenTelemetry meter to create the observable gauges on
+    """
+    from opentelemetry.metrics import Observation
+
+    def observe(field: str) -> Callable:
+        def callback(options):
+            return [
+                Observation(stats[field], {"endpoint": name})
+                for name, stats in limiter_stats().items()
+            ]
+
+        return callback
+
+    meter.create_observable_gauge(
+        "llm.concurrency.limit",
+        callbacks=[observe("limit")],
+        description="Adaptive concurrency limit per LLM endpoint",
+    )
+    meter.create_observable_gauge(
+        "llm.concurrency.in_flight",
+        callbacks=[observe("in_flight")],
+        description="LLM calls in flight per endpoint",
+    )
+    meter.create_observable_gauge(
+        "llm.concurrency.queued",
+        callbacks=[observe("queued")],
+        description="LLM calls waiting for a slot per endpoint",
+    )
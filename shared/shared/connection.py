@@ -1,13 +1,11 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set
-import redis
+from typing import Dict, Optional, Set
+import redis.asyncio as aioredis
 import ujson as json
 import logging
-import time
 import asyncio
 from collections import defaultdict
-from threading import Thread
-import queue
+from shared.redis_pool import get_async_redis
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,29 +20,31 @@ class ConnectionManager:
     - Redis pub/sub subscription for status updates
     - Broadcasting messages to connected clients
     - Connection cleanup and resource management
+
+    The pub/sub subscription runs as a task on the event loop using the pooled async
+    Redis client, so no background thread or cross-thread queue is needed.
     
     Attributes:
         active_connections (Dict[str, Set[WebSocket]]): Maps job IDs to sets of active WebSocket connections
         pubsub: Redis pub/sub connection
-        message_queue (Queue): Thread-safe queue for message processing
-        redis_thread (Thread): Background thread for Redis subscription
-        should_stop (bool): Flag to control background thread termination
-        redis_client (redis.Redis): Redis client instance
+        listener_task (asyncio.Task): Task consuming Redis pub/sub messages
+        should_stop (bool): Flag to control listener termination
+        redis_client (redis.asyncio.Redis): Async Redis client instance
     """
 
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: Optional[aioredis.Redis] = None):
         """
         Initialize the connection manager.
         
         Args:
-            redis_client (redis.Redis): Redis client for pub/sub functionality
+            redis_client (redis.asyncio.Redis, optional): Async Redis client for pub/sub
+                functionality. Defaults to the shared pooled client.
         """
         self.active_connections: Dict[str, Set[WebSocket]] = defaultdict(set)
         self.pubsub = None
-        self.message_queue = queue.Queue()
-        self.redis_thread = None
+        self.listener_task: Optional[asyncio.Task] = None
         self.should_stop = False
-        self.redis_client = redis_client
+        self.redis_client = redis_client or get_async_redis()
 
     async def connect(self, websocket: WebSocket, job_id: str):
         """
@@ -61,12 +61,8 @@ class ConnectionManager:
         )
 
         # Start Redis listener if not already running
-        if self.redis_thread is None:
-            self.redis_thread = Thread(target=self._redis_listener)
-            self.redis_thread.daemon = True
-            self.redis_thread.start()
-            # Start the async message processor
-            asyncio.create_task(self._process_messages())
+        if self.listener_task is None or self.listener_task.done():
+            self.listener_task = asyncio.create_task(self._redis_listener())
 
     def disconnect(self, websocket: WebSocket, job_id: str):
         """
@@ -77,91 +73,73 @@ class ConnectionManager:
             job_id (str): ID of the job the connection was monitoring
         """
         if job_id in self.active_connections:
-            self.active_connections[job_id].remove(websocket)
+            self.active_connections[job_id].discard(websocket)
             if not self.active_connections[job_id]:
                 del self.active_connections[job_id]
             logger.info(
                 f"WebSocket disconnected for job {job_id}. Remaining connections: {len(self.active_connections[job_id]) if job_id in self.active_connections else 0}"
             )
 
-    def _redis_listener(self):
+    async def _redis_listener(self):
         """
-        Background thread that listens for Redis pub/sub messages.
+        Task that listens for Redis pub/sub messages.
         
-        Subscribes to the status_updates:all channel and queues received messages
-        for processing by the async message processor.
+        Subscribes to the status_updates:all channel and broadcasts each received
+        message. Resubscribes after a short delay if the subscription fails.
         """
-        try:
-            self.pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
-            self.pubsub.subscribe("status_updates:all")
-            logger.info("Successfully subscribed to Redis status_updates:all channel")
-
-            while not self.should_stop:
-                message = self.pubsub.get_message()
-                if message and message["type"] == "message" and "data" in message:
-                    data = message["data"].decode("utf-8")
-                    try:
-                        job_update = json.loads(data)
-                        logger.info(
-                            f"Received message for job {job_update.get('job_id')}"
-                        )
-                    except json.JSONDecodeError:
-                        logger.error("Invalid JSON in Redis message")
-                    # Put message in queue for processing regardless of logging logic error
-                    finally:
-                        self.message_queue.put(data)
-                time.sleep(0.01)  # Prevent tight loop
-
-        except Exception as e:
-            logger.error(f"Redis subscription error: {e}")
-        finally:
-            if self.pubsub:
-                self.pubsub.unsubscribe()
-                self.pubsub.close()
+        while not self.should_stop:
+            try:
+                self.pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                await self.pubsub.subscribe("status_updates:all")
+                logger.info("Successfully subscribed to Redis status_updates:all channel")
+
+                async for message in self.pubsub.listen():
+                    if self.should_stop:
+                        break
+                    if message["type"] == "message" and "data" in message:
+                        await self._process_message(message["data"].decode("utf-8"))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis subscription error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if self.pubsub:
+                    await self.pubsub.aclose()
+                    self.pubsub = None
 
-    async def _process_messages(self):
+    async def _process_message(self, message: str):
         """
-        Async task that processes queued messages and broadcasts them to clients.
+        Broadcast a status update message to the clients watching its job.
         
-        Continuously checks the message queue and broadcasts valid messages
-        to all connected WebSocket clients for the relevant job ID.
+        Args:
+            message (str): JSON encoded status update received from Redis
         """
-        while True:
-            try:
-                # Check queue in a non-blocking way
-                while not self.message_queue.empty():
-                    message: str = self.message_queue.get_nowait()
-                    try:
-                        update = json.loads(message)
-                        job_id = update.get("job_id")
-                        logger.info(f"Processing message for job {job_id}")
-
-                        if job_id and job_id in self.active_connections:
-                            logger.info(
-                                f"Broadcasting update for job {job_id} to {len(self.active_connections[job_id])} connections"
-                            )
-                            await self.broadcast_to_job(
-                                job_id,
-                                {
-                                    "service": update.get("service"),
-                                    "status": update.get("status"),
-                                    "message": update.get("message", ""),
-                                },
-                            )
-                            logger.info(
-                                f"Broadcasted update for job {job_id}: {update.get('service')} - {update.get('status')}"
-                            )
-                    except json.JSONDecodeError:
-                        logger.error(f"Invalid JSON in Redis message: {message}")
-                    except Exception as e:
-                        logger.error(f"Error processing Redis message: {e}")
-
-                # Small delay before next check
-                await asyncio.sleep(0.01)
-
-            except Exception as e:
-                logger.error(f"Message processing error: {e}")
-                await asyncio.sleep(1)
+        try:
+            update = json.loads(message)
+            job_id = update.get("job_id")
+            logger.info(f"Processing message for job {job_id}")
+
+            if job_id and job_id in self.active_connections:
+                logger.info(
+                    f"Broadcasting update for job {job_id} to {len(self.active_connections[job_id])} connections"
+                )
+                await self.broadcast_to_job(
+                    job_id,
+                    {
+                        "service": update.get("service"),
+                        "status": update.get("status"),
+                        "message": update.get("message", ""),
+                    },
+                )
+                logger.info(
+                    f"Broadcasted update for job {job_id}: {update.get('service')} - {update.get('status')}"
+                )
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON in Redis message: {message}")
+        except Exception as e:
+            logger.error(f"Error processing Redis message: {e}")
 
     async def broadcast_to_job(self, job_id: str, message: dict):
         """
@@ -186,14 +164,17 @@ class ConnectionManager:
             for connection in disconnected:
                 self.disconnect(connection, job_id)
 
-    def cleanup(self):
+    async def cleanup(self):
         """
         Clean up resources used by the connection manager.
         
-        Stops the Redis listener thread and closes the pub/sub connection.
+        Stops the Redis listener task and closes the pub/sub connection.
         """
         self.should_stop = True
-        if self.redis_thread:
-            self.redis_thread.join(timeout=1.0)
-        if self.pubsub:
-            self.pubsub.close()
+        if self.listener_task:
+            self.listener_task.cancel()
+            try:
+                await self.listener_task
+            except asyncio.CancelledError:
+                pass
+            self.listener_task = None
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Sequence
+from typing import Any, Callable
+
+from opentelemetry.trace.status import StatusCode
+from pydantic import BaseModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TaskTiming(BaseModel):
+    """Timing of one task of a graph run, in seconds since the run started.
+
+    Attributes:
+        name (str): Task name
+        deps (List[str]): Tasks it waited for
+        ready (float): When its last dependency finished
+        start (float): When it started running
+        end (float): When it finished
+    """
+
+    name: str
+    deps: list[str]
+    ready: float
+    start: float
+    end: float
+
+
+class GraphTiming(BaseModel):
+    """Timing of a graph run.
+
+    Attributes:
+        name (str): Graph name
+        total (float): Seconds from the start of the run to the last task finishing
+        critical_path (List[str]): Chain of tasks, each waiting on the previous one,
+            that ends with the last task to finish; the run can't be faster than it
+        critical_path_time (float): Seconds the critical path's tasks spent running
+        tasks (List[TaskTiming]): Timing of every task, in the order they were added
+    """
+
+    name: str
+    total: float
+    critical_path: list[str]
+    critical_path_time: float
+    tasks: list[TaskTiming]
+
+
+class TaskGraph:
+    """Run async tasks as soon as the tasks they depend on have finished.
+
+    Each task is a coroutine function called with the results of its dependencies,
+    in the order they were listed. Tasks can add further tasks while the graph runs,
+    e.g. one task per item of a list another task produced; they start right away.
+    If a task fails, the others are cancelled and run() raises its exception.
+
+    Every task runs in its own span, and timing() reports when each task became
+    ready, started and finished, and the critical path of the run.
+
+    Attributes:
+        name (str): Graph name, used for spans and logs
+    """
+
+    def __init__(self, name: str, telemetry=None):
+        self.name = name
+        self.telemetry = telemetry
+        self._funcs: dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._deps: dict[str, list[str]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._timings: dict[str, TaskTiming] = {}
+        self._started: float | None = None
+        self._new_task: asyncio.Event | None = None
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        deps: Sequence[str] = (),
+    ) -> str:
+        """Add a task.
+
+        Args:
+            name (str): Unique task name
+            func (Callable[..., Awaitable[Any]]): Coroutine function called with the
+                results of deps
+            deps (Sequence[str]): Names of tasks that must finish first, all added
+                before this one, which keeps the graph acyclic
+
+        Returns:
+            str: The task name, to list as a dependency of later tasks
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        if name in self._funcs:
+            raise ValueError(f"Task {name} already exists in graph {self.name}")
+        missing = [dep for dep in deps if dep not in self._funcs]
+        if missing:
+            raise ValueError(f"Task {name} depends on unknown tasks {missing}")
+        self._funcs[name] = func
+        self._deps[name] = list(deps)
+        if self._started is not None:
+            self._start(name)
+        return name
+
+    def _start(self, name: str):
+        self._tasks[name] = asyncio.create_task(self._run_task(name), name=name)
+        self._new_task.set()
+
+    def _elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    async def _run_task(self, name: str) -> Any:
+        deps = self._deps[name]
+        results = [await self._tasks[dep] for dep in deps]
+        ready = self._elapsed()
+        if self.telemetry is None:
+            start = self._elapsed()
+            result = await self._funcs[name](*results)
+        else:
+            with self.telemetry.tracer.start_as_current_span(
+                f"{self.name}.{name}"
+            ) as span:
+                span.set_attribute("deps", deps)
+                start = self._elapsed()
+                try:
+                    result = await self._funcs[name](*results)
+                except Exception as e:
+                    span.set_status(StatusCode.ERROR)
+                    span.record_exception(e)
+                    raise
+        self._timings[name] = TaskTiming(
+            name=name, deps=deps, ready=ready, start=start, end=self._elapsed()
+        )
+        return result
+
+    async def run(self) -> dict[str, Any]:
+        """Run every task, including tasks added while running.
+
+        Returns:
+            Dict[str, Any]: Result of every task by name
+
+        Raises:
+            Exception: The first exception raised by a task
+        """
+        self._new_task = asyncio.Event()
+        self._started = time.monotonic()
+        for name in list(self._funcs):
+            self._start(name)
+
+        try:
+            while True:
+                pending = [task for task in self._tasks.values() if not task.done()]
+                failed = [
+                    task
+                    for task in self._tasks.values()
+                    if task.done() and not task.cancelled() and task.exception()
+                ]
+                if failed:
+                    raise failed[0].exception()
+                if not pending:
+                    break
+                self._new_task.clear()
+                waiter = asyncio.ensure_future(self._new_task.wait())
+                await asyncio.wait(
+                    pending + [waiter], return_when=asyncio.FIRST_COMPLETED
+                )
+                waiter.cancel()
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            # Let cancelled tasks unwind before returning
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+        logger.info(
+            f"Graph {self.name} ran {len(self._tasks)} tasks in {self._elapsed():.1f}s"
+        )
+        return {name: task.result() for name, task in self._tasks.items()}
+
+    def timing(self) -> GraphTiming:
+        """Timing and critical path of the tasks that finished."""
+        timings = [self._timings[name] for name in self._funcs if name in self._timings]
+        if not timings:
+            return GraphTiming(
+                name=self.name,
+                total=0.0,
+                critical_path=[],
+                critical_path_time=0.0,
+                tasks=[],
+            )
+
+        # Walk back from the last task to finish through the dependency that
+        # finished last, i.e. the one it actually waited for
+        path: list[TaskTiming] = []
+        current: TaskTiming | None = max(timings, key=lambda t: t.end)
+        while current is not None:
+            path.append(current)
+            deps = [self._timings[dep] for dep in current.deps if dep in self._timings]
+            current = max(deps, key=lambda t: t.end) if deps else None
+        path.reverse()
+
+        return GraphTiming(
+            name=self.name,
+            total=max(t.end for t in timings),
+            critical_path=[t.name for t in path],
+            critical_path_time=sum(t.end - t.start for t in path),
+            tasks=timings,
+        )
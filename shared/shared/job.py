@@ -1,9 +1,51 @@
-from shared.api_types import ServiceType
+from shared.api_types import ServiceType, JobStatus
 from shared.otel import OpenTelemetryInstrumentation
-import redis
+from shared.compression import compress, iter_decompress, resolve_encoding
+from shared.redis_pool import get_redis
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+import os
 import time
 import ujson as json
 import threading
+import logging
+
+if TYPE_CHECKING:
+    from shared.storage import StorageManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Statuses that end a job. These are never held back by coalescing.
+TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED}
+
+# Maximum number of entries kept in a job's event log
+EVENT_LOG_MAX_LEN = 500
+
+# Results larger than this many bytes are spilled out of Redis
+RESULT_SPILL_THRESHOLD = int(os.getenv("RESULT_SPILL_THRESHOLD", str(1024 * 1024)))
+# Local directory used for spilled results when no storage manager is configured
+RESULT_SPILL_DIR = os.getenv("RESULT_SPILL_DIR", "/tmp/job-results")
+# TTL in seconds of the Redis pointer to a spilled result
+RESULT_POINTER_TTL = int(os.getenv("RESULT_POINTER_TTL", str(60 * 60 * 4)))
+# Chunk size used when streaming results
+RESULT_CHUNK_SIZE = 64 * 1024
+
+# Time-to-live in seconds applied to status, event and result keys at write time.
+# 0 disables write-time expiry.
+JOB_TTL = int(os.getenv("JOB_TTL", str(60 * 60 * 24)))
+# Age in seconds after which the background reaper removes a job
+JOB_MAX_AGE = int(os.getenv("JOB_MAX_AGE", str(JOB_TTL or 60 * 60 * 24)))
+# Seconds between background reaper passes. 0 disables the reaper.
+JOB_REAPER_INTERVAL = int(os.getenv("JOB_REAPER_INTERVAL", "300"))
+# Number of jobs expired per pipelined batch
+JOB_CLEANUP_BATCH_SIZE = 500
+
+# Prefix marking a Redis result value as a pointer to a spilled payload
+SPILL_MARKER = b"\x00spill:"
+# Prefix marking a Redis result value as compressed, followed by "<encoding>:"
+ENCODED_MARKER = b"\x00enc:"
+# Storage user namespace holding spilled results
+SPILL_USER_ID = "_results"
 
 
 class JobStatusManager:
@@ -12,20 +54,39 @@ class JobStatusManager:
     
     This class provides methods to track job status, store results, and manage cleanup
     of old jobs. It uses Redis hash sets for status storage and Redis pub/sub for 
-    real-time status updates.
+    real-time status updates. A status write, its publish and the optional event log
+    append are sent to Redis as a single pipelined transaction.
+
+    Results above RESULT_SPILL_THRESHOLD bytes are not kept in Redis. They are spilled
+    to object storage (when a storage manager is given) or to local disk, and Redis
+    only holds a small pointer with a TTL. Results can optionally be compressed, in
+    which case the encoding is recorded with the value and reads decompress transparently.
+
+    Job creation times are indexed in a per-service sorted set so expiry only touches
+    expired jobs. Status, event and result keys also get a TTL when written.
     
     Attributes:
         telemetry (OpenTelemetryInstrumentation): Telemetry instrumentation instance
         redis (redis.Redis): Redis client instance
         service_type (ServiceType): Type of service using this manager
+        storage_manager (StorageManager): Object storage used for spilled results, if any
+        event_log (bool): Whether status updates are appended to a per-job event log
+        coalesce_interval (float): Minimum seconds between non-terminal updates per job
         _lock (threading.Lock): Thread lock for synchronization
+        _flush_lock (threading.Lock): Orders held-back updates before terminal ones
+        _last_update (Dict[str, float]): Monotonic time of the last update sent per job
+        _held (Dict[str, Tuple[str, str]]): Latest held-back status and message per job
+        _flush_timers (Dict[str, threading.Timer]): Timers writing held-back updates
     """
 
     def __init__(
         self,
         service_type: ServiceType,
         telemetry: OpenTelemetryInstrumentation,
-        redis_url="redis://redis:6379",
+        redis_url: Optional[str] = None,
+        storage_manager: Optional["StorageManager"] = None,
+        event_log: Optional[bool] = None,
+        coalesce_interval: Optional[float] = None,
     ):
         """
         Initialize the JobStatusManager.
@@ -33,12 +94,159 @@ class JobStatusManager:
         Args:
             service_type (ServiceType): Type of service using this manager
             telemetry (OpenTelemetryInstrumentation): Telemetry instrumentation instance
-            redis_url (str, optional): Redis connection URL. Defaults to "redis://redis:6379"
+            redis_url (str, optional): Redis connection URL. Defaults to the REDIS_URL
+                env var. Clients share the process-wide pool for the URL.
+            storage_manager (StorageManager, optional): Storage for spilled results.
+                Results spill to RESULT_SPILL_DIR on local disk when not provided
+            event_log (bool, optional): Append every status update to an event log.
+                Defaults to the JOB_STATUS_EVENT_LOG env var (false)
+            coalesce_interval (float, optional): Hold back non-terminal updates for a
+                job that arrive within this many seconds of the previous one; the
+                latest is written when the interval ends. Defaults to the
+                JOB_STATUS_COALESCE_INTERVAL env var (0, disabled)
         """
         self.telemetry = telemetry
-        self.redis = redis.Redis.from_url(redis_url, decode_responses=False)
+        self.redis = get_redis(redis_url)
         self.service_type = service_type
+        self.storage_manager = storage_manager
+        self.event_log = (
+            event_log
+            if event_log is not None
+            else os.getenv("JOB_STATUS_EVENT_LOG", "false").lower() == "true"
+        )
+        self.coalesce_interval = (
+            coalesce_interval
+            if coalesce_interval is not None
+            else float(os.getenv("JOB_STATUS_COALESCE_INTERVAL", "0"))
+        )
         self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_update: Dict[str, float] = {}
+        self._held: Dict[str, Tuple[str, str]] = {}
+        self._flush_timers: Dict[str, threading.Timer] = {}
+        self._reaper_thread: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+
+    @property
+    def _index_key(self) -> str:
+        """Sorted set of job IDs scored by creation time for this service."""
+        return f"jobs:created:{self.service_type!s}"
+
+    def _job_keys(self, job_id: str) -> List[str]:
+        """All Redis keys owned by a job for this service."""
+        return [
+            f"status:{job_id}:{self.service_type!s}",
+            f"result:{job_id}:{self.service_type!s}",
+            f"events:{job_id}:{self.service_type!s}",
+        ]
+
+    def _forget(self, job_id: str) -> None:
+        """Drop the coalescing state of a job, including any held-back update."""
+        with self._lock:
+            self._last_update.pop(job_id, None)
+            self._held.pop(job_id, None)
+            timer = self._flush_timers.pop(job_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _should_coalesce(self, job_id: str, status: str, message: str) -> bool:
+        """
+        Decide whether a status update is held back to rate-limit a job.
+
+        A held-back update replaces any earlier one and is written once the job's
+        interval ends, unless a newer update is sent first. Terminal updates are
+        never held back.
+
+        Args:
+            job_id (str): Job identifier
+            status (str): Status value of the update
+            message (str): Status message of the update
+
+        Returns:
+            bool: True if the update was held back
+        """
+        if status in TERMINAL_STATUSES or self.coalesce_interval <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_update.get(job_id)
+            if last is not None and now - last < self.coalesce_interval:
+                self._held[job_id] = (status, message)
+                if job_id not in self._flush_timers:
+                    timer = threading.Timer(
+                        self.coalesce_interval - (now - last),
+                        self._flush_held,
+                        args=(job_id,),
+                    )
+                    timer.daemon = True
+                    self._flush_timers[job_id] = timer
+                    timer.start()
+                return True
+            self._last_update[job_id] = now
+            self._held.pop(job_id, None)
+            timer = self._flush_timers.pop(job_id, None)
+        if timer is not None:
+            timer.cancel()
+        return False
+
+    def _flush_held(self, job_id: str) -> None:
+        """Write the update held back for a job, if a newer one hasn't replaced it."""
+        with self._flush_lock:
+            with self._lock:
+                self._flush_timers.pop(job_id, None)
+                held = self._held.pop(job_id, None)
+                if held is None:
+                    return
+                self._last_update[job_id] = time.monotonic()
+            with self.telemetry.tracer.start_as_current_span("job.flush_status") as span:
+                span.set_attribute("job_id", job_id)
+                try:
+                    self._write_status(job_id, *held, span)
+                except Exception:
+                    logger.exception(f"Failed to write held-back status of job {job_id}")
+
+    def _write_status(
+        self, job_id: str, status: str, message: str, span, created: bool = False
+    ) -> None:
+        """
+        Write a status update, publish it and append it to the event log in one round trip.
+
+        Args:
+            job_id (str): Job identifier
+            status (str): Status value
+            message (str): Status message
+            span: Active span to annotate
+            created (bool, optional): Also index the job's creation time. Defaults to False.
+        """
+        update = {
+            "job_id": job_id,
+            "status": status,
+            "message": message,
+            "service": self.service_type,
+            "timestamp": time.time(),
+        }
+        # Encode the update dict as JSON bytes
+        payload = json.dumps(update).encode()
+        hset_key = f"status:{job_id}:{self.service_type!s}"
+        span.set_attribute("hset_key", hset_key)
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(
+            hset_key,
+            mapping={k: str(v).encode() for k, v in update.items()},
+        )
+        if JOB_TTL:
+            pipe.expire(hset_key, JOB_TTL)
+        pipe.publish("status_updates:all", payload)
+        if self.event_log:
+            events_key = f"events:{job_id}:{self.service_type!s}"
+            pipe.rpush(events_key, payload)
+            pipe.ltrim(events_key, -EVENT_LOG_MAX_LEN, -1)
+            if JOB_TTL:
+                pipe.expire(events_key, JOB_TTL)
+        if created:
+            pipe.zadd(self._index_key, {job_id: update["timestamp"]})
+        pipe.execute()
 
     def create_job(self, job_id: str):
         """
@@ -49,25 +257,15 @@ class JobStatusManager:
         """
         with self.telemetry.tracer.start_as_current_span("job.create_job") as span:
             span.set_attribute("job_id", job_id)
-            update = {
-                "job_id": job_id,
-                "status": "pending",
-                "message": "Job created",
-                "service": self.service_type,
-                "timestamp": time.time(),
-            }
-            # Encode the update dict as JSON bytes
-            hset_key = f"status:{job_id}:{str(self.service_type)}"
-            span.set_attribute("hset_key", hset_key)
-            self.redis.hset(
-                hset_key,
-                mapping={k: str(v).encode() for k, v in update.items()},
-            )
-            self.redis.publish("status_updates:all", json.dumps(update).encode())
+            self._write_status(job_id, "pending", "Job created", span, created=True)
 
     def update_status(self, job_id: str, status: str, message: str):
         """
         Update the status of an existing job.
+
+        Non-terminal updates are held back when coalescing is enabled and the job
+        was updated less than coalesce_interval seconds ago; the latest one is
+        written when the interval ends.
         
         Args:
             job_id (str): Job identifier
@@ -76,37 +274,187 @@ class JobStatusManager:
         """
         with self.telemetry.tracer.start_as_current_span("job.update_status") as span:
             span.set_attribute("job_id", job_id)
-            update = {
-                "job_id": job_id,
-                "status": status,
-                "message": message,
-                "service": self.service_type,
-                "timestamp": time.time(),
+            if status in TERMINAL_STATUSES:
+                # Wait for a held-back update being written so it can't land last
+                with self._flush_lock:
+                    self._forget(job_id)
+                    self._write_status(job_id, status, message, span)
+                return
+            if self._should_coalesce(job_id, status, message):
+                span.set_attribute("coalesced", True)
+                return
+            self._write_status(job_id, status, message, span)
+
+    def _spill_filename(self) -> str:
+        """Name of the spilled result object for this service."""
+        return f"{self.service_type.value}_result.bin"
+
+    def _spill_path(self, job_id: str) -> str:
+        """Local disk path of a spilled result for this service."""
+        return os.path.join(RESULT_SPILL_DIR, self.service_type.value, f"{job_id}.bin")
+
+    def _spill(self, job_id: str, result: bytes, encoding: Optional[str]) -> dict:
+        """
+        Move a large result out of Redis.
+
+        Args:
+            job_id (str): Job identifier
+            result (bytes): Result data to spill, already encoded
+            encoding (Optional[str]): Content encoding of the result, if compressed
+
+        Returns:
+            dict: Pointer describing where the result was written
+        """
+        if self.storage_manager is not None:
+            self.storage_manager.store_file(
+                SPILL_USER_ID,
+                job_id,
+                result,
+                self._spill_filename(),
+                "application/octet-stream",
+            )
+            return {
+                "backend": "storage",
+                "path": self._spill_filename(),
+                "size": len(result),
+                "encoding": encoding,
             }
-            # Encode the update dict as JSON bytes
-            hset_key = f"status:{job_id}:{str(self.service_type)}"
-            span.set_attribute("hset_key", hset_key)
-            self.redis.hset(
-                hset_key,
-                mapping={k: str(v).encode() for k, v in update.items()},
+
+        path = self._spill_path(job_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(result)
+        os.replace(tmp_path, path)
+        return {"backend": "disk", "path": path, "size": len(result), "encoding": encoding}
+
+    def _store_result(
+        self,
+        job_id: str,
+        result: bytes,
+        ex: Optional[int],
+        compression: Optional[str],
+        span,
+    ) -> None:
+        """
+        Store a result in Redis, compressing it and spilling it first if requested or too large.
+
+        Args:
+            job_id (str): Job identifier
+            result (bytes): Result data to store
+            ex (Optional[int]): Expiration time in seconds. Defaults to JOB_TTL for
+                results kept in Redis and RESULT_POINTER_TTL for spilled results.
+            compression (Optional[str]): Content encoding to compress with, if any
+            span: Active span to annotate
+        """
+        set_key = f"result:{job_id}:{self.service_type!s}"
+        span.set_attribute("set_key", set_key)
+        span.set_attribute("size", len(result))
+        encoding = resolve_encoding(compression)
+        if encoding:
+            result = compress(result, encoding)
+            span.set_attribute("encoding", encoding)
+            span.set_attribute("encoded_size", len(result))
+
+        if len(result) <= RESULT_SPILL_THRESHOLD:
+            value = (
+                ENCODED_MARKER + encoding.encode() + b":" + result if encoding else result
             )
-            self.redis.publish("status_updates:all", json.dumps(update).encode())
+            self.redis.set(set_key, value, ex=ex if ex is not None else JOB_TTL or None)
+            return
+
+        pointer = self._spill(job_id, result, encoding)
+        span.set_attribute("spilled", pointer["backend"])
+        self.redis.set(
+            set_key,
+            SPILL_MARKER + json.dumps(pointer).encode(),
+            ex=ex if ex is not None else RESULT_POINTER_TTL,
+        )
+        logger.info(
+            f"Spilled {len(result)} byte result for job {job_id} to {pointer['backend']}"
+        )
 
-    def set_result(self, job_id: str, result: bytes):
+    def _iter_spilled(self, job_id: str, pointer: dict) -> Optional[Iterator[bytes]]:
+        """
+        Stream a spilled result from where its pointer says it lives.
+
+        Args:
+            job_id (str): Job identifier
+            pointer (dict): Pointer stored in Redis
+
+        Returns:
+            Optional[Iterator[bytes]]: Result chunks, None if the payload is gone
+        """
+        if pointer["backend"] == "storage":
+            if self.storage_manager is None:
+                raise RuntimeError(
+                    f"Result for job {job_id} was spilled to storage but no storage manager is configured"
+                )
+            return self.storage_manager.open_stream(
+                SPILL_USER_ID, job_id, pointer["path"], RESULT_CHUNK_SIZE
+            )
+
+        path = pointer["path"]
+        if not os.path.exists(path):
+            return None
+
+        def _chunks():
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(RESULT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return _chunks()
+
+    def _delete_spilled(self, job_ids: List[str]) -> None:
+        """
+        Remove the spilled results of jobs, if any.
+
+        Spilled results are named after the job and service, so they are found
+        even after the Redis pointer to them has expired.
+
+        Args:
+            job_ids (List[str]): Job identifiers
+        """
+        for job_id in job_ids:
+            try:
+                os.unlink(self._spill_path(job_id))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Failed to delete spilled result for job {job_id}: {e}")
+        if self.storage_manager is not None and job_ids:
+            deleted = self.storage_manager.delete_many(
+                [(SPILL_USER_ID, job_id, self._spill_filename()) for job_id in job_ids]
+            )
+            if not deleted:
+                logger.error(f"Failed to delete spilled results for jobs {job_ids}")
+
+    def set_result(
+        self, job_id: str, result: bytes, compression: Optional[str] = None
+    ):
         """
         Store the result data for a job.
+
+        Results larger than RESULT_SPILL_THRESHOLD are spilled and Redis keeps a
+        pointer that expires after RESULT_POINTER_TTL seconds. The spilled payload
+        itself is removed with the job.
         
         Args:
             job_id (str): Job identifier
             result (bytes): Result data to store
+            compression (str, optional): Compress the result with "gzip" or "zstd".
+                Defaults to None (stored as is).
         """
         with self.telemetry.tracer.start_as_current_span("job.set_result") as span:
             span.set_attribute("job_id", job_id)
-            set_key = f"result:{job_id}:{str(self.service_type)}"
-            span.set_attribute("set_key", set_key)
-            self.redis.set(set_key, result)
+            self._store_result(job_id, result, None, compression, span)
 
-    def set_result_with_expiration(self, job_id: str, result: bytes, ex: int):
+    def set_result_with_expiration(
+        self, job_id: str, result: bytes, ex: int, compression: Optional[str] = None
+    ):
         """
         Store the result data with an expiration time.
         
@@ -114,14 +462,47 @@ class JobStatusManager:
             job_id (str): Job identifier
             result (bytes): Result data to store
             ex (int): Expiration time in seconds
+            compression (str, optional): Compress the result with "gzip" or "zstd".
+                Defaults to None (stored as is).
         """
         with self.telemetry.tracer.start_as_current_span(
             "job.set_result_with_expiration"
         ) as span:
             span.set_attribute("job_id", job_id)
-            set_key = f"result:{job_id}:{str(self.service_type)}"
-            span.set_attribute("set_key", set_key)
-            self.redis.set(set_key, result, ex=ex)
+            self._store_result(job_id, result, ex, compression, span)
+
+    def get_result_stream(self, job_id: str) -> Optional[Iterator[bytes]]:
+        """
+        Stream the result data for a job without loading spilled payloads into memory.
+        Compressed results are decompressed on the fly.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Optional[Iterator[bytes]]: Result chunks if found, None otherwise
+        """
+        with self.telemetry.tracer.start_as_current_span(
+            "job.get_result_stream"
+        ) as span:
+            span.set_attribute("job_id", job_id)
+            get_key = f"result:{job_id}:{self.service_type!s}"
+            span.set_attribute("get_key", get_key)
+            result = self.redis.get(get_key)
+            if not result:
+                return None
+            if result.startswith(ENCODED_MARKER):
+                encoding, _, payload = result[len(ENCODED_MARKER) :].partition(b":")
+                span.set_attribute("encoding", encoding.decode())
+                return iter_decompress(iter([payload]), encoding.decode())
+            if not result.startswith(SPILL_MARKER):
+                return iter([result])
+            pointer = json.loads(result[len(SPILL_MARKER) :])
+            span.set_attribute("spilled", pointer["backend"])
+            chunks = self._iter_spilled(job_id, pointer)
+            if chunks is None:
+                return None
+            return iter_decompress(chunks, pointer.get("encoding"))
 
     def get_result(self, job_id: str):
         """
@@ -135,9 +516,10 @@ class JobStatusManager:
         """
         with self.telemetry.tracer.start_as_current_span("job.get_result") as span:
             span.set_attribute("job_id", job_id)
-            get_key = f"result:{job_id}:{str(self.service_type)}"
-            span.set_attribute("get_key", get_key)
-            result = self.redis.get(get_key)
+            chunks = self.get_result_stream(job_id)
+            if chunks is None:
+                return None
+            result = b"".join(chunks)
             return result if result else None
 
     def get_status(self, job_id: str):
@@ -164,29 +546,115 @@ class JobStatusManager:
             # Decode bytes to strings for each field
             return {k.decode(): v.decode() for k, v in status.items()}
 
-    def cleanup_old_jobs(self, max_age=3600):
+    def get_events(self, job_id: str) -> List[dict]:
+        """
+        Get the status event log of a job.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            List[dict]: Status updates in the order they were written. Empty if the
+                event log is disabled or the job is unknown.
+        """
+        with self.telemetry.tracer.start_as_current_span("job.get_events") as span:
+            span.set_attribute("job_id", job_id)
+            events_key = f"events:{job_id}:{self.service_type!s}"
+            return [json.loads(e) for e in self.redis.lrange(events_key, 0, -1)]
+
+    def delete_job(self, job_id: str) -> None:
+        """
+        Remove all state kept for a job, including any spilled result.
+
+        Args:
+            job_id (str): Job identifier
+        """
+        with self.telemetry.tracer.start_as_current_span("job.delete_job") as span:
+            span.set_attribute("job_id", job_id)
+            self._forget(job_id)
+            status_key, result_key, events_key = self._job_keys(job_id)
+            self._delete_spilled([job_id])
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.delete(status_key, result_key, events_key)
+            pipe.zrem(self._index_key, job_id)
+            pipe.execute()
+
+    def cleanup_old_jobs(self, max_age=3600, batch_size=JOB_CLEANUP_BATCH_SIZE):
         """
-        Remove jobs older than the specified age.
+        Remove jobs created more than the specified number of seconds ago.
+
+        Expired jobs are read from the creation time index in batches and their keys
+        are deleted with one pipeline per batch, so the cost is proportional to the
+        number of expired jobs rather than the size of the keyspace. Spilled results
+        of a batch are deleted with one bulk request, whether or not their Redis
+        pointers still exist.
         
         Args:
             max_age (int, optional): Maximum age in seconds. Defaults to 3600.
+            batch_size (int, optional): Jobs removed per pipelined batch.
+                Defaults to JOB_CLEANUP_BATCH_SIZE.
             
         Returns:
             int: Number of jobs removed
         """
-        current_time = time.time()
-        removed = 0
-        pattern = f"status:*:{str(self.service_type)}"
-        for key in self.redis.scan_iter(match=pattern):
-            status = self.redis.hgetall(key)
-            try:
-                timestamp = float(status[b"timestamp"].decode())
-                if timestamp < current_time - max_age:
-                    self.redis.delete(key)
-                    job_id = key.split(b":")[1].decode()
-                    self.redis.delete(f"result:{job_id}:{self.service_type}")
-                    removed += 1
-            except (KeyError, ValueError):
-                # Handle malformed status entries
-                continue
-        return removed
+        with self.telemetry.tracer.start_as_current_span("job.cleanup_old_jobs") as span:
+            cutoff = time.time() - max_age
+            removed = 0
+            while True:
+                job_ids = [
+                    job_id.decode()
+                    for job_id in self.redis.zrangebyscore(
+                        self._index_key, "-inf", cutoff, start=0, num=batch_size
+                    )
+                ]
+                if not job_ids:
+                    break
+
+                self._delete_spilled(job_ids)
+
+                pipe = self.redis.pipeline(transaction=False)
+                for job_id in job_ids:
+                    pipe.delete(*self._job_keys(job_id))
+                pipe.zrem(self._index_key, *job_ids)
+                pipe.execute()
+                for job_id in job_ids:
+                    self._forget(job_id)
+                removed += len(job_ids)
+
+            span.set_attribute("removed", removed)
+            return removed
+
+    def start_reaper(
+        self, max_age: int = JOB_MAX_AGE, interval: int = JOB_REAPER_INTERVAL
+    ) -> None:
+        """
+        Start a background thread that expires old jobs continuously.
+
+        Args:
+            max_age (int, optional): Maximum job age in seconds. Defaults to JOB_MAX_AGE.
+            interval (int, optional): Seconds between passes. Defaults to
+                JOB_REAPER_INTERVAL. The reaper is not started if this is 0.
+        """
+        if interval <= 0 or self._reaper_thread is not None:
+            return
+
+        def _reap():
+            while not self._reaper_stop.wait(interval):
+                try:
+                    removed = self.cleanup_old_jobs(max_age=max_age)
+                    if removed:
+                        logger.info(
+                            f"Reaped {removed} {self.service_type.value} jobs older than {max_age}s"
+                        )
+                except Exception as e:
+                    logger.error(f"Job reaper error: {e}")
+
+        self._reaper_thread = threading.Thread(target=_reap, daemon=True)
+        self._reaper_thread.start()
+
+    def stop_reaper(self) -> None:
+        """Stop the background reaper thread if it is running."""
+        self._reaper_stop.set()
+        if self._reaper_thread:
+            self._reaper_thread.join(timeout=1.0)
+            self._reaper_thread = None
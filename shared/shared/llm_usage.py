@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .compression import ARTIFACT_COMPRESSION
+from .prompt_types import QueryUsage, StageUsage, TokenUsage
+from .storage import StorageManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Trailing index of fanned-out queries, e.g. "segment_transcript_3"
+_STAGE_INDEX = re.compile(r"_\d+$")
+
+_current_job_usage: ContextVar[JobUsageTracker | None] = ContextVar(
+    "current_job_usage", default=None
+)
+
+
+def query_stage(query_name: str) -> str:
+    """Stage of a query, its name without the trailing index."""
+    return _STAGE_INDEX.sub("", query_name)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Collect attempts, token counts and the first token time of one LLM call.
+
+    Passed as a callback to every attempt of the call, including retries. Each hedged
+    request gets its own handler: the winner's is merged in, and the loser's is
+    recorded as a hedged call of its own. Token counts come from the model's usage
+    metadata, or from the number of streamed tokens when the endpoint does not report
+    usage.
+    """
+
+    # Counting is cheap, so skip the executor LangChain uses for sync handlers
+    run_inline = True
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.attempts = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.first_token: float | None = None
+        self.queue_wait = 0.0
+        self._streamed = 0
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list, **kwargs):
+        self.attempts += 1
+        self._streamed = 0
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self.first_token is None:
+            self.first_token = time.monotonic()
+        self._streamed += 1
+
+    def on_llm_end(self, response: LLMResult, **kwargs):
+        reported = False
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(
+                    getattr(generation, "message", None), "usage_metadata", None
+                )
+                if usage:
+                    self.prompt_tokens += usage.get("input_tokens", 0)
+                    self.completion_tokens += usage.get("output_tokens", 0)
+                    reported = True
+        if not reported:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            if token_usage:
+                self.prompt_tokens += token_usage.get("prompt_tokens", 0)
+                self.completion_tokens += token_usage.get("completion_tokens", 0)
+            else:
+                self.completion_tokens += self._streamed
+        self._streamed = 0
+
+    def merge(self, other: UsageCallbackHandler) -> None:
+        """Add the attempts, tokens and queue time of another handler of the call."""
+        self.attempts += other.attempts
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.queue_wait += other.queue_wait
+        if other.first_token is not None and (
+            self.first_token is None or other.first_token < self.first_token
+        ):
+            self.first_token = other.first_token
+
+    @property
+    def ttft(self) -> float | None:
+        """Seconds to the first streamed token, not counting time queued for a slot."""
+        if self.first_token is None:
+            return None
+        return self.first_token - self.start - self.queue_wait
+
+    def usage(
+        self,
+        query_name: str,
+        model_key: str,
+        model: str,
+        success: bool,
+        hedged: bool = False,
+    ) -> QueryUsage:
+        """Build the accounting record of the finished call."""
+        return QueryUsage(
+            query_name=query_name,
+            stage=query_stage(query_name),
+            model_key=model_key,
+            model=model,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            retries=max(self.attempts - 1, 0),
+            queue_wait=self.queue_wait,
+            ttft=self.ttft,
+            latency=time.monotonic() - self.start,
+            success=success,
+            hedged=hedged,
+            timestamp=time.time(),
+        )
+
+
+class UsageMetrics:
+    """OpenTelemetry instruments for LLM call accounting.
+
+    Attributes are the stage rather than the query name, to keep cardinality low.
+    """
+
+    def __init__(self, meter):
+        self.latency = meter.create_histogram(
+            "llm.request.duration", unit="s", description="LLM call latency"
+        )
+        self.ttft = meter.create_histogram(
+            "llm.request.ttft", unit="s", description="LLM time to first token"
+        )
+        self.queue_wait = meter.create_histogram(
+            "llm.request.queue_wait",
+            unit="s",
+            description="Time LLM calls waited for a concurrency slot",
+        )
+        self.prompt_tokens = meter.create_counter(
+            "llm.tokens.prompt", description="Prompt tokens sent to LLMs"
+        )
+        self.completion_tokens = meter.create_counter(
+            "llm.tokens.completion", description="Completion tokens generated by LLMs"
+        )
+        self.retries = meter.create_counter(
+            "llm.request.retries", description="LLM call retries"
+        )
+
+    def record(self, usage: QueryUsage):
+        attributes = {
+            "stage": usage.stage,
+            "model_key": usage.model_key,
+            "model": usage.model,
+            "success": usage.success,
+            "hedged": usage.hedged,
+        }
+        self.latency.record(usage.latency, attributes)
+        self.queue_wait.record(usage.queue_wait, attributes)
+        if usage.ttft is not None:
+            self.ttft.record(usage.ttft, attributes)
+        self.prompt_tokens.add(usage.prompt_tokens, attributes)
+        self.completion_tokens.add(usage.completion_tokens, attributes)
+        self.retries.add(usage.retries, attributes)
+
+
+def set_usage_attributes(span, usage: QueryUsage):
+    """Record a call's accounting on its span."""
+    span.set_attribute("prompt_tokens", usage.prompt_tokens)
+    span.set_attribute("completion_tokens", usage.completion_tokens)
+    span.set_attribute("retry_count", usage.retries)
+    span.set_attribute("queue_wait", usage.queue_wait)
+    span.set_attribute("latency", usage.latency)
+    if usage.ttft is not None:
+        span.set_attribute("ttft", usage.ttft)
+
+
+class JobUsageTracker:
+    """Collect the accounting of every LLM call made for a job.
+
+    Activate it for the job's task with start(); LLMManager then adds each call it
+    makes in that context, including calls in tasks spawned from it. save() stores
+    the summary as "{job_id}_token_usage.json" next to the prompt tracker.
+
+    Attributes:
+        job_id (str): Job being tracked
+        user_id (str): Owner of the job
+        queries (List[QueryUsage]): Calls in the order they finished
+    """
+
+    def __init__(self, job_id: str, user_id: str, storage_manager: StorageManager):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.storage_manager = storage_manager
+        self.queries: list[QueryUsage] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Make this the tracker of the current context. Returns a token for stop()."""
+        return _current_job_usage.set(self)
+
+    @staticmethod
+    def stop(token):
+        """Deactivate the tracker activated with start()."""
+        _current_job_usage.reset(token)
+
+    def add(self, usage: QueryUsage):
+        with self._lock:
+            self.queries.append(usage)
+
+    def summary(self) -> TokenUsage:
+        """Totals overall and per stage, with every call."""
+        with self._lock:
+            queries = list(self.queries)
+        totals = StageUsage()
+        stages: dict[str, StageUsage] = {}
+        for usage in queries:
+            for stats in (totals, stages.setdefault(usage.stage, StageUsage())):
+                stats.calls += 1
+                stats.prompt_tokens += usage.prompt_tokens
+                stats.completion_tokens += usage.completion_tokens
+                stats.retries += usage.retries
+                stats.hedged += usage.hedged
+                stats.latency += usage.latency
+        return TokenUsage(
+            job_id=self.job_id, totals=totals, stages=stages, queries=queries
+        )
+
+    def save(self):
+        """Store the summary in storage."""
+        summary = self.summary()
+        self.storage_manager.store_file(
+            self.user_id,
+            self.job_id,
+            summary.model_dump_json().encode(),
+            f"{self.job_id}_token_usage.json",
+            "application/json",
+            compression=ARTIFACT_COMPRESSION,
+        )
+        logger.info(
+            f"Stored token usage for {self.job_id}: {summary.totals.prompt_tokens} "
+            f"prompt and {summary.totals.completion_tokens} completion tokens "
+            f"in {summary.totals.calls} calls"
+        )
+
+
+def current_job_usage() -> JobUsageTracker | None:
+    """Tracker of the job running in the current context, if any."""
+    return _current_job_usage.get()
@@ -1,16 +1,163 @@
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from typing import List, Dict, Any, Optional, Union
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
 import logging
+import os
+import random
+import threading
+import time
+import weakref
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
 import ujson as json
 from shared.otel import OpenTelemetryInstrumentation
+from shared.concurrency import AdaptiveLimiter, Slot, get_limiter
+from shared.balancer import EndpointBalancer, endpoint_key, get_balancer
+from shared.tokens import estimate_tokens
+from shared.llm_usage import (
+    UsageCallbackHandler,
+    UsageMetrics,
+    current_job_usage,
+    query_stage,
+    set_usage_attributes,
+)
 from opentelemetry.trace.status import StatusCode
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keep-alive connection pool shared by all model endpoints of the process
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64"))
+LLM_HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("LLM_HTTP_KEEPALIVE_TIMEOUT", "60"))
+
+_lock = threading.Lock()
+_managers: Dict[Tuple[Optional[str], Optional[str]], "LLMManager"] = {}
+_http_session: Optional[requests.Session] = None
+# aiohttp connectors are bound to the event loop they were created on
+_async_connectors = weakref.WeakKeyDictionary()
+
+
+def _shared_http_session() -> requests.Session:
+    """Process-wide requests session with a keep-alive connection pool."""
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=LLM_HTTP_MAX_CONNECTIONS,
+                pool_maxsize=LLM_HTTP_MAX_CONNECTIONS,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def _shared_async_session(timeout: Optional[float]) -> aiohttp.ClientSession:
+    """aiohttp session on the keep-alive connector of the running event loop.
+
+    The session does not own the connector, so closing it after a request keeps
+    the pooled connections open for the next one.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        connector = _async_connectors.get(loop)
+        if connector is None or connector.closed:
+            connector = aiohttp.TCPConnector(
+                limit=LLM_HTTP_MAX_CONNECTIONS,
+                keepalive_timeout=LLM_HTTP_KEEPALIVE_TIMEOUT,
+            )
+            _async_connectors[loop] = connector
+    return aiohttp.ClientSession(
+        connector=connector,
+        connector_owner=False,
+        timeout=aiohttp.ClientTimeout(
+            connect=timeout, sock_connect=timeout, sock_read=timeout
+        ),
+    )
+
+
+def _share_connections(llm: ChatNVIDIA) -> None:
+    """Point a ChatNVIDIA model at the process-wide connection pools.
+
+    ChatNVIDIA opens a new HTTP session per request. Its clients take session
+    factories, which are swapped for ones handing out pooled sessions. Clients with
+    custom SSL verification, or versions without the factories, are left as they are.
+    """
+    sync_client = getattr(llm, "_client", None)
+    if hasattr(sync_client, "get_session_fn") and getattr(
+        sync_client, "verify_ssl", True
+    ) is True:
+        sync_client.get_session_fn = _shared_http_session
+
+    async_client = getattr(llm, "_async_client", None)
+    if hasattr(async_client, "get_async_session_fn") and getattr(
+        async_client, "verify_ssl", True
+    ) is True:
+        timeout = getattr(async_client, "timeout", None)
+        async_client.get_async_session_fn = lambda: _shared_async_session(timeout)
+
+
+def get_llm_manager(
+    api_key: str,
+    telemetry: OpenTelemetryInstrumentation,
+    config_path: Optional[str] = None,
+) -> "LLMManager":
+    """Get the process-wide LLMManager for an API key and config file.
+
+    Models, runnable chains and HTTP connections are then reused across jobs. The
+    config file is reloaded when its modification time changes.
+
+    Args:
+        api_key (str): API key for NVIDIA endpoints
+        telemetry (OpenTelemetryInstrumentation): Telemetry instrumentation instance
+        config_path (Optional[str]): Path to custom model configurations file
+
+    Returns:
+        LLMManager: Manager shared by all callers with the same key and config path
+    """
+    key = (api_key, config_path)
+    with _lock:
+        manager = _managers.get(key)
+    if manager is None:
+        manager = LLMManager(api_key, telemetry, config_path)
+        with _lock:
+            manager = _managers.setdefault(key, manager)
+    return manager
+
+
+@dataclass
+class EndpointConfig:
+    """Configuration for one replica serving a model.
+    
+    Attributes:
+        api_base (str): Base URL for the replica's API endpoint
+        weight (float): Share of traffic relative to the other replicas
+    """
+    api_base: str
+    weight: float = 1.0
+
+    @classmethod
+    def from_dict(cls, data: Union[str, Dict[str, Any]]) -> "EndpointConfig":
+        """Create an EndpointConfig from a URL or a dictionary.
+        
+        Args:
+            data (Union[str, Dict[str, Any]]): API base URL, or dictionary with
+                api_base and optional weight
+            
+        Returns:
+            EndpointConfig: New EndpointConfig instance
+        """
+        if isinstance(data, str):
+            return cls(api_base=data)
+        return cls(api_base=data["api_base"], weight=float(data.get("weight", 1.0)))
+
 
 @dataclass
 class ModelConfig:
@@ -18,14 +165,27 @@ class ModelConfig:
     
     Attributes:
         name (str): Name/identifier of the model
-        api_base (str): Base URL for the model's API endpoint
+        api_base (str): Base URL for the model's API endpoint, the first of endpoints
+        endpoints (List[EndpointConfig]): Replicas serving the model
+        hedge_percentile (Optional[float]): Latency percentile of recent calls of the
+            same query stage after which an async query is also sent to a second
+            replica. None disables hedging
     """
     name: str
     api_base: str
+    endpoints: List[EndpointConfig] = field(default_factory=list)
+    hedge_percentile: Optional[float] = None
+
+    def __post_init__(self):
+        if not self.endpoints:
+            self.endpoints = [EndpointConfig(api_base=self.api_base)]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ModelConfig":
         """Create a ModelConfig instance from a dictionary.
+
+        Either api_base or an endpoints list must be given. Endpoints are URLs or
+        dictionaries with api_base and weight.
         
         Args:
             data (Dict[str, Any]): Dictionary containing model configuration
@@ -33,9 +193,13 @@ class ModelConfig:
         Returns:
             ModelConfig: New ModelConfig instance
         """
+        endpoints = [EndpointConfig.from_dict(e) for e in data.get("endpoints", [])]
+        hedge_percentile = data.get("hedge_percentile")
         return cls(
             name=data["name"],
-            api_base=data["api_base"],
+            api_base=data.get("api_base") or endpoints[0].api_base,
+            endpoints=endpoints,
+            hedge_percentile=float(hedge_percentile) if hedge_percentile else None,
         )
 
 
@@ -46,17 +210,30 @@ class LLMManager:
     structured outputs, types, streaming and more. It also comes with OTEL telemetry out of the box
     for all queries. It is specifically tailored for singular invocations.
 
+    Calls to each endpoint go through an adaptive concurrency limiter shared by the whole
+    process, so concurrent jobs back off together when the endpoint is overloaded. A call
+    keeps its slot through retries, so retried calls count as slow ones.
+
+    A model key can list several endpoints with weights. Each call goes to the one with
+    the fewest outstanding calls per weight, failing endpoints are ejected for a while,
+    and async queries can be hedged to a second endpoint once they run longer than a
+    latency percentile of recent calls of the same query stage.
+
     Configs can be overridden by providing a custom config file. Currently the defaults are
-    hardcoded to build.nvidia.com endpoints.
+    hardcoded to build.nvidia.com endpoints. The file is reloaded when its modification
+    time changes. Use get_llm_manager to share one instance across the process.
 
     Attributes:
         api_key (str): API key for NVIDIA endpoints
         telemetry (OpenTelemetryInstrumentation): Telemetry instrumentation instance
-        _llm_cache (Dict[str, ChatNVIDIA]): Cache of initialized LLM models
+        _llm_cache (Dict[Tuple[str, str], ChatNVIDIA]): Cache of initialized LLM models
+            per model key and endpoint
+        _runnable_cache (Dict[Tuple[str, str, Optional[str], int], Runnable]): Cache of
+            structured output and retry chains per model key, endpoint, schema and retries
         model_configs (Dict[str, ModelConfig]): Model configurations
 
     Usage:
-    >>> llm_manager = LLMManager(api_key, telemetry)
+    >>> llm_manager = get_llm_manager(api_key, telemetry)
     >>> llm_manager.query_sync("reasoning", [{"role": "user", "content": "Hello, world!"}], "test")
     """
 
@@ -95,7 +272,14 @@ class LLMManager:
         try:
             self.api_key = api_key
             self.telemetry = telemetry
-            self._llm_cache: Dict[str, ChatNVIDIA] = {}
+            self.config_path = config_path
+            self._lock = threading.Lock()
+            self._llm_cache: Dict[Tuple[str, str], ChatNVIDIA] = {}
+            self._runnable_cache: Dict[
+                Tuple[str, str, Optional[str], int], Runnable
+            ] = {}
+            self._config_mtime = self._get_config_mtime()
+            self._usage_metrics: Optional[UsageMetrics] = None
             self.model_configs = self._load_configurations(config_path)
             logger.info("Successfully initialized LLMManager")
         except Exception as e:
@@ -130,11 +314,57 @@ class LLMManager:
                 logger.warning("Using default configurations")
         return {key: ModelConfig.from_dict(config) for key, config in configs.items()}
 
-    def get_llm(self, model_key: str) -> ChatNVIDIA:
+    def _get_config_mtime(self) -> Optional[float]:
+        """Modification time of the config file, None if there is none."""
+        if not self.config_path:
+            return None
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        """Reload model configurations if the config file changed.
+
+        Cached models and chains are dropped, so the next query uses the new
+        configuration.
+        """
+        mtime = self._get_config_mtime()
+        if mtime == self._config_mtime:
+            return
+        with self._lock:
+            if mtime == self._config_mtime:
+                return
+            self.model_configs = self._load_configurations(self.config_path)
+            self._llm_cache = {}
+            self._runnable_cache = {}
+            self._config_mtime = mtime
+        logger.info(f"Reloaded model configurations from {self.config_path}")
+
+    def get_config(self, model_key: str) -> ModelConfig:
+        """Get the current configuration of a model key.
+        
+        Args:
+            model_key (str): Key identifying which model configuration to use
+            
+        Returns:
+            ModelConfig: Configuration, reloaded first if the config file changed
+            
+        Raises:
+            ValueError: If model_key is not found in configurations
+        """
+        self._reload_if_changed()
+        config = self.model_configs.get(model_key)
+        if config is None:
+            raise ValueError(f"Unknown model key: {model_key}")
+        return config
+
+    def get_llm(self, model_key: str, api_base: Optional[str] = None) -> ChatNVIDIA:
         """Get or create a ChatNVIDIA model for the specified model key.
         
         Args:
             model_key (str): Key identifying which model configuration to use
+            api_base (Optional[str]): Endpoint to use. Defaults to the first endpoint
             
         Returns:
             ChatNVIDIA: Initialized ChatNVIDIA instance
@@ -142,17 +372,324 @@ class LLMManager:
         Raises:
             ValueError: If model_key is not found in configurations
         """
-        if model_key not in self.model_configs:
-            raise ValueError(f"Unknown model key: {model_key}")
-        if model_key not in self._llm_cache:
-            config = self.model_configs[model_key]
-            self._llm_cache[model_key] = ChatNVIDIA(
-                model=config.name,
-                base_url=config.api_base,
-                nvidia_api_key=self.api_key,
-                max_tokens=None,
+        config = self.get_config(model_key)
+        api_base = api_base or config.api_base
+        with self._lock:
+            key = (model_key, api_base)
+            if key not in self._llm_cache:
+                llm = ChatNVIDIA(
+                    model=config.name,
+                    base_url=api_base,
+                    nvidia_api_key=self.api_key,
+                    max_tokens=None,
+                )
+                _share_connections(llm)
+                self._llm_cache[key] = llm
+            return self._llm_cache[key]
+
+    def get_limiter(
+        self, model_key: str, api_base: Optional[str] = None
+    ) -> AdaptiveLimiter:
+        """Get the process-wide concurrency limiter of a model key's endpoint.
+
+        Args:
+            model_key (str): Key identifying which model configuration to use
+            api_base (Optional[str]): Endpoint to use. Defaults to the first endpoint
+
+        Returns:
+            AdaptiveLimiter: Limiter shared with every job calling the same endpoint
+
+        Raises:
+            ValueError: If model_key is not found in configurations
+        """
+        config = self.get_config(model_key)
+        return get_limiter(endpoint_key(api_base or config.api_base, config.name))
+
+    def get_balancer(self, model_key: str) -> EndpointBalancer:
+        """Get the process-wide balancer of a model key's model.
+
+        Args:
+            model_key (str): Key identifying which model configuration to use
+
+        Returns:
+            EndpointBalancer: Balancer shared with every job calling the same model
+
+        Raises:
+            ValueError: If model_key is not found in configurations
+        """
+        return get_balancer(self.get_config(model_key).name)
+
+    def choose_endpoint(
+        self, model_key: str, exclude: Tuple[str, ...] = ()
+    ) -> Optional[str]:
+        """Pick the endpoint for the next call of a model key.
+
+        Args:
+            model_key (str): Key identifying which model configuration to use
+            exclude (Tuple[str, ...]): Endpoints not to use
+
+        Returns:
+            Optional[str]: API base URL, None if every endpoint is excluded
+
+        Raises:
+            ValueError: If model_key is not found in configurations
+        """
+        config = self.get_config(model_key)
+        if len(config.endpoints) == 1 and not exclude:
+            return config.api_base
+        return self.get_balancer(model_key).choose(
+            [(endpoint.api_base, endpoint.weight) for endpoint in config.endpoints],
+            exclude,
+        )
+
+    def get_runnable(
+        self,
+        model_key: str,
+        json_schema: Optional[Dict] = None,
+        retries: int = 5,
+        api_base: Optional[str] = None,
+    ) -> Runnable:
+        """Get or create the query chain for a model key, output schema and retries.
+
+        Args:
+            model_key (str): Key identifying which model configuration to use
+            json_schema (Optional[Dict]): Schema for structured output
+            retries (int): Number of retry attempts
+            api_base (Optional[str]): Endpoint to use. Defaults to the first endpoint
+
+        Returns:
+            Runnable: Model with structured output, if any, and retries applied
+
+        Raises:
+            ValueError: If model_key is not found in configurations
+        """
+        api_base = api_base or self.get_config(model_key).api_base
+        llm = self.get_llm(model_key, api_base)
+        schema_key = json.dumps(json_schema, sort_keys=True) if json_schema else None
+        key = (model_key, api_base, schema_key, retries)
+        runnable = self._runnable_cache.get(key)
+        if runnable is None:
+            # Structured output looks the model up on the endpoint, so build it once
+            runnable = llm
+            if json_schema:
+                runnable = runnable.with_structured_output(json_schema)
+            runnable = runnable.with_retry(
+                stop_after_attempt=retries, wait_exponential_jitter=True
+            )
+            with self._lock:
+                runnable = self._runnable_cache.setdefault(key, runnable)
+        return runnable
+
+    @contextmanager
+    def _endpoint_slot(
+        self,
+        model_key: str,
+        api_base: str,
+        usage: Optional[UsageCallbackHandler] = None,
+        stage: Optional[str] = None,
+    ):
+        """Hold a concurrency slot on an endpoint and record the call's outcome.
+
+        Yields the limiter's Slot, on which the call may report its latency. The
+        latency, queueing included, is kept for hedging under the query stage, if given.
+        """
+        balancer = self.get_balancer(model_key)
+        start = time.monotonic()
+        queued = 0.0
+        try:
+            with self.get_limiter(model_key, api_base).slot() as slot:
+                queued = time.monotonic() - start
+                if usage is not None:
+                    usage.queue_wait += queued
+                yield slot
+        except Exception as e:
+            balancer.record(api_base, time.monotonic() - start, e)
+            raise
+        balancer.record(api_base, self._slot_latency(slot, start, queued), None, stage)
+
+    @staticmethod
+    def _slot_latency(slot: Slot, start: float, queued: float) -> float:
+        """Latency of a call from its start, using the one it reported if any."""
+        if slot.latency is None:
+            return time.monotonic() - start
+        return queued + slot.latency
+
+    @asynccontextmanager
+    async def _async_endpoint_slot(
+        self,
+        model_key: str,
+        api_base: str,
+        usage: Optional[UsageCallbackHandler] = None,
+        stage: Optional[str] = None,
+    ):
+        """Async version of _endpoint_slot. Cancelled calls are not recorded."""
+        balancer = self.get_balancer(model_key)
+        start = time.monotonic()
+        queued = 0.0
+        try:
+            async with self.get_limiter(model_key, api_base).async_slot() as slot:
+                queued = time.monotonic() - start
+                if usage is not None:
+                    usage.queue_wait += queued
+                yield slot
+        except Exception as e:
+            balancer.record(api_base, time.monotonic() - start, e)
+            raise
+        balancer.record(api_base, self._slot_latency(slot, start, queued), None, stage)
+
+    async def _ainvoke_endpoint(
+        self,
+        model_key: str,
+        api_base: str,
+        messages: List[Dict[str, str]],
+        json_schema: Optional[Dict],
+        retries: int,
+        usage: UsageCallbackHandler,
+        stage: str,
+    ) -> Union[AIMessage, Dict[str, Any]]:
+        llm = self.get_runnable(model_key, json_schema, retries, api_base)
+        async with self._async_endpoint_slot(model_key, api_base, usage, stage):
+            return await llm.ainvoke(messages, config={"callbacks": [usage]})
+
+    async def _ainvoke_hedged(
+        self,
+        model_key: str,
+        messages: List[Dict[str, str]],
+        json_schema: Optional[Dict],
+        retries: int,
+        span,
+        usage: UsageCallbackHandler,
+        query_name: str,
+    ) -> Union[AIMessage, Dict[str, Any]]:
+        """Query one endpoint, and a second one if the first is slow.
+
+        The hedge is sent once the call runs past the configured latency percentile of
+        recent calls of the same stage. The first successful response wins and the
+        other call is cancelled. Each request counts usage on its own handler. The
+        winner's, or the first request's if both fail, is merged into usage, and the
+        other is recorded as a hedged call, since the endpoint served it too.
+        """
+        config = self.get_config(model_key)
+        stage = query_stage(query_name)
+        primary = self.choose_endpoint(model_key)
+        span.set_attribute("endpoint", primary)
+        span.set_attribute(
+            "concurrency_limit", self.get_limiter(model_key, primary).limit
+        )
+        delay = None
+        if config.hedge_percentile and len(config.endpoints) > 1:
+            delay = self.get_balancer(model_key).latency_percentile(
+                config.hedge_percentile, stage
+            )
+        if delay is None:
+            return await self._ainvoke_endpoint(
+                model_key, primary, messages, json_schema, retries, usage, stage
+            )
+
+        attempts: Dict[asyncio.Future, UsageCallbackHandler] = {}
+        kept = None
+
+        def send(api_base: str) -> None:
+            attempt_usage = UsageCallbackHandler()
+            task = asyncio.ensure_future(
+                self._ainvoke_endpoint(
+                    model_key,
+                    api_base,
+                    messages,
+                    json_schema,
+                    retries,
+                    attempt_usage,
+                    stage,
+                )
+            )
+            attempts[task] = attempt_usage
+
+        send(primary)
+        try:
+            done, _ = await asyncio.wait(list(attempts), timeout=delay)
+            if not done:
+                secondary = self.choose_endpoint(model_key, exclude=(primary,))
+                if secondary:
+                    span.set_attribute("hedged_endpoint", secondary)
+                    send(secondary)
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        kept = attempts[task]
+                        return task.result()
+                    error = task.exception()
+            kept = next(iter(attempts.values()))
+            raise error if error is not None else asyncio.CancelledError()
+        finally:
+            for task in attempts:
+                task.cancel()
+            if kept is not None:
+                usage.merge(kept)
+                for attempt_usage in attempts.values():
+                    if attempt_usage is not kept:
+                        self._record_hedged_usage(
+                            attempt_usage, messages, query_name, model_key
+                        )
+
+    def _record_hedged_usage(
+        self,
+        usage: UsageCallbackHandler,
+        messages: List[Dict[str, str]],
+        query_name: str,
+        model_key: str,
+    ):
+        """Record the losing request of a hedged call as a call of its own.
+
+        A request cancelled before the endpoint reported usage is counted with an
+        estimate of its prompt. One still waiting for a slot was never sent.
+        """
+        if not usage.attempts:
+            return
+        if not usage.prompt_tokens:
+            usage.prompt_tokens = sum(
+                estimate_tokens(str(message.get("content", ""))) for message in messages
+            )
+        self._record_usage(usage, query_name, model_key, None, False, hedged=True)
+
+    def _record_usage(
+        self,
+        usage: UsageCallbackHandler,
+        query_name: str,
+        model_key: str,
+        span,
+        success: bool,
+        hedged: bool = False,
+    ):
+        """Record a finished call's accounting on its span, in metrics and for its job.
+
+        Pass no span for hedged requests, whose span belongs to the winning request.
+        """
+        try:
+            config = self.model_configs.get(model_key)
+            record = usage.usage(
+                query_name,
+                model_key,
+                config.name if config else model_key,
+                success,
+                hedged,
             )
-        return self._llm_cache[model_key]
+            if span is not None:
+                set_usage_attributes(span, record)
+            if self._usage_metrics is None:
+                self._usage_metrics = UsageMetrics(self.telemetry.meter)
+            self._usage_metrics.record(record)
+            tracker = current_job_usage()
+            if tracker is not None:
+                tracker.add(record)
+        except Exception as e:
+            logger.warning(f"Failed to record usage of {query_name}: {e}")
 
     def query_sync(
         self,
@@ -184,16 +721,21 @@ class LLMManager:
             span.set_attribute("retries", retries)
             span.set_attribute("async", False)
 
+            usage = UsageCallbackHandler()
             try:
-                llm = self.get_llm(model_key)
-                if json_schema:
-                    llm = llm.with_structured_output(json_schema)
-                llm = llm.with_retry(
-                    stop_after_attempt=retries, wait_exponential_jitter=True
+                api_base = self.choose_endpoint(model_key)
+                span.set_attribute("endpoint", api_base)
+                span.set_attribute(
+                    "concurrency_limit", self.get_limiter(model_key, api_base).limit
                 )
-                resp = llm.invoke(messages)
+                llm = self.get_runnable(model_key, json_schema, retries, api_base)
+                stage = query_stage(query_name)
+                with self._endpoint_slot(model_key, api_base, usage, stage):
+                    resp = llm.invoke(messages, config={"callbacks": [usage]})
+                self._record_usage(usage, query_name, model_key, span, True)
                 return resp
             except Exception as e:
+                self._record_usage(usage, query_name, model_key, span, False)
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(f"Query failed: {e}")
@@ -231,16 +773,15 @@ class LLMManager:
             span.set_attribute("retries", retries)
             span.set_attribute("async", True)
 
+            usage = UsageCallbackHandler()
             try:
-                llm = self.get_llm(model_key)
-                if json_schema:
-                    llm = llm.with_structured_output(json_schema)
-                llm = llm.with_retry(
-                    stop_after_attempt=retries, wait_exponential_jitter=True
+                resp = await self._ainvoke_hedged(
+                    model_key, messages, json_schema, retries, span, usage, query_name
                 )
-                resp = await llm.ainvoke(messages)
+                self._record_usage(usage, query_name, model_key, span, True)
                 return resp
             except Exception as e:
+                self._record_usage(usage, query_name, model_key, span, False)
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(f"Query failed: {e}")
@@ -278,25 +819,30 @@ class LLMManager:
             span.set_attribute("retries", retries)
             span.set_attribute("async", False)
 
+            usage = UsageCallbackHandler()
             try:
-                llm = self.get_llm(model_key)
-                if json_schema:
-                    llm = llm.with_structured_output(json_schema)
-                llm = llm.with_retry(
-                    stop_after_attempt=retries, wait_exponential_jitter=True
+                api_base = self.choose_endpoint(model_key)
+                span.set_attribute("endpoint", api_base)
+                span.set_attribute(
+                    "concurrency_limit", self.get_limiter(model_key, api_base).limit
                 )
+                llm = self.get_runnable(model_key, json_schema, retries, api_base)
 
                 last_chunk = None
-                for chunk in llm.stream(messages):
-                    # AIMessage returns content and JSON returns the dict itself
-                    if hasattr(chunk, "content"):
-                        last_chunk = chunk.content
-                    else:
-                        last_chunk = chunk
+                stage = query_stage(query_name)
+                with self._endpoint_slot(model_key, api_base, usage, stage):
+                    for chunk in llm.stream(messages, config={"callbacks": [usage]}):
+                        # AIMessage returns content and JSON returns the dict itself
+                        if hasattr(chunk, "content"):
+                            last_chunk = chunk.content
+                        else:
+                            last_chunk = chunk
 
+                self._record_usage(usage, query_name, model_key, span, True)
                 return last_chunk
 
             except Exception as e:
+                self._record_usage(usage, query_name, model_key, span, False)
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(f"Streaming query failed: {e}")
@@ -334,28 +880,151 @@ class LLMManager:
             span.set_attribute("retries", retries)
             span.set_attribute("async", True)
 
+            usage = UsageCallbackHandler()
             try:
-                llm = self.get_llm(model_key)
-                if json_schema:
-                    llm = llm.with_structured_output(json_schema)
-                llm = llm.with_retry(
-                    stop_after_attempt=retries, wait_exponential_jitter=True
+                api_base = self.choose_endpoint(model_key)
+                span.set_attribute("endpoint", api_base)
+                span.set_attribute(
+                    "concurrency_limit", self.get_limiter(model_key, api_base).limit
                 )
+                llm = self.get_runnable(model_key, json_schema, retries, api_base)
 
                 last_chunk = None
-                async for chunk in llm.astream(messages):
-                    # AIMessage returns content and JSON returns the dict itself
-                    if hasattr(chunk, "content"):
-                        last_chunk = chunk.content
-                    else:
-                        last_chunk = chunk
+                stage = query_stage(query_name)
+                async with self._async_endpoint_slot(model_key, api_base, usage, stage):
+                    async for chunk in llm.astream(
+                        messages, config={"callbacks": [usage]}
+                    ):
+                        # AIMessage returns content and JSON returns the dict itself
+                        if hasattr(chunk, "content"):
+                            last_chunk = chunk.content
+                        else:
+                            last_chunk = chunk
 
+                self._record_usage(usage, query_name, model_key, span, True)
                 return last_chunk
 
             except Exception as e:
+                self._record_usage(usage, query_name, model_key, span, False)
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(f"Async streaming query failed: {e}")
                 raise Exception(
                     f"Failed to get streaming response after {retries} attempts"
                 ) from e
+
+    async def stream_tokens_async(
+        self,
+        model_key: str,
+        messages: List[Dict[str, str]],
+        query_name: str,
+        json_schema: Optional[Dict] = None,
+        retries: int = 5,
+    ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Stream a query, yielding output as the model generates it.
+
+        Without a schema, yields text deltas. With a schema, yields the partially
+        parsed object each time it grows; the last one is the complete object. A
+        failed attempt is retried only if nothing was yielded yet. Time to first token
+        and tokens per second are recorded on the span with the call's accounting.
+
+        Time the caller takes between chunks is left out of the latency given to the
+        endpoint's concurrency limiter and balancer, so slow consumers don't make the
+        endpoint look slow.
+
+        Args:
+            model_key (str): Key identifying which model to use
+            messages (List[Dict[str, str]]): List of message dictionaries
+            query_name (str): Name of query for telemetry
+            json_schema (Optional[Dict]): Schema for structured output
+            retries (int): Number of attempts before any output was yielded
+
+        Yields:
+            Union[str, Dict[str, Any]]: Text delta or partial object
+
+        Raises:
+            ValueError: If retries is less than 1
+            Exception: If the stream fails after output was yielded, or after retries
+        """
+        if retries < 1:
+            raise ValueError(f"retries must be at least 1, got {retries}")
+        # Not made current: the generator is suspended in the caller's context
+        span = self.telemetry.tracer.start_span(f"agent.stream_tokens.{query_name}")
+        span.set_attribute("model_key", model_key)
+        span.set_attribute("retries", retries)
+        span.set_attribute("async", True)
+        stage = query_stage(query_name)
+        usage = UsageCallbackHandler()
+        success = True
+        try:
+            for attempt in range(1, retries + 1):
+                api_base = self.choose_endpoint(model_key)
+                span.set_attribute("endpoint", api_base)
+                span.set_attribute("attempts", attempt)
+                runnable = self.get_runnable(model_key, json_schema, 1, api_base)
+                yielded = False
+                try:
+                    async with self._async_endpoint_slot(
+                        model_key, api_base, usage, stage
+                    ) as slot:
+                        started = time.monotonic()
+                        # Seconds spent suspended in the caller
+                        paused = 0.0
+                        first_token = None
+                        tokens = 0
+                        parsed = None
+                        async for event in runnable.astream_events(
+                            messages, version="v2", config={"callbacks": [usage]}
+                        ):
+                            kind = event["event"]
+                            output = None
+                            if kind == "on_chat_model_stream":
+                                if first_token is None:
+                                    first_token = time.monotonic() - paused
+                                tokens += 1
+                                content = event["data"]["chunk"].content
+                                if json_schema is None and content:
+                                    output = content
+                            elif kind == "on_parser_stream":
+                                parsed = event["data"]["chunk"]
+                            elif (
+                                json_schema
+                                and kind == "on_chain_stream"
+                                and not event["parent_ids"]
+                            ):
+                                output = event["data"]["chunk"]
+                            if output is not None:
+                                yielded = True
+                                suspended = time.monotonic()
+                                yield output
+                                paused += time.monotonic() - suspended
+                        finished = time.monotonic() - paused
+                        slot.latency = finished - started
+                        # Structured runnables that do not stream leave only the parser
+                        if json_schema and not yielded and parsed is not None:
+                            yielded = True
+                            yield parsed
+                    span.set_attribute("completion_chunks", tokens)
+                    if first_token is not None:
+                        generation = finished - first_token
+                        if generation > 0:
+                            span.set_attribute("tokens_per_second", tokens / generation)
+                    return
+                except Exception as e:
+                    if yielded or attempt == retries:
+                        raise
+                    logger.warning(
+                        f"Streaming query {query_name} attempt {attempt} failed: {e}"
+                    )
+                    # Exponential backoff with jitter, like with_retry
+                    await asyncio.sleep(min(2 ** (attempt - 1), 10) + random.random())
+        except Exception as e:
+            success = False
+            span.set_status(StatusCode.ERROR)
+            span.record_exception(e)
+            logger.error(f"Token streaming query failed: {e}")
+            raise Exception(f"Failed to stream response for {query_name}") from e
+        finally:
+            # Also reached when the caller stops consuming early
+            self._record_usage(usage, query_name, model_key, span, success)
+            span.end()
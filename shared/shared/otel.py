@@ -3,13 +3,16 @@ from typing import Optional
 import logging
 import os
 
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.redis import RedisInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.instrumentation.urllib3 import URLLib3Instrumentor
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -29,6 +32,8 @@ class OpenTelemetryConfig:
         enable_requests (bool): Whether to enable requests library instrumentation. Defaults to True
         enable_httpx (bool): Whether to enable HTTPX client instrumentation. Defaults to True
         enable_urllib3 (bool): Whether to enable urllib3 instrumentation. Defaults to True
+        metrics_endpoint (Optional[str]): OTLP endpoint URL for sending metrics. Metrics
+            are recorded but not exported when unset. Defaults to None
     """
 
     service_name: str
@@ -37,6 +42,7 @@ class OpenTelemetryConfig:
     enable_requests: bool = True
     enable_httpx: bool = True
     enable_urllib3: bool = True
+    metrics_endpoint: Optional[str] = None
 
 
 class OpenTelemetryInstrumentation:
@@ -60,6 +66,7 @@ class OpenTelemetryInstrumentation:
     def __init__(self):
         """Initialize the OpenTelemetryInstrumentation instance."""
         self._tracer: Optional[trace.Tracer] = None
+        self._meter: Optional[metrics.Meter] = None
         self._config: Optional[OpenTelemetryConfig] = None
 
     @property
@@ -78,6 +85,22 @@ class OpenTelemetryInstrumentation:
             )
         return self._tracer
 
+    @property
+    def meter(self) -> metrics.Meter:
+        """Get the configured meter instance.
+        
+        Returns:
+            metrics.Meter: The configured OpenTelemetry meter
+            
+        Raises:
+            RuntimeError: If initialize() hasn't been called yet
+        """
+        if not self._meter:
+            raise RuntimeError(
+                "OpenTelemetry has not been initialized. Call initialize() first."
+            )
+        return self._meter
+
     def initialize(
         self, config: OpenTelemetryConfig, app=None
     ) -> "OpenTelemetryInstrumentation":
@@ -95,6 +118,7 @@ class OpenTelemetryInstrumentation:
         logger.info(f"Setting up tracing for service: {self._config.service_name}")
         logger.info(f"Container ID: {os.uname().nodename}")
         self._setup_tracing()
+        self._setup_metrics()
         self._instrument_app(app)
         return self
 
@@ -116,6 +140,26 @@ class OpenTelemetryInstrumentation:
 
         self._tracer = trace.get_tracer(self._config.service_name)
 
+    def _setup_metrics(self) -> None:
+        """Set up the OpenTelemetry meter provider.
+        
+        Metrics are exported periodically to the metrics endpoint if one is configured.
+        """
+        resource = Resource.create({"service.name": self._config.service_name})
+
+        readers = []
+        if self._config.metrics_endpoint:
+            readers.append(
+                PeriodicExportingMetricReader(
+                    OTLPMetricExporter(endpoint=self._config.metrics_endpoint)
+                )
+            )
+
+        provider = MeterProvider(resource=resource, metric_readers=readers)
+        metrics.set_meter_provider(provider)
+
+        self._meter = metrics.get_meter(self._config.service_name)
+
     def _instrument_app(self, app=None) -> None:
         """Instrument the FastAPI application and optional components.
         
@@ -23,9 +23,12 @@ class SavedPodcastWithAudio(SavedPodcast):
     """Model extending SavedPodcast to include audio data.
     
     Attributes:
-        audio_data (str): Base64 encoded audio data of the podcast
+        audio_data (Optional[str]): Base64 encoded audio data of the podcast, None
+            when a download URL is returned instead
+        audio_url (Optional[str]): Short-lived presigned URL of the audio file
     """
-    audio_data: str
+    audio_data: Optional[str] = None
+    audio_url: Optional[str] = None
 
 
 class DialogueEntry(BaseModel):
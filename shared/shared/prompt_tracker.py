@@ -1,64 +1,177 @@
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import os
+import re
 import time
+import threading
 import logging
+import ujson as json
 from .storage import StorageManager
-from .prompt_types import ProcessingStep, PromptTracker as PromptTrackerModel
+from .compression import ARTIFACT_COMPRESSION
+from .prompt_types import (
+    ProcessingStep,
+    PromptTracker as PromptTrackerModel,
+    fragment_ref,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds between background flushes of tracked steps to storage
+PROMPT_TRACKER_FLUSH_INTERVAL = float(os.getenv("PROMPT_TRACKER_FLUSH_INTERVAL", "2"))
+
+# Prompt fragments shorter than this are kept inline instead of stored by hash
+PROMPT_FRAGMENT_MIN_CHARS = int(os.getenv("PROMPT_FRAGMENT_MIN_CHARS", "2048"))
+
+# Appended log segments are named "{job_id}_prompt_tracker.{seq}.jsonl"
+_SEGMENT_PATTERN = re.compile(r"_prompt_tracker\.(\d+)\.jsonl$")
+
+
+def history_filename(job_id: str) -> str:
+    """Name of the compacted prompt history file of a job."""
+    return f"{job_id}_prompt_tracker.json"
+
+
+def segment_filename(job_id: str, seq: int) -> str:
+    """Name of an appended prompt log segment of a job."""
+    return f"{job_id}_prompt_tracker.{seq:06d}.jsonl"
+
+
+def segment_filenames(filenames: Iterable[str]) -> List[str]:
+    """Pick the prompt log segments out of a job's files, in append order."""
+    segments = [name for name in filenames if _SEGMENT_PATTERN.search(name)]
+    return sorted(segments, key=lambda name: int(_SEGMENT_PATTERN.search(name).group(1)))
+
+
+def fold_segments(segments: Iterable[bytes]) -> PromptTrackerModel:
+    """Rebuild the prompt history from log segments.
+
+    Each line is a full step ("track"), a response update ("update") or a prompt
+    fragment ("fragment"). Later records win, and steps keep the order they were
+    first tracked in.
+
+    Args:
+        segments (Iterable[bytes]): Decompressed segment contents in append order
+
+    Returns:
+        PromptTrackerModel: The same history the compacted file would contain
+    """
+    steps: Dict[str, ProcessingStep] = {}
+    fragments: Dict[str, str] = {}
+    for segment in segments:
+        for line in segment.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["op"] == "track":
+                steps[record["step"]["step_name"]] = ProcessingStep(**record["step"])
+            elif record["op"] == "fragment":
+                fragments[record["digest"]] = record["text"]
+            elif record["step_name"] in steps:
+                steps[record["step_name"]].response = record["response"]
+    return PromptTrackerModel(steps=list(steps.values()), fragments=fragments)
+
 
 class PromptTracker:
     """Track prompts and responses and save them to storage.
-    
+
     This class provides functionality to track and store prompts, responses and processing
     steps for a given job. It maintains a history of interactions that can be persisted
     to storage.
 
+    Changes are appended to a log and written by a background thread in batches, each
+    batch as a new segment file, so every prompt is uploaded once. close() flushes the
+    rest and compacts the log into the single history file.
+
+    Large prompt fragments, such as document bodies, are stored once by SHA-256 digest
+    and replaced by a placeholder in every prompt that contains them.
+
     Attributes:
         job_id (str): Unique identifier for the job being tracked
         user_id (str): Identifier for the user who owns this job
         steps (Dict[str, ProcessingStep]): Dictionary mapping step names to processing steps
+        fragments (Dict[str, str]): Prompt fragment text by digest
         storage_manager (StorageManager): Manager for persisting data to storage
     """
 
-    def __init__(self, job_id: str, user_id: str, storage_manager: StorageManager):
+    def __init__(
+        self,
+        job_id: str,
+        user_id: str,
+        storage_manager: StorageManager,
+        flush_interval: float = PROMPT_TRACKER_FLUSH_INTERVAL,
+    ):
         """Initialize a new PromptTracker instance.
 
         Args:
             job_id (str): Unique identifier for the job
             user_id (str): Identifier for the user
             storage_manager (StorageManager): Storage manager instance for persistence
+            flush_interval (float, optional): Seconds between background flushes.
+                Defaults to PROMPT_TRACKER_FLUSH_INTERVAL.
         """
         self.job_id = job_id
         self.user_id = user_id
         self.steps: Dict[str, ProcessingStep] = {}
+        self.fragments: Dict[str, str] = {}
         self.storage_manager = storage_manager
+        self.flush_interval = flush_interval
 
-    def track(self, step_name: str, prompt: str, model: str, response: str = None):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._segments: List[str] = []
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name=f"prompt-tracker-{job_id}", daemon=True
+        )
+        self._flusher.start()
+
+    def track(
+        self,
+        step_name: str,
+        prompt: str,
+        model: str,
+        response: str = None,
+        fragments: Optional[List[str]] = None,
+    ):
         """Track a processing step
 
-        Creates a new ProcessingStep entry and optionally saves it if a response is provided.
+        Creates a new ProcessingStep entry and queues it for the next flush. Fragments
+        already stored by earlier steps are also cut out of the prompt.
 
         Args:
             step_name (str): Name identifying this processing step
             prompt (str): The prompt text used
             model (str): Name/identifier of the model used
             response (str, optional): Response received from the model. Defaults to None.
+            fragments (List[str], optional): Large texts rendered into the prompt, such
+                as document bodies, to store once by hash. Defaults to None.
         """
-        self.steps[step_name] = ProcessingStep(
+        for text in fragments or []:
+            if len(text) >= PROMPT_FRAGMENT_MIN_CHARS and text in prompt:
+                self._add_fragment(text)
+
+        # Longest first, so a fragment nested in a larger one stays inside it
+        for digest, text in sorted(
+            self.fragments.items(), key=lambda item: len(item[1]), reverse=True
+        ):
+            if text in prompt:
+                prompt = prompt.replace(text, fragment_ref(digest))
+
+        step = ProcessingStep(
             step_name=step_name,
             prompt=prompt,
             response=response if response else "",
             model=model,
             timestamp=time.time(),
         )
-        if response:
-            self._save()
+        self.steps[step_name] = step
+        self._append({"op": "track", "step": step.model_dump()})
         logger.info(f"Tracked step {step_name} for {self.job_id}")
 
     def update_result(self, step_name: str, response: str):
-        """Save the current state to storage
+        """Record the response of a tracked step
 
         Args:
             step_name (str): Name of the step to update
@@ -69,25 +182,113 @@ class PromptTracker:
         """
         if step_name in self.steps:
             self.steps[step_name].response = response
-            self._save()
+            self._append({"op": "update", "step_name": step_name, "response": response})
             logger.info(f"Updated response for step {step_name}")
         else:
             logger.warning(f"Step {step_name} not found in prompt tracker")
 
+    def _add_fragment(self, text: str):
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        if digest not in self.fragments:
+            self.fragments[digest] = text
+            self._append({"op": "fragment", "digest": digest, "text": text})
+
+    def _append(self, record: dict):
+        with self._lock:
+            self._pending.append(json.dumps(record))
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write queued records to storage as a new log segment.
+
+        The upload happens outside the queue lock, so tracking never waits on storage.
+        On failure the records go back to the front of the queue and are retried by
+        the next flush.
+        """
+        # Flushes run one at a time so segments keep the order records were queued in
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                records, self._pending = self._pending, []
+            filename = segment_filename(self.job_id, len(self._segments))
+            try:
+                self.storage_manager.store_file(
+                    self.user_id,
+                    self.job_id,
+                    ("\n".join(records) + "\n").encode(),
+                    filename,
+                    "application/x-ndjson",
+                    compression=ARTIFACT_COMPRESSION,
+                )
+            except Exception as e:
+                with self._lock:
+                    self._pending = records + self._pending
+                logger.error(f"Failed to flush prompt tracker for {self.job_id}: {e}")
+                return
+            self._segments.append(filename)
+        logger.info(
+            f"Flushed {len(records)} prompt tracker records for {self.job_id} to {filename}"
+        )
+
+    def close(self):
+        """Stop background flushing and compact the log into the history file.
+
+        Blocking; call it once the job is done. If compaction fails the segments are
+        kept, and readers fold them instead.
+        """
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+        self._save()
+        with self._flush_lock:
+            segments, self._segments = self._segments, []
+        if segments and not self.storage_manager.delete_files(
+            self.user_id, self.job_id, segments
+        ):
+            logger.warning(f"Failed to delete prompt tracker segments for {self.job_id}")
+
     def _save(self):
         """Save the current state to storage
-        
+
         Converts the tracked steps to JSON format and stores them using the storage manager.
         The file is saved with a name based on the job_id.
         """
-        tracker = PromptTrackerModel(steps=list(self.steps.values()))
+        tracker = PromptTrackerModel(
+            steps=list(self.steps.values()), fragments=self.fragments
+        )
         self.storage_manager.store_file(
             self.user_id,
             self.job_id,
             tracker.model_dump_json().encode(),
-            f"{self.job_id}_prompt_tracker.json",
+            history_filename(self.job_id),
             "application/json",
+            compression=ARTIFACT_COMPRESSION,
         )
         logger.info(
-            f"Stored prompt tracker for {self.job_id} in minio. Length: {len(self.steps)}"
+            f"Stored prompt tracker for {self.job_id} in storage. Length: {len(self.steps)}"
         )
+
+
+def load_segments(
+    storage_manager: StorageManager, user_id: str, job_id: str
+) -> Optional[PromptTrackerModel]:
+    """Rebuild a job's prompt history from its log segments, for jobs not yet compacted.
+
+    Args:
+        storage_manager (StorageManager): Storage manager holding the segments
+        user_id (str): ID of the user
+        job_id (str): ID of the job
+
+    Returns:
+        Optional[PromptTrackerModel]: History, None if the job has no segments
+    """
+    segments = segment_filenames(storage_manager.list_job_files(user_id, job_id))
+    if not segments:
+        return None
+    contents = storage_manager.get_many(user_id, job_id, segments)
+    # A segment may vanish if compaction finished while listing
+    return fold_segments(contents[name] for name in segments if contents[name])
@@ -1,5 +1,14 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
+import re
+
+# Placeholder left in a prompt where a stored fragment was cut out
+FRAGMENT_REF_PATTERN = re.compile(r"\{\{fragment:([0-9a-f]{64})\}\}")
+
+
+def fragment_ref(digest: str) -> str:
+    """Placeholder referencing the fragment with the given SHA-256 digest."""
+    return f"{{{{fragment:{digest}}}}}"
 
 
 class ProcessingStep(BaseModel):
@@ -27,8 +36,102 @@ class PromptTracker(BaseModel):
     
     This model maintains an ordered list of processing steps that occurred
     during a job, providing a complete history of AI interactions.
+
+    Large prompt fragments, such as document bodies and the outline, are stored once
+    in fragments and referenced from step prompts by placeholder. expand() restores
+    the full prompts.
     
     Attributes:
         steps (List[ProcessingStep]): Ordered list of processing steps that occurred
+        fragments (Dict[str, str]): Fragment text by SHA-256 digest
     """
     steps: List[ProcessingStep]
+    fragments: Dict[str, str] = {}
+
+    def expand(self) -> "PromptTracker":
+        """Return a copy with fragment placeholders replaced by their text.
+
+        Placeholders of unknown fragments are left as they are.
+        """
+        if not self.fragments:
+            return self
+
+        def resolve(match: re.Match) -> str:
+            return self.fragments.get(match.group(1), match.group(0))
+
+        return PromptTracker(
+            steps=[
+                step.model_copy(
+                    update={"prompt": FRAGMENT_REF_PATTERN.sub(resolve, step.prompt)}
+                )
+                for step in self.steps
+            ]
+        )
+
+
+class QueryUsage(BaseModel):
+    """Model for the token and latency accounting of one LLM call.
+    
+    Attributes:
+        query_name (str): Name of the query, e.g. "segment_transcript_3"
+        stage (str): Query name without its trailing index, e.g. "segment_transcript"
+        model_key (str): Model configuration key used
+        model (str): Name/identifier of the model used
+        prompt_tokens (int): Tokens sent to the model, summed over attempts
+        completion_tokens (int): Tokens generated, summed over attempts
+        retries (int): Attempts beyond the first
+        queue_wait (float): Seconds spent waiting for a concurrency slot
+        ttft (Optional[float]): Seconds to the first streamed token, None if not streamed
+        latency (float): Total seconds of the call
+        success (bool): Whether the call returned a response
+        hedged (bool): Whether this was the losing request of a hedged call, whose
+            response was discarded
+        timestamp (float): Unix timestamp when the call finished
+    """
+    query_name: str
+    stage: str
+    model_key: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    queue_wait: float = 0.0
+    ttft: Optional[float] = None
+    latency: float = 0.0
+    success: bool = True
+    hedged: bool = False
+    timestamp: float
+
+
+class StageUsage(BaseModel):
+    """Model for the token and latency totals of all calls of a stage.
+    
+    Attributes:
+        calls (int): Number of calls
+        prompt_tokens (int): Total prompt tokens
+        completion_tokens (int): Total completion tokens
+        retries (int): Total retries
+        hedged (int): Losing requests of hedged calls, included in the calls and tokens
+        latency (float): Total seconds spent in calls
+    """
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    hedged: int = 0
+    latency: float = 0.0
+
+
+class TokenUsage(BaseModel):
+    """Model for the token and latency accounting of a job's LLM calls.
+    
+    Attributes:
+        job_id (str): Job the calls belong to
+        totals (StageUsage): Totals over all calls
+        stages (Dict[str, StageUsage]): Totals per stage, to find the expensive ones
+        queries (List[QueryUsage]): Every call in the order it finished
+    """
+    job_id: str
+    totals: StageUsage
+    stages: Dict[str, StageUsage]
+    queries: List[QueryUsage]
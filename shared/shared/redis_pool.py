@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+
+import redis
+import redis.asyncio as aioredis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Redis connection config
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# Seconds a command waits for a free pooled connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "20"))
+REDIS_SOCKET_KEEPALIVE = os.getenv("REDIS_SOCKET_KEEPALIVE", "true").lower() == "true"
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "5"))
+# Empty means no read/write timeout, which pub/sub listeners rely on
+REDIS_SOCKET_TIMEOUT = (
+    float(os.getenv("REDIS_SOCKET_TIMEOUT"))
+    if os.getenv("REDIS_SOCKET_TIMEOUT")
+    else None
+)
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+
+class _BlockingPool(redis.BlockingConnectionPool):
+    """Blocking pool that tracks its checked-out connections for pool_stats()."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.checked_out: set[redis.connection.AbstractConnection] = set()
+        super().__init__(*args, **kwargs)
+
+    def reset(self) -> None:
+        super().reset()
+        self.checked_out = set()
+
+    def get_connection(self, *args, **kwargs) -> redis.connection.AbstractConnection:
+        connection = super().get_connection(*args, **kwargs)
+        self.checked_out.add(connection)
+        return connection
+
+    def release(self, connection: redis.connection.AbstractConnection) -> None:
+        self.checked_out.discard(connection)
+        super().release(connection)
+
+
+class _AsyncBlockingPool(aioredis.BlockingConnectionPool):
+    """Async counterpart of _BlockingPool."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.checked_out: set[aioredis.connection.AbstractConnection] = set()
+        super().__init__(*args, **kwargs)
+
+    def reset(self) -> None:
+        super().reset()
+        self.checked_out = set()
+
+    async def get_connection(
+        self, *args, **kwargs
+    ) -> aioredis.connection.AbstractConnection:
+        connection = await super().get_connection(*args, **kwargs)
+        self.checked_out.add(connection)
+        return connection
+
+    async def release(self, connection: aioredis.connection.AbstractConnection) -> None:
+        self.checked_out.discard(connection)
+        await super().release(connection)
+
+
+_lock = threading.Lock()
+_sync_pools: dict[str, _BlockingPool] = {}
+_async_pools: dict[str, _AsyncBlockingPool] = {}
+_pubsub_pools: dict[str, redis.ConnectionPool] = {}
+
+
+def _pool_kwargs() -> dict:
+    """Connection options shared by all pools."""
+    return {
+        "socket_keepalive": REDIS_SOCKET_KEEPALIVE,
+        "socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+        "decode_responses": False,
+    }
+
+
+def get_redis(redis_url: str | None = None) -> redis.Redis:
+    """Get a sync Redis client backed by the process-wide pool for a URL.
+
+    Once REDIS_MAX_CONNECTIONS are checked out, commands wait up to
+    REDIS_POOL_TIMEOUT seconds for one to be released.
+
+    Args:
+        redis_url (Optional[str]): Redis connection URL. Defaults to REDIS_URL.
+
+    Returns:
+        redis.Redis: Client sharing the pooled connections for the URL
+    """
+    url = redis_url or REDIS_URL
+    with _lock:
+        pool = _sync_pools.get(url)
+        if pool is None:
+            pool = _BlockingPool.from_url(
+                url,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT,
+                **_pool_kwargs(),
+            )
+            _sync_pools[url] = pool
+            logger.info(
+                f"Created Redis connection pool for {url} (max {REDIS_MAX_CONNECTIONS})"
+            )
+    return redis.Redis(connection_pool=pool)
+
+
+def get_async_redis(redis_url: str | None = None) -> aioredis.Redis:
+    """Get an asyncio Redis client backed by the process-wide async pool for a URL.
+
+    The async pool must only be used from the event loop it was first used on.
+
+    Args:
+        redis_url (Optional[str]): Redis connection URL. Defaults to REDIS_URL.
+
+    Returns:
+        redis.asyncio.Redis: Client sharing the pooled connections for the URL
+    """
+    url = redis_url or REDIS_URL
+    with _lock:
+        pool = _async_pools.get(url)
+        if pool is None:
+            pool = _AsyncBlockingPool.from_url(
+                url,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT,
+                **_pool_kwargs(),
+            )
+            _async_pools[url] = pool
+            logger.info(
+                f"Created async Redis connection pool for {url} (max {REDIS_MAX_CONNECTIONS})"
+            )
+    return aioredis.Redis(connection_pool=pool)
+
+
+def get_pubsub(redis_url: str | None = None) -> redis.client.PubSub:
+    """Get a sync pub/sub object on a separate, uncapped pool for a URL.
+
+    A subscription holds its connection until closed, so long-lived subscribers
+    would otherwise starve the shared command pool.
+
+    Args:
+        redis_url (Optional[str]): Redis connection URL. Defaults to REDIS_URL.
+
+    Returns:
+        redis.client.PubSub: Pub/sub object; close it to release its connection
+    """
+    url = redis_url or REDIS_URL
+    with _lock:
+        pool = _pubsub_pools.get(url)
+        if pool is None:
+            pool = redis.ConnectionPool.from_url(url, **_pool_kwargs())
+            _pubsub_pools[url] = pool
+    return redis.Redis(connection_pool=pool).pubsub()
+
+
+def _stats(pool: _BlockingPool | _AsyncBlockingPool) -> dict:
+    """Utilization numbers for a single pool."""
+    in_use = len(pool.checked_out)
+    return {
+        "in_use": in_use,
+        "available": pool.max_connections - in_use,
+        "max": pool.max_connections,
+        "utilization": in_use / pool.max_connections if pool.max_connections else 0.0,
+    }
+
+
+def pool_stats() -> dict[str, dict]:
+    """Report connection pool utilization for every pool created in this process.
+
+    Returns:
+        Dict[str, dict]: Stats keyed by "sync:<url>" / "async:<url>" with the
+            checked-out connections (in_use), remaining capacity (available), max
+            and utilization
+    """
+    with _lock:
+        stats = {f"sync:{url}": _stats(pool) for url, pool in _sync_pools.items()}
+        stats.update(
+            {f"async:{url}": _stats(pool) for url, pool in _async_pools.items()}
+        )
+    return stats
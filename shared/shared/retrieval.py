@@ -0,0 +1,477 @@
+from __future__ import annotations
+
+import io
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+from .storage import StorageManager
+from .tokens import split_markdown
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Estimated token size of the indexed chunks
+RETRIEVAL_CHUNK_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", "512"))
+# Chunks returned per query
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "8"))
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# Dimensions of the hashed character trigram embeddings
+RETRIEVAL_EMBEDDING_DIM = int(os.getenv("RETRIEVAL_EMBEDDING_DIM", "512"))
+# Share of the BM25 score in the hybrid score, the rest is embedding similarity
+RETRIEVAL_BM25_WEIGHT = float(os.getenv("RETRIEVAL_BM25_WEIGHT", "0.7"))
+# Loaded job indexes kept in memory
+RETRIEVAL_INDEX_CACHE_SIZE = int(os.getenv("RETRIEVAL_INDEX_CACHE_SIZE", "32"))
+
+# Owner of persisted indexes, which are looked up by job ID alone
+RETRIEVAL_USER_ID = "_retrieval"
+
+_TERM_PATTERN = re.compile(r"[a-z0-9]+(?:[.,'][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    [
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "been",
+        "but",
+        "by",
+        "for",
+        "from",
+        "had",
+        "has",
+        "have",
+        "in",
+        "into",
+        "is",
+        "it",
+        "its",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "their",
+        "there",
+        "these",
+        "this",
+        "those",
+        "to",
+        "was",
+        "were",
+        "which",
+        "will",
+        "with",
+    ]
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase terms of a text for indexing, without stopwords."""
+    return [
+        term for term in _TERM_PATTERN.findall(text.lower()) if term not in _STOPWORDS
+    ]
+
+
+def index_filename(job_id: str) -> str:
+    """Name of the persisted chunk index of a job."""
+    return f"{job_id}_retrieval_index.npz"
+
+
+def _term_features(term: str) -> list[int]:
+    """Signed embedding dimensions of a term's character trigrams.
+
+    crc32 rather than hash(), which is salted per process, so indexes stay valid
+    across services and restarts. The top bit picks the sign.
+    """
+    padded = f"#{term}#"
+    features = []
+    for i in range(max(len(padded) - 2, 1)):
+        h = zlib.crc32(padded[i : i + 3].encode())
+        dim = h % RETRIEVAL_EMBEDDING_DIM
+        features.append(dim if h & 0x80000000 else -dim - 1)
+    return features
+
+
+def _embed(
+    term_lists: list[list[str]], weights: list[list[float]], dim: int
+) -> np.ndarray:
+    """L2-normalized hashed trigram embeddings, one row per list of weighted terms."""
+    rows: list[int] = []
+    cols: list[int] = []
+    values: list[float] = []
+    features: dict[str, list[int]] = {}
+    for row, (terms, term_weights) in enumerate(zip(term_lists, weights)):
+        for term, weight in zip(terms, term_weights):
+            signed = features.get(term)
+            if signed is None:
+                signed = features[term] = _term_features(term)
+            for feature in signed:
+                rows.append(row)
+                cols.append(feature if feature >= 0 else -feature - 1)
+                values.append(weight if feature >= 0 else -weight)
+    embeddings = np.bincount(
+        np.asarray(rows, dtype=np.int64) * dim + np.asarray(cols, dtype=np.int64),
+        weights=np.asarray(values, dtype=np.float64),
+        minlength=len(term_lists) * dim,
+    ).reshape(len(term_lists), dim)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return (embeddings / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _pack_strings(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob and end offsets, to store strings without pickling."""
+    encoded = [s.encode() for s in strings]
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    ends = np.cumsum([len(e) for e in encoded], dtype=np.int64)
+    return blob, ends
+
+
+def _unpack_strings(blob: np.ndarray, ends: np.ndarray) -> list[str]:
+    data = blob.tobytes()
+    starts = np.concatenate([[0], ends[:-1]]) if len(ends) else ends
+    return [data[start:end].decode() for start, end in zip(starts, ends)]
+
+
+@dataclass
+class Chunk:
+    """A passage of an indexed document.
+
+    Attributes:
+        source (str): Document the chunk comes from, e.g. the PDF filename
+        position (int): Index of the chunk within its document
+        text (str): Markdown of the chunk
+    """
+
+    source: str
+    position: int
+    text: str
+
+
+class ChunkIndex:
+    """In-memory hybrid BM25 and hashed-embedding index over document chunks.
+
+    Documents are split at heading and paragraph boundaries into chunks of about
+    RETRIEVAL_CHUNK_TOKENS estimated tokens. Postings are kept as NumPy arrays
+    sorted by term, with the BM25 weight of each (term, chunk) pair computed once at
+    build time, so a query only sums the weights of its terms per chunk. Each chunk
+    also gets a TF-IDF weighted embedding of hashed character trigrams, which matches
+    inflections and spelling variants BM25 misses. Nothing leaves the process.
+
+    Build one with ChunkIndex.build(); to_bytes() and from_bytes() store it compactly.
+
+    Attributes:
+        chunks (List[Chunk]): Indexed chunks, in document order
+    """
+
+    def __init__(
+        self,
+        chunks: list[Chunk],
+        vocabulary: list[str],
+        idf: np.ndarray,
+        terms: np.ndarray,
+        chunk_ids: np.ndarray,
+        weights: np.ndarray,
+        embeddings: np.ndarray,
+    ):
+        self.chunks = chunks
+        self._vocabulary: dict[str, int] = {
+            term: i for i, term in enumerate(vocabulary)
+        }
+        self._idf = idf
+        self._terms = terms
+        self._chunk_ids = chunk_ids
+        self._weights = weights
+        self._embeddings = embeddings
+        self._sources = np.asarray([chunk.source for chunk in chunks], dtype=object)
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple[str, str]]) -> ChunkIndex:
+        """Chunk and index documents.
+
+        Args:
+            documents (Iterable[Tuple[str, str]]): (source, markdown) of each document
+
+        Returns:
+            ChunkIndex: Index over all chunks of the documents
+        """
+        chunks: list[Chunk] = []
+        for source, markdown in documents:
+            for position, text in enumerate(
+                split_markdown(markdown, RETRIEVAL_CHUNK_TOKENS)
+            ):
+                if text.strip():
+                    chunks.append(Chunk(source, position, text))
+
+        vocabulary: dict[str, int] = {}
+        term_ids: list[int] = []
+        chunk_ids: list[int] = []
+        counts: list[int] = []
+        chunk_terms: list[list[str]] = []
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for chunk_id, chunk in enumerate(chunks):
+            frequencies: dict[str, int] = {}
+            terms = tokenize(chunk.text)
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0) + 1
+            lengths[chunk_id] = len(terms)
+            chunk_terms.append(list(frequencies))
+            term_ids.extend(
+                vocabulary.setdefault(term, len(vocabulary)) for term in frequencies
+            )
+            chunk_ids.extend([chunk_id] * len(frequencies))
+            counts.extend(frequencies.values())
+
+        terms_arr = np.asarray(term_ids, dtype=np.int32)
+        chunks_arr = np.asarray(chunk_ids, dtype=np.int32)
+        tf = np.asarray(counts, dtype=np.float32)
+
+        # Okapi BM25 with the non-negative idf variant
+        document_frequency = np.bincount(terms_arr, minlength=len(vocabulary))
+        n = len(chunks)
+        idf = np.log1p((n - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = float(lengths.mean()) if n else 0.0
+        norm = BM25_K1 * (
+            1 - BM25_B + BM25_B * lengths[chunks_arr] / max(average_length, 1.0)
+        )
+        weights = idf[terms_arr] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        # Sublinear TF-IDF weights of each chunk's distinct terms, in posting order
+        tfidf = ((1 + np.log(tf)) * idf[terms_arr]).tolist()
+        ends = np.cumsum([len(terms) for terms in chunk_terms]).tolist()
+        embeddings = _embed(
+            chunk_terms,
+            [tfidf[end - len(terms) : end] for terms, end in zip(chunk_terms, ends)],
+            RETRIEVAL_EMBEDDING_DIM,
+        )
+
+        order = np.argsort(terms_arr, kind="stable")
+        index = cls(
+            chunks,
+            list(vocabulary),
+            idf.astype(np.float32),
+            terms_arr[order],
+            chunks_arr[order],
+            weights[order].astype(np.float32),
+            embeddings,
+        )
+        logger.info(
+            f"Indexed {n} chunks with {len(vocabulary)} terms "
+            f"from {len({chunk.source for chunk in chunks})} documents"
+        )
+        return index
+
+    def to_bytes(self) -> bytes:
+        """Serialize the index as a compressed .npz archive, without pickling."""
+        vocabulary = sorted(self._vocabulary, key=self._vocabulary.get)
+        vocabulary_blob, vocabulary_ends = _pack_strings(vocabulary)
+        text_blob, text_ends = _pack_strings([chunk.text for chunk in self.chunks])
+        source_blob, source_ends = _pack_strings(
+            [chunk.source for chunk in self.chunks]
+        )
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            vocabulary_blob=vocabulary_blob,
+            vocabulary_ends=vocabulary_ends,
+            text_blob=text_blob,
+            text_ends=text_ends,
+            source_blob=source_blob,
+            source_ends=source_ends,
+            positions=np.asarray(
+                [chunk.position for chunk in self.chunks], dtype=np.int32
+            ),
+            idf=self._idf,
+            terms=self._terms,
+            chunk_ids=self._chunk_ids,
+            weights=self._weights,
+            # Half precision is plenty for cosine similarity and halves the size
+            embeddings=self._embeddings.astype(np.float16),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> ChunkIndex:
+        """Load an index serialized with to_bytes()."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            texts = _unpack_strings(arrays["text_blob"], arrays["text_ends"])
+            sources = _unpack_strings(arrays["source_blob"], arrays["source_ends"])
+            chunks = [
+                Chunk(source, int(position), text)
+                for source, position, text in zip(sources, arrays["positions"], texts)
+            ]
+            return cls(
+                chunks,
+                _unpack_strings(arrays["vocabulary_blob"], arrays["vocabulary_ends"]),
+                arrays["idf"],
+                arrays["terms"],
+                arrays["chunk_ids"],
+                arrays["weights"],
+                arrays["embeddings"].astype(np.float32),
+            )
+
+    def scores(self, query: str) -> np.ndarray:
+        """Hybrid score of every chunk for a query.
+
+        BM25 scores are scaled to [0, 1] by the best match and blended with the
+        cosine similarity of the trigram embeddings by RETRIEVAL_BM25_WEIGHT.
+
+        Args:
+            query (str): Free text query
+
+        Returns:
+            np.ndarray: Score per chunk, aligned with self.chunks
+        """
+        bm25 = np.zeros(len(self.chunks), dtype=np.float32)
+        frequencies: dict[str, int] = {}
+        for term in tokenize(query):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        if not frequencies or not self.chunks:
+            return bm25
+
+        max_idf = float(self._idf.max()) if len(self._idf) else 1.0
+        query_weights = []
+        for term, count in frequencies.items():
+            term_id = self._vocabulary.get(term)
+            idf = max_idf if term_id is None else float(self._idf[term_id])
+            query_weights.append((1 + math.log(count)) * idf)
+            if term_id is None:
+                continue
+            start, end = np.searchsorted(self._terms, [term_id, term_id + 1])
+            bm25[self._chunk_ids[start:end]] += self._weights[start:end]
+
+        best = float(bm25.max())
+        if best > 0:
+            bm25 /= best
+        query_embedding = _embed(
+            [list(frequencies)], [query_weights], self._embeddings.shape[1]
+        )[0]
+        similarity = np.maximum(self._embeddings @ query_embedding, 0.0)
+        return RETRIEVAL_BM25_WEIGHT * bm25 + (1 - RETRIEVAL_BM25_WEIGHT) * similarity
+
+    def search_scored(
+        self,
+        query: str,
+        k: int = RETRIEVAL_TOP_K,
+        sources: Iterable[str] | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        """Find the chunks most relevant to a query, best first.
+
+        Args:
+            query (str): Free text query
+            k (int): Maximum number of chunks to return
+            sources (Optional[Iterable[str]]): Only search these documents
+
+        Returns:
+            List[Tuple[Chunk, float]]: Up to k matching chunks with their scores
+        """
+        scores = self.scores(query)
+        if sources is not None:
+            scores[~np.isin(self._sources, list(sources))] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.chunks[i], float(scores[i])) for i in candidates]
+
+    def search(
+        self,
+        query: str,
+        k: int = RETRIEVAL_TOP_K,
+        sources: Iterable[str] | None = None,
+    ) -> list[Chunk]:
+        """Find the chunks most relevant to a query.
+
+        Args:
+            query (str): Free text query
+            k (int): Maximum number of chunks to return
+            sources (Optional[Iterable[str]]): Only search these documents
+
+        Returns:
+            List[Chunk]: Up to k matching chunks, in document order so they read
+                as coherent excerpts
+        """
+        order = {id(chunk): i for i, chunk in enumerate(self.chunks)}
+        matches = [chunk for chunk, _ in self.search_scored(query, k, sources)]
+        return sorted(matches, key=lambda chunk: order[id(chunk)])
+
+
+def save_index(storage_manager: StorageManager, job_id: str, index: ChunkIndex):
+    """Persist a job's chunk index to storage.
+
+    Args:
+        storage_manager (StorageManager): Storage to write to
+        job_id (str): ID of the job the index covers
+        index (ChunkIndex): Index to persist
+    """
+    data = index.to_bytes()
+    storage_manager.store_file(
+        RETRIEVAL_USER_ID,
+        job_id,
+        data,
+        index_filename(job_id),
+        "application/octet-stream",
+    )
+    logger.info(f"Stored {len(data)} byte retrieval index for {job_id}")
+
+
+_cache_lock = threading.Lock()
+_index_cache: OrderedDict[str, ChunkIndex] = OrderedDict()
+
+
+def load_index(storage_manager: StorageManager, job_id: str) -> ChunkIndex | None:
+    """Get a job's persisted chunk index, from memory if recently used.
+
+    Blocking on a cache miss. Keeps the RETRIEVAL_INDEX_CACHE_SIZE most recently
+    used indexes in memory.
+
+    Args:
+        storage_manager (StorageManager): Storage holding the index
+        job_id (str): ID of the job
+
+    Returns:
+        Optional[ChunkIndex]: The index, None if the job has none
+    """
+    with _cache_lock:
+        index = _index_cache.get(job_id)
+        if index is not None:
+            _index_cache.move_to_end(job_id)
+            return index
+
+    data = storage_manager.get_file(RETRIEVAL_USER_ID, job_id, index_filename(job_id))
+    if data is None:
+        return None
+    index = ChunkIndex.from_bytes(data)
+
+    with _cache_lock:
+        _index_cache[job_id] = index
+        _index_cache.move_to_end(job_id)
+        while len(_index_cache) > RETRIEVAL_INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def delete_index(storage_manager: StorageManager, job_id: str) -> bool:
+    """Drop a job's chunk index from memory and storage.
+
+    Returns:
+        bool: True if storage deletion succeeded
+    """
+    with _cache_lock:
+        _index_cache.pop(job_id, None)
+    return storage_manager.delete_files(
+        RETRIEVAL_USER_ID, job_id, [index_filename(job_id)]
+    )
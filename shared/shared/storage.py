@@ -1,93 +1,149 @@
 import io
 import ujson as json
 import base64
-from minio import Minio
-from minio.error import S3Error
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from shared.api_types import TranscriptionParams
 from shared.otel import OpenTelemetryInstrumentation
+from shared.compression import compress, decompress, iter_decompress, resolve_encoding
+from shared.storage_cache import CacheEntry, StorageCache
+from shared.storage_backends import StorageBackend, create_storage_backend
+from opentelemetry import trace
 from opentelemetry.trace.status import StatusCode
 import os
 import logging
-import urllib3
-from urllib3 import Retry
-from urllib3.util import Timeout
-from typing import Optional
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Minio config
-MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
-MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
-MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
-MINIO_BUCKET_NAME = os.getenv("MINIO_BUCKET_NAME", "audio-results")
+# User metadata key recording the compression applied to a stored object. A custom key
+# is used instead of Content-Encoding so HTTP clients never decode it behind our back.
+CONTENT_ENCODING_METADATA = "X-Amz-Meta-Content-Encoding"
+
+# Lifetime of presigned download URLs in seconds
+PRESIGNED_URL_EXPIRY = int(os.getenv("PRESIGNED_URL_EXPIRY", "300"))
+
+# Worker threads dedicated to blocking storage calls made from async code. The MinIO
+# HTTP connection pool is sized to match so workers never wait on a connection.
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "10"))
+
+# Streaming transfer sizes. Uploads of unknown length are sent as multipart uploads
+# one part at a time, so a part (S3 minimum 5MiB) is the most an upload holds in memory.
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", str(64 * 1024)))
+STORAGE_PART_SIZE = max(
+    int(os.getenv("STORAGE_PART_SIZE", str(5 * 1024 * 1024))), 5 * 1024 * 1024
+)
+
+# Concurrent transfers used by store_many/get_many
+STORAGE_BULK_CONCURRENCY = int(os.getenv("STORAGE_BULK_CONCURRENCY", "8"))
+
+
+class _IterableReader(io.RawIOBase):
+    """Read-only file object over an iterable of byte chunks.
+
+    Only the unread remainder of the current chunk is buffered, so wrapping a
+    response body lets it be uploaded without materializing it.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        # Current chunk and how much of it was read; slices of the view aren't copies
+        self._chunk = memoryview(b"")
+        self._offset = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [self._chunk[self._offset :], *self._chunks]
+            self._chunk, self._offset = memoryview(b""), 0
+        else:
+            # Collect the pieces and join them once, so each byte is copied once
+            parts = []
+            while size > 0:
+                if self._offset == len(self._chunk):
+                    chunk = next(self._chunks, None)
+                    if chunk is None:
+                        break
+                    self._chunk, self._offset = memoryview(chunk), 0
+                    continue
+                part = self._chunk[self._offset : self._offset + size]
+                self._offset += len(part)
+                size -= len(part)
+                parts.append(part)
+        data = b"".join(parts)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
 
 
 # TODO: use this to wrap redis as well
 # TODO: wrap errors in StorageError
 # TODO: implement cleanup and delete as well
 class StorageManager:
-    """Manages storage operations using MinIO as the backend.
+    """Manages storage operations on a pluggable backend, MinIO by default.
 
-    This class provides an interface for storing and retrieving files using MinIO,
-    with support for user isolation, job tracking, and metadata management.
+    This class provides an interface for storing and retrieving files, with support
+    for user isolation, job tracking, and metadata management. Objects are kept by a
+    StorageBackend selected with STORAGE_BACKEND ("minio" or "local").
 
     Attributes:
         telemetry (OpenTelemetryInstrumentation): Instance for tracing operations
-        client (Minio): MinIO client instance
-        bucket_name (str): Name of the MinIO bucket to use
+        backend (StorageBackend): Backend holding the objects
+        cache (Optional[StorageCache]): Read-through cache, None if disabled
     """
 
-    def __init__(self, telemetry: OpenTelemetryInstrumentation):
-        """Initialize MinIO client and ensure bucket exists. 
-        requires: OpenTelemetryInstrumentation instance for tracing since Minio
-        does not have an auto otel instrumentor
+    def __init__(
+        self,
+        telemetry: OpenTelemetryInstrumentation,
+        backend: Optional[StorageBackend] = None,
+    ):
+        """Initialize the storage backend.
 
-        Requires:
         Args:
             telemetry (OpenTelemetryInstrumentation): Instance for tracing since MinIO
                 does not have an auto OpenTelemetry instrumentor
+            backend (StorageBackend, optional): Backend to use. Defaults to the one
+                selected by STORAGE_BACKEND.
 
         Raises:
-            Exception: If MinIO client initialization fails
+            Exception: If backend initialization fails
         """
         try:
             self.telemetry: OpenTelemetryInstrumentation = telemetry
-            # pass in http_client for tracing
-            http_client = urllib3.PoolManager(
-                timeout=Timeout(connect=5, read=5),
-                maxsize=10,
-                retries=Retry(
-                    total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
-                ),
+            self.backend: StorageBackend = backend or create_storage_backend(
+                max_connections=max(10, STORAGE_MAX_WORKERS)
             )
-            self.client = Minio(
-                os.getenv("MINIO_ENDPOINT", "minio:9000"),
-                access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
-                secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
-                secure=os.getenv("MINIO_SECURE", "false").lower() == "true",
-                http_client=http_client,
+            # Optional read-through cache, see shared.storage_cache
+            self.cache: Optional[StorageCache] = StorageCache.from_env()
+            # Runs the individual transfers of store_many/get_many
+            self._bulk_executor = ThreadPoolExecutor(
+                max_workers=STORAGE_BULK_CONCURRENCY, thread_name_prefix="storage-bulk"
             )
-
-            self.bucket_name = os.getenv("MINIO_BUCKET_NAME", "audio-results")
-            self._ensure_bucket_exists()
-            logger.info("Successfully initialized MinIO storage")
+            logger.info(f"Successfully initialized {self.backend.name} storage")
 
         except Exception as e:
-            logger.error(f"Failed to initialize MinIO client: {e}")
-            raise
-
-    def _ensure_bucket_exists(self):
-        """Ensure the configured bucket exists, creating it if necessary.
-
-        Raises:
-            Exception: If bucket creation fails
-        """
-        try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
-        except Exception as e:
-            logger.error(f"Failed to ensure bucket exists: {e}")
+            logger.error(f"Failed to initialize storage backend: {e}")
             raise
 
     def _get_object_path(self, user_id: str, job_id: str, filename: str) -> str:
@@ -111,8 +167,9 @@ class StorageManager:
         filename: str,
         content_type: str,
         metadata: dict = None,
+        compression: Optional[str] = None,
     ) -> None:
-        """Store any file type in MinIO with metadata.
+        """Store any file type with metadata.
 
         Args:
             user_id (str): ID of the user
@@ -121,6 +178,9 @@ class StorageManager:
             filename (str): Name of the file
             content_type (str): MIME type of the file
             metadata (dict, optional): Additional metadata to store. Defaults to None.
+            compression (str, optional): Compress the content with "gzip" or "zstd".
+                The encoding is recorded in the object metadata and reads decompress
+                transparently. Defaults to None.
 
         Raises:
             Exception: If file storage fails
@@ -131,16 +191,24 @@ class StorageManager:
             span.set_attribute("filename", filename)
             try:
                 object_name = self._get_object_path(user_id, job_id, filename)
-                self.client.put_object(
-                    self.bucket_name,
+                metadata = (
+                    metadata.model_dump() if hasattr(metadata, "model_dump") else metadata
+                )
+                encoding = resolve_encoding(compression)
+                if encoding:
+                    span.set_attribute("size", len(content))
+                    content = compress(content, encoding)
+                    span.set_attribute("encoding", encoding)
+                    metadata = {**(metadata or {}), CONTENT_ENCODING_METADATA: encoding}
+                self.backend.put(
                     object_name,
                     io.BytesIO(content),
-                    length=len(content),
-                    content_type=content_type,
-                    metadata=metadata.model_dump()
-                    if hasattr(metadata, "model_dump")
-                    else metadata,
+                    len(content),
+                    content_type,
+                    metadata,
+                    STORAGE_PART_SIZE,
                 )
+                self._invalidate(object_name)
             except Exception as e:
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
@@ -149,57 +217,190 @@ class StorageManager:
                 )
                 raise
 
+    def put_stream(
+        self,
+        user_id: str,
+        job_id: str,
+        data: Union[Iterable[bytes], BinaryIO],
+        filename: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        length: int = -1,
+        part_size: int = STORAGE_PART_SIZE,
+    ) -> int:
+        """Store a file from a stream without loading it into memory.
+
+        Data of unknown length is sent as a multipart upload, one part at a time.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            data (Union[Iterable[bytes], BinaryIO]): Iterable of byte chunks or a
+                readable binary file object
+            filename (str): Name of the file
+            content_type (str): MIME type of the file
+            metadata (dict, optional): Additional metadata to store. Defaults to None.
+            length (int, optional): Content length if known. Defaults to -1 (unknown).
+            part_size (int, optional): Multipart part size in bytes.
+                Defaults to STORAGE_PART_SIZE.
+
+        Returns:
+            int: Number of bytes stored
+
+        Raises:
+            Exception: If file storage fails
+        """
+        with self.telemetry.tracer.start_as_current_span("put_stream") as span:
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("filename", filename)
+            try:
+                object_name = self._get_object_path(user_id, job_id, filename)
+                metadata = (
+                    metadata.model_dump() if hasattr(metadata, "model_dump") else metadata
+                )
+                reader = data if hasattr(data, "read") else _IterableReader(data)
+                self.backend.put(
+                    object_name, reader, length, content_type, metadata, part_size
+                )
+                self._invalidate(object_name)
+                size = length if length >= 0 else getattr(reader, "bytes_read", -1)
+                span.set_attribute("size", size)
+                return size
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to stream file {filename} for user {user_id}, job {job_id}: {e!s}"
+                )
+                raise
+
     def store_audio(
         self,
         user_id: str,
         job_id: str,
-        audio_content: bytes,
+        audio_content: Union[bytes, Iterable[bytes], BinaryIO],
         filename: str,
         transcription_params: TranscriptionParams,
-    ):
-        """Store audio file with metadata in MinIO.
+    ) -> int:
+        """Store audio file with metadata.
 
         Args:
             user_id (str): ID of the user
             job_id (str): ID of the job
-            audio_content (bytes): Audio file content
+            audio_content (Union[bytes, Iterable[bytes], BinaryIO]): Audio file content,
+                either as bytes or as a stream which is uploaded without buffering it
             filename (str): Name of the audio file
             transcription_params (TranscriptionParams): Parameters used for transcription
 
+        Returns:
+            int: Number of bytes stored
+
         Raises:
-            S3Error: If MinIO storage operation fails
+            Exception: If the storage operation fails
         """
         with self.telemetry.tracer.start_as_current_span("store_audio") as span:
             span.set_attribute("job_id", job_id)
             span.set_attribute("user_id", user_id)
             span.set_attribute("filename", filename)
             try:
-                object_name = self._get_object_path(user_id, job_id, filename)
-
                 # Convert transcription params to JSON string for metadata
                 params_json = json.dumps(transcription_params.model_dump())
 
                 # Create metadata dictionary with transcription params
                 metadata = {"X-Amz-Meta-Transcription-Params": params_json}
 
-                self.client.put_object(
-                    self.bucket_name,
-                    object_name,
-                    io.BytesIO(audio_content),
-                    len(audio_content),
-                    content_type="audio/mpeg",
-                    metadata=metadata,
-                )
+                if isinstance(audio_content, bytes):
+                    size = self.put_stream(
+                        user_id,
+                        job_id,
+                        io.BytesIO(audio_content),
+                        filename,
+                        "audio/mpeg",
+                        metadata,
+                        length=len(audio_content),
+                    )
+                else:
+                    size = self.put_stream(
+                        user_id, job_id, audio_content, filename, "audio/mpeg", metadata
+                    )
                 logger.info(
-                    f"Stored audio for user {user_id}, job {job_id} in MinIO as {object_name} with metadata"
+                    f"Stored audio for user {user_id}, job {job_id} as {filename} with metadata"
                 )
+                return size
 
-            except S3Error as e:
+            except Exception as e:
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
-                logger.error(f"Failed to store audio in MinIO: {e}")
+                logger.error(f"Failed to store audio: {e}")
                 raise
 
+    def _invalidate(self, object_name: str):
+        """Drop an object from the read-through cache after it was written or deleted."""
+        if self.cache is not None:
+            self.cache.invalidate(object_name)
+
+    def _cached(self, object_name: str) -> Optional[CacheEntry]:
+        """Look an object up in the cache, revalidating its ETag once it is stale.
+
+        Returns:
+            Optional[CacheEntry]: Entry still matching storage, None on a miss
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.get(object_name)
+        if entry is None or not self.cache.needs_revalidation(entry):
+            return entry
+        info = self.backend.stat(object_name)
+        etag = info.etag if info is not None else None
+        if etag is None or etag != entry.etag:
+            self.cache.invalidate(object_name)
+            return None
+        self.cache.mark_validated(object_name)
+        return entry
+
+    def _read_object(self, object_name: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Read an object as stored, through the cache if one is configured.
+
+        Returns:
+            Optional[Tuple[bytes, Optional[str]]]: Stored content and its content
+                encoding, None if the object doesn't exist
+        """
+        trace.get_current_span().set_attribute("cache_hit", False)
+        entry = self._cached(object_name)
+        if entry is not None:
+            trace.get_current_span().set_attribute("cache_hit", True)
+            return entry.read(), entry.encoding
+
+        stored = self.backend.open(object_name)
+        if stored is None:
+            return None
+        try:
+            data = stored.read()
+            encoding = stored.metadata.get(CONTENT_ENCODING_METADATA)
+            etag = stored.etag
+        finally:
+            stored.close()
+        if self.cache is not None:
+            self.cache.put(object_name, data, etag, encoding)
+        return data, encoding
+
+    def cache_stats(self) -> Optional[dict]:
+        """Hit-rate and occupancy of the read-through cache, None if it is disabled."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def _find_audio_object(self, user_id: str, job_id: str) -> Optional[str]:
+        """Find the object name of a job's podcast audio, None if there is none."""
+        prefix = f"{user_id}/{job_id}/"
+        # Audio stored by store_audio is named after the job, skip the listing if cached
+        expected = f"{prefix}{job_id}.mp3"
+        if self.cache is not None and expected in self.cache:
+            return expected
+        for obj in self.backend.list(prefix):
+            if obj.name.endswith(".mp3"):
+                return obj.name
+        return None
+
     def get_podcast_audio(self, user_id: str, job_id: str) -> Optional[str]:
         """Get the audio data for a specific podcast by job_id.
 
@@ -218,32 +419,75 @@ class StorageManager:
             span.set_attribute("user_id", user_id)
             try:
                 # Find the file with matching user_id and job_id
-                prefix = f"{user_id}/{job_id}/"
-                objects = self.client.list_objects(
-                    self.bucket_name, prefix=prefix, recursive=True
+                object_name = self._find_audio_object(user_id, job_id)
+                if object_name is None:
+                    return None
+
+                span.set_attribute("audio_file", object_name)
+                stored = self._read_object(object_name)
+                if stored is None:
+                    return None
+                audio_data, encoding = stored
+                return base64.b64encode(decompress(audio_data, encoding)).decode(
+                    "utf-8"
                 )
 
-                for obj in objects:
-                    if obj.object_name.endswith(".mp3"):
-                        span.set_attribute("audio_file", obj.object_name)
-                        audio_data = self.client.get_object(
-                            self.bucket_name, obj.object_name
-                        ).read()
-                        return base64.b64encode(audio_data).decode("utf-8")
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to get audio for user {user_id}, job {job_id}: {str(e)}"
+                )
+                raise
+
+    def get_file_encoded(
+        self, user_id: str, job_id: str, filename: str
+    ) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Get a file as stored, without decompressing it.
+
+        This allows serving pre-compressed bytes directly to clients that accept the
+        stored encoding.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filename (str): Name of the file to retrieve
+
+        Returns:
+            Optional[Tuple[bytes, Optional[str]]]: Stored content and its content encoding
+                (None if uncompressed), or None if the file doesn't exist
+
+        Raises:
+            Exception: If retrieval fails for reasons other than missing file
+        """
+        with self.telemetry.tracer.start_as_current_span("get_file") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("filename", filename)
+            try:
+                object_name = self._get_object_path(user_id, job_id, filename)
 
-                return None
+                stored = self._read_object(object_name)
+                if stored is None:
+                    return None
+                data, encoding = stored
+                if encoding:
+                    span.set_attribute("encoding", encoding)
+                return data, encoding
 
             except Exception as e:
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(
-                    f"Failed to get audio for user {user_id}, job {job_id}: {str(e)}"
+                    f"Failed to get file {filename} for user {user_id}, job {job_id}: {str(e)}"
                 )
                 raise
 
     def get_file(self, user_id: str, job_id: str, filename: str) -> Optional[bytes]:
         """Get any file from storage by user_id, job_id and filename.
 
+        Files stored compressed are decompressed transparently.
+
         Args:
             user_id (str): ID of the user
             job_id (str): ID of the job
@@ -255,30 +499,480 @@ class StorageManager:
         Raises:
             Exception: If retrieval fails for reasons other than missing file
         """
-        with self.telemetry.tracer.start_as_current_span("get_file") as span:
+        stored = self.get_file_encoded(user_id, job_id, filename)
+        if stored is None:
+            return None
+        data, encoding = stored
+        return decompress(data, encoding)
+
+    def _stream_object(
+        self, object_name: str, chunk_size: int
+    ) -> Optional[Iterator[bytes]]:
+        """Open an object and return an iterator over its decoded chunks.
+
+        Served from the cache when possible; otherwise the stored bytes are cached as
+        they are streamed. The connection or file is released once the iterator is exhausted
+        or closed.
+
+        Returns:
+            Optional[Iterator[bytes]]: Chunk iterator, None if the object doesn't exist
+        """
+        trace.get_current_span().set_attribute("cache_hit", False)
+        entry = self._cached(object_name)
+        if entry is not None:
+            trace.get_current_span().set_attribute("cache_hit", True)
+            return iter_decompress(entry.iter_chunks(chunk_size), entry.encoding)
+
+        stored = self.backend.open(object_name)
+        if stored is None:
+            return None
+
+        encoding = stored.metadata.get(CONTENT_ENCODING_METADATA)
+
+        def _chunks():
+            chunks = stored.stream(chunk_size)
+            if self.cache is not None:
+                chunks = self.cache.tee(object_name, chunks, stored.etag, encoding)
+            try:
+                yield from iter_decompress(chunks, encoding)
+            finally:
+                stored.close()
+
+        return _chunks()
+
+    def open_stream(
+        self,
+        user_id: str,
+        job_id: str,
+        filename: str,
+        chunk_size: int = STORAGE_CHUNK_SIZE,
+    ) -> Optional[Iterator[bytes]]:
+        """Stream a file from storage in chunks, decompressing it if it was stored compressed.
+
+        At most one chunk is held in memory. Close the iterator (or exhaust it) to
+        release the underlying connection.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filename (str): Name of the file to retrieve
+            chunk_size (int, optional): Size of each chunk in bytes.
+                Defaults to STORAGE_CHUNK_SIZE.
+
+        Returns:
+            Optional[Iterator[bytes]]: Iterator over the file content if found, None if
+                the file doesn't exist
+
+        Raises:
+            Exception: If retrieval fails for reasons other than missing file
+        """
+        with self.telemetry.tracer.start_as_current_span("open_stream") as span:
             span.set_attribute("job_id", job_id)
             span.set_attribute("user_id", user_id)
             span.set_attribute("filename", filename)
             try:
                 object_name = self._get_object_path(user_id, job_id, filename)
+                return self._stream_object(object_name, chunk_size)
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to stream file {filename} for user {user_id}, job {job_id}: {e!s}"
+                )
+                raise
+
+    def open_podcast_audio(
+        self, user_id: str, job_id: str, chunk_size: int = STORAGE_CHUNK_SIZE
+    ) -> Optional[Iterator[bytes]]:
+        """Stream the raw audio of a podcast by job_id.
 
-                try:
-                    data = self.client.get_object(self.bucket_name, object_name).read()
-                    return data
-                except S3Error as e:
-                    span.set_attribute("error", str(e))
-                    if e.code == "NoSuchKey":
-                        return None
-                    raise
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            chunk_size (int, optional): Size of each chunk in bytes.
+                Defaults to STORAGE_CHUNK_SIZE.
+
+        Returns:
+            Optional[Iterator[bytes]]: Iterator over the MP3 content if found, None
+                otherwise
 
+        Raises:
+            Exception: If retrieval fails
+        """
+        with self.telemetry.tracer.start_as_current_span("open_podcast_audio") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            try:
+                object_name = self._find_audio_object(user_id, job_id)
+                if object_name is None:
+                    return None
+                span.set_attribute("audio_file", object_name)
+                return self._stream_object(object_name, chunk_size)
             except Exception as e:
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(
-                    f"Failed to get file {filename} for user {user_id}, job {job_id}: {str(e)}"
+                    f"Failed to stream audio for user {user_id}, job {job_id}: {e!s}"
+                )
+                raise
+
+    def _presign(
+        self,
+        object_name: str,
+        expires: int,
+        download_name: Optional[str],
+        content_type: Optional[str],
+    ) -> Optional[str]:
+        """Sign a GET URL for an object, None if the backend can't serve URLs."""
+        response_headers = {}
+        if download_name:
+            response_headers["response-content-disposition"] = (
+                f"attachment; filename={download_name}"
+            )
+        if content_type:
+            response_headers["response-content-type"] = content_type
+        return self.backend.presign(object_name, expires, response_headers)
+
+    def presigned_url(
+        self,
+        user_id: str,
+        job_id: str,
+        filename: str,
+        expires: int = PRESIGNED_URL_EXPIRY,
+        download_name: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Optional[str]:
+        """Get a short-lived presigned GET URL for a file.
+
+        Clients download the file directly from object storage. Only use this for
+        files stored uncompressed, since the stored bytes are served as is. Signing is a
+        local computation.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filename (str): Name of the file
+            expires (int, optional): Seconds the URL stays valid.
+                Defaults to PRESIGNED_URL_EXPIRY.
+            download_name (str, optional): Filename for the Content-Disposition header
+            content_type (str, optional): Content-Type the download is served with
+
+        Returns:
+            Optional[str]: Presigned URL, None if the file doesn't exist or the backend
+                can't serve URLs
+
+        Raises:
+            Exception: If the existence check fails for reasons other than missing file
+        """
+        with self.telemetry.tracer.start_as_current_span("presigned_url") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("filename", filename)
+            try:
+                object_name = self._get_object_path(user_id, job_id, filename)
+                url = self._presign(object_name, expires, download_name, content_type)
+                if url is None:
+                    return None
+                cached = self.cache is not None and object_name in self.cache
+                if not cached and self.backend.stat(object_name) is None:
+                    return None
+                return url
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to presign {filename} for user {user_id}, job {job_id}: {e!s}"
+                )
+                raise
+
+    def presigned_podcast_audio_url(
+        self, user_id: str, job_id: str, expires: int = PRESIGNED_URL_EXPIRY
+    ) -> Optional[str]:
+        """Get a short-lived presigned GET URL for a podcast's audio.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            expires (int, optional): Seconds the URL stays valid.
+                Defaults to PRESIGNED_URL_EXPIRY.
+
+        Returns:
+            Optional[str]: Presigned URL, None if the podcast has no audio or the backend
+                can't serve URLs
+
+        Raises:
+            Exception: If looking up the audio fails
+        """
+        with self.telemetry.tracer.start_as_current_span(
+            "presigned_podcast_audio_url"
+        ) as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            try:
+                object_name = self._find_audio_object(user_id, job_id)
+                if object_name is None:
+                    return None
+                span.set_attribute("audio_file", object_name)
+                return self._presign(
+                    object_name, expires, f"{job_id}.mp3", "audio/mpeg"
+                )
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to presign audio for user {user_id}, job {job_id}: {e!s}"
                 )
                 raise
 
+    def _local_file(self, object_name: str) -> Optional[str]:
+        """Local path of an object that can be served as is, None otherwise."""
+        if not self.backend.is_local:
+            return None
+        path = self.backend.local_path(object_name)
+        if path is None:
+            return None
+        info = self.backend.stat(object_name)
+        if info is None or info.metadata.get(CONTENT_ENCODING_METADATA):
+            return None
+        return path
+
+    def local_file(self, user_id: str, job_id: str, filename: str) -> Optional[str]:
+        """Get the local path of a file so it can be sent with sendfile.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filename (str): Name of the file
+
+        Returns:
+            Optional[str]: Path of the file, None if it doesn't exist, is stored
+                compressed, or the backend doesn't keep files locally
+        """
+        return self._local_file(self._get_object_path(user_id, job_id, filename))
+
+    def local_podcast_audio(self, user_id: str, job_id: str) -> Optional[str]:
+        """Get the local path of a podcast's audio so it can be sent with sendfile.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+
+        Returns:
+            Optional[str]: Path of the MP3, None if there is none or the backend doesn't
+                keep files locally
+        """
+        if not self.backend.is_local:
+            return None
+        object_name = self._find_audio_object(user_id, job_id)
+        return self._local_file(object_name) if object_name else None
+
+    def _map_bulk(self, func: Callable, items: List) -> List:
+        """Apply func to every item on the bulk executor, keeping the caller's context.
+
+        All items run to completion; the first error is raised afterwards.
+        """
+        futures = [
+            self._bulk_executor.submit(contextvars.copy_context().run, func, item)
+            for item in items
+        ]
+        results, error = [], None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(None)
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def store_many(
+        self,
+        user_id: str,
+        job_id: str,
+        files: List[Tuple[str, bytes, str]],
+        metadata: Optional[dict] = None,
+        compression: Optional[str] = None,
+    ) -> None:
+        """Store several files of a job concurrently.
+
+        At most STORAGE_BULK_CONCURRENCY uploads run at once.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            files (List[Tuple[str, bytes, str]]): (filename, content, content_type) tuples
+            metadata (dict, optional): Metadata stored with every file. Defaults to None.
+            compression (str, optional): Compress the content with "gzip" or "zstd".
+                Defaults to None.
+
+        Raises:
+            Exception: If storing any file fails, after all uploads have finished
+        """
+        with self.telemetry.tracer.start_as_current_span("store_many") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("num_files", len(files))
+            try:
+                self._map_bulk(
+                    lambda file: self.store_file(
+                        user_id,
+                        job_id,
+                        file[1],
+                        file[0],
+                        file[2],
+                        metadata,
+                        compression=compression,
+                    ),
+                    files,
+                )
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                raise
+
+    def get_many(
+        self, user_id: str, job_id: str, filenames: List[str]
+    ) -> Dict[str, Optional[bytes]]:
+        """Get several files of a job concurrently.
+
+        At most STORAGE_BULK_CONCURRENCY downloads run at once.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filenames (List[str]): Names of the files to retrieve
+
+        Returns:
+            Dict[str, Optional[bytes]]: File content by filename, None for missing files
+
+        Raises:
+            Exception: If retrieval fails for reasons other than missing files
+        """
+        with self.telemetry.tracer.start_as_current_span("get_many") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("num_files", len(filenames))
+            try:
+                contents = self._map_bulk(
+                    lambda filename: self.get_file(user_id, job_id, filename),
+                    filenames,
+                )
+                return dict(zip(filenames, contents))
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                raise
+
+    def delete_file(self, user_id: str, job_id: str, filename: str) -> None:
+        """Delete a single file from storage.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filename (str): Name of the file to delete
+
+        Raises:
+            Exception: If deletion fails
+        """
+        with self.telemetry.tracer.start_as_current_span("delete_file") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("filename", filename)
+            try:
+                object_name = self._get_object_path(user_id, job_id, filename)
+                self.backend.remove(object_name)
+                self._invalidate(object_name)
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to delete file {filename} for user {user_id}, job {job_id}: {e!s}"
+                )
+                raise
+
+    def list_job_files(self, user_id: str, job_id: str) -> List[str]:
+        """List the names of all files stored for a job.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+
+        Returns:
+            List[str]: Filenames relative to the job
+
+        Raises:
+            Exception: If listing fails
+        """
+        with self.telemetry.tracer.start_as_current_span("list_job_files") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            try:
+                prefix = self._get_object_path(user_id, job_id, "")
+                return [obj.name[len(prefix) :] for obj in self.backend.list(prefix)]
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to list files for user {user_id}, job {job_id}: {e!s}"
+                )
+                raise
+
+    def delete_files(self, user_id: str, job_id: str, filenames: List[str]) -> bool:
+        """Delete several files of a job in bulk.
+
+        Args:
+            user_id (str): ID of the user
+            job_id (str): ID of the job
+            filenames (List[str]): Names of the files to delete
+
+        Returns:
+            bool: True if every file was deleted, False otherwise
+        """
+        with self.telemetry.tracer.start_as_current_span("delete_files") as span:
+            span.set_attribute("job_id", job_id)
+            span.set_attribute("user_id", user_id)
+            span.set_attribute("num_files", len(filenames))
+            try:
+                names = [
+                    self._get_object_path(user_id, job_id, filename)
+                    for filename in filenames
+                ]
+                failed = self.backend.remove_many(names)
+                for name in names:
+                    self._invalidate(name)
+                return not failed
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(
+                    f"Failed to delete files for user {user_id}, job {job_id}: {str(e)}"
+                )
+                return False
+
+    def delete_many(self, files: List[Tuple[str, str, str]]) -> bool:
+        """Delete files of several jobs in bulk. Missing files are not an error.
+
+        Args:
+            files (List[Tuple[str, str, str]]): (user_id, job_id, filename) tuples
+
+        Returns:
+            bool: True if every file was deleted, False otherwise
+        """
+        with self.telemetry.tracer.start_as_current_span("delete_many") as span:
+            span.set_attribute("num_files", len(files))
+            try:
+                names = [self._get_object_path(*file) for file in files]
+                failed = self.backend.remove_many(names)
+                for name in names:
+                    self._invalidate(name)
+                return not failed
+            except Exception as e:
+                span.set_status(StatusCode.ERROR)
+                span.record_exception(e)
+                logger.error(f"Failed to delete {len(files)} files: {e!s}")
+                return False
+
     def delete_job_files(self, user_id: str, job_id: str) -> bool:
         """Delete all files associated with a user_id and job_id.
 
@@ -295,22 +989,27 @@ class StorageManager:
             try:
                 # List all objects with the user_id/job_id prefix
                 prefix = f"{user_id}/{job_id}/"
-                objects = self.client.list_objects(
-                    self.bucket_name, prefix=prefix, recursive=True
-                )
+                names = [obj.name for obj in self.backend.list(prefix)]
+                span.set_attribute("num_objects", len(names))
 
-                # Delete each object
-                for obj in objects:
-                    self.client.remove_object(self.bucket_name, obj.object_name)
-                    logger.info(f"Deleted object: {obj.object_name}")
-
-                return True
+                # Delete them in bulk
+                failed = self.backend.remove_many(names)
+                if self.cache is not None:
+                    self.cache.invalidate_prefix(prefix)
+                logger.info(
+                    f"Deleted {len(names) - len(failed)} of {len(names)} objects under {prefix}"
+                )
+                if failed:
+                    span.set_status(
+                        StatusCode.ERROR, f"failed to delete {len(failed)} objects"
+                    )
+                return not failed
 
             except Exception as e:
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
                 logger.error(
-                    f"Failed to delete files for user {user_id}, job {job_id}: {str(e)}"
+                    f"Failed to delete files for user {user_id}, job {job_id}: {e!s}"
                 )
                 return False
 
@@ -333,21 +1032,19 @@ class StorageManager:
                 span.set_attribute("user_id", user_id)
                 span.set_attribute("prefix", prefix)
 
-                objects = self.client.list_objects(
-                    self.bucket_name, prefix=prefix, recursive=True
-                )
+                objects = self.backend.list(prefix)
                 files = []
 
                 for obj in objects:
-                    logger.info(f"Object: {obj.object_name}")
-                    if obj.object_name.endswith("/"):
+                    logger.info(f"Object: {obj.name}")
+                    if obj.name.endswith("/"):
                         continue
 
                     try:
-                        stat = self.client.stat_object(
-                            self.bucket_name, obj.object_name
-                        )
-                        path_parts = obj.object_name.split("/")
+                        stat = self.backend.stat(obj.name)
+                        if stat is None:
+                            continue
+                        path_parts = obj.name.split("/")
                         logger.info(f"Path parts: {path_parts}")
 
                         if not path_parts[-1].endswith(".mp3"):
@@ -363,7 +1060,7 @@ class StorageManager:
                             "filename": path_parts[-1],
                             "size": stat.size,
                             "created_at": obj.last_modified.isoformat(),
-                            "path": obj.object_name,
+                            "path": obj.name,
                             "transcription_params": {},
                         }
 
@@ -378,28 +1075,262 @@ class StorageManager:
                                     )
                             except json.JSONDecodeError:
                                 logger.warning(
-                                    f"Could not parse transcription params for {obj.object_name}"
+                                    f"Could not parse transcription params for {obj.name}"
                                 )
 
                         files.append(file_info)
                         logger.info(
-                            f"Found file: {obj.object_name}, size: {stat.size} bytes"
+                            f"Found file: {obj.name}, size: {stat.size} bytes"
                         )
 
                     except Exception as e:
                         logger.error(
-                            f"Error processing object {obj.object_name}: {str(e)}"
+                            f"Error processing object {obj.name}: {e!s}"
                         )
                         continue
 
                 files.sort(key=lambda x: x["created_at"], reverse=True)
                 logger.info(
-                    f"Successfully listed {len(files)} metadata for {len(files)} files from MinIO"
+                    f"Successfully listed {len(files)} metadata for {len(files)} files from {self.backend.name} storage"
                 )
                 return files
 
             except Exception as e:
                 span.set_status(StatusCode.ERROR)
                 span.record_exception(e)
-                logger.error(f"Failed to list files from MinIO: {str(e)}")
+                logger.error(f"Failed to list files from storage: {e!s}")
                 raise
+
+
+class AsyncStorageManager:
+    """Async interface to StorageManager for use from the event loop.
+
+    Every call runs the blocking storage operation on a bounded executor dedicated to
+    storage, so slow object storage never stalls other requests or WebSockets, and
+    storage work cannot starve the default executor used by the rest of the service.
+    The current OpenTelemetry context is carried into the worker thread so storage
+    spans stay attached to the request span.
+
+    Attributes:
+        storage (StorageManager): Wrapped synchronous storage manager
+        executor (ThreadPoolExecutor): Executor running the blocking calls
+    """
+
+    def __init__(self, storage: StorageManager, max_workers: int = STORAGE_MAX_WORKERS):
+        """Wrap a StorageManager.
+
+        Args:
+            storage (StorageManager): Synchronous storage manager to delegate to
+            max_workers (int, optional): Maximum concurrent storage calls.
+                Defaults to STORAGE_MAX_WORKERS.
+        """
+        self.storage = storage
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the storage executor, preserving the calling context."""
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def store_file(
+        self,
+        user_id: str,
+        job_id: str,
+        content: bytes,
+        filename: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        compression: Optional[str] = None,
+    ) -> None:
+        """Async version of StorageManager.store_file."""
+        await self._run(
+            self.storage.store_file,
+            user_id,
+            job_id,
+            content,
+            filename,
+            content_type,
+            metadata=metadata,
+            compression=compression,
+        )
+
+    async def store_audio(
+        self,
+        user_id: str,
+        job_id: str,
+        audio_content: Union[bytes, Iterable[bytes], BinaryIO],
+        filename: str,
+        transcription_params: TranscriptionParams,
+    ) -> int:
+        """Async version of StorageManager.store_audio."""
+        return await self._run(
+            self.storage.store_audio,
+            user_id,
+            job_id,
+            audio_content,
+            filename,
+            transcription_params,
+        )
+
+    async def get_podcast_audio(self, user_id: str, job_id: str) -> Optional[str]:
+        """Async version of StorageManager.get_podcast_audio."""
+        return await self._run(self.storage.get_podcast_audio, user_id, job_id)
+
+    async def get_file_encoded(
+        self, user_id: str, job_id: str, filename: str
+    ) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Async version of StorageManager.get_file_encoded."""
+        return await self._run(self.storage.get_file_encoded, user_id, job_id, filename)
+
+    async def get_file(
+        self, user_id: str, job_id: str, filename: str
+    ) -> Optional[bytes]:
+        """Async version of StorageManager.get_file."""
+        return await self._run(self.storage.get_file, user_id, job_id, filename)
+
+    async def put_stream(
+        self,
+        user_id: str,
+        job_id: str,
+        data: Union[Iterable[bytes], BinaryIO],
+        filename: str,
+        content_type: str,
+        metadata: Optional[dict] = None,
+        length: int = -1,
+        part_size: int = STORAGE_PART_SIZE,
+    ) -> int:
+        """Async version of StorageManager.put_stream.
+
+        The data is consumed on the storage executor, so it must be a synchronous
+        iterable or file object.
+        """
+        return await self._run(
+            self.storage.put_stream,
+            user_id,
+            job_id,
+            data,
+            filename,
+            content_type,
+            metadata=metadata,
+            length=length,
+            part_size=part_size,
+        )
+
+    async def open_stream(
+        self,
+        user_id: str,
+        job_id: str,
+        filename: str,
+        chunk_size: int = STORAGE_CHUNK_SIZE,
+    ) -> Optional[Iterator[bytes]]:
+        """Async version of StorageManager.open_stream.
+
+        Opening the object happens on the storage executor. The returned iterator is
+        synchronous; Starlette's StreamingResponse consumes it from a worker thread.
+        """
+        return await self._run(
+            self.storage.open_stream, user_id, job_id, filename, chunk_size
+        )
+
+    async def open_podcast_audio(
+        self, user_id: str, job_id: str, chunk_size: int = STORAGE_CHUNK_SIZE
+    ) -> Optional[Iterator[bytes]]:
+        """Async version of StorageManager.open_podcast_audio."""
+        return await self._run(
+            self.storage.open_podcast_audio, user_id, job_id, chunk_size
+        )
+
+    async def presigned_url(
+        self,
+        user_id: str,
+        job_id: str,
+        filename: str,
+        expires: int = PRESIGNED_URL_EXPIRY,
+        download_name: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Optional[str]:
+        """Async version of StorageManager.presigned_url."""
+        return await self._run(
+            self.storage.presigned_url,
+            user_id,
+            job_id,
+            filename,
+            expires=expires,
+            download_name=download_name,
+            content_type=content_type,
+        )
+
+    async def presigned_podcast_audio_url(
+        self, user_id: str, job_id: str, expires: int = PRESIGNED_URL_EXPIRY
+    ) -> Optional[str]:
+        """Async version of StorageManager.presigned_podcast_audio_url."""
+        return await self._run(
+            self.storage.presigned_podcast_audio_url, user_id, job_id, expires
+        )
+
+    async def local_file(
+        self, user_id: str, job_id: str, filename: str
+    ) -> Optional[str]:
+        """Async version of StorageManager.local_file."""
+        return await self._run(self.storage.local_file, user_id, job_id, filename)
+
+    async def local_podcast_audio(self, user_id: str, job_id: str) -> Optional[str]:
+        """Async version of StorageManager.local_podcast_audio."""
+        return await self._run(self.storage.local_podcast_audio, user_id, job_id)
+
+    async def delete_file(self, user_id: str, job_id: str, filename: str) -> None:
+        """Async version of StorageManager.delete_file."""
+        await self._run(self.storage.delete_file, user_id, job_id, filename)
+
+    async def store_many(
+        self,
+        user_id: str,
+        job_id: str,
+        files: List[Tuple[str, bytes, str]],
+        metadata: Optional[dict] = None,
+        compression: Optional[str] = None,
+    ) -> None:
+        """Async version of StorageManager.store_many."""
+        await self._run(
+            self.storage.store_many,
+            user_id,
+            job_id,
+            files,
+            metadata=metadata,
+            compression=compression,
+        )
+
+    async def get_many(
+        self, user_id: str, job_id: str, filenames: List[str]
+    ) -> Dict[str, Optional[bytes]]:
+        """Async version of StorageManager.get_many."""
+        return await self._run(self.storage.get_many, user_id, job_id, filenames)
+
+    async def list_job_files(self, user_id: str, job_id: str) -> List[str]:
+        """Async version of StorageManager.list_job_files."""
+        return await self._run(self.storage.list_job_files, user_id, job_id)
+
+    async def delete_files(
+        self, user_id: str, job_id: str, filenames: List[str]
+    ) -> bool:
+        """Async version of StorageManager.delete_files."""
+        return await self._run(self.storage.delete_files, user_id, job_id, filenames)
+
+    async def delete_many(self, files: List[Tuple[str, str, str]]) -> bool:
+        """Async version of StorageManager.delete_many."""
+        return await self._run(self.storage.delete_many, files)
+
+    async def delete_job_files(self, user_id: str, job_id: str) -> bool:
+        """Async version of StorageManager.delete_job_files."""
+        return await self._run(self.storage.delete_job_files, user_id, job_id)
+
+    async def list_files_metadata(self, user_id: Optional[str] = None) -> List[dict]:
+        """Async version of StorageManager.list_files_metadata."""
+        return await self._run(self.storage.list_files_metadata, user_id)
+
+    def shutdown(self) -> None:
+        """Stop the storage executor once in-flight calls finish."""
+        self.executor.shutdown(wait=True)
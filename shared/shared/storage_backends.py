@@ -0,0 +1,577 @@
+from __future__ import annotations
+
+import builtins
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO
+
+import ujson as json
+import urllib3
+from minio import Minio
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error
+from urllib3 import Retry
+from urllib3._collections import HTTPHeaderDict
+from urllib3.util import Timeout
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backend used by StorageManager: "minio" or "local"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "minio")
+
+# Minio config
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
+MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
+MINIO_SECURE = os.getenv("MINIO_SECURE", "false").lower() == "true"
+MINIO_BUCKET_NAME = os.getenv("MINIO_BUCKET_NAME", "audio-results")
+
+# Presigned download URLs. The public endpoint is the host clients use to reach MinIO,
+# which URLs must be signed for. Setting the region keeps presigning free of network calls.
+MINIO_PUBLIC_ENDPOINT = os.getenv("MINIO_PUBLIC_ENDPOINT", "")
+MINIO_PUBLIC_SECURE = (
+    os.getenv("MINIO_PUBLIC_SECURE", os.getenv("MINIO_SECURE", "false")).lower()
+    == "true"
+)
+MINIO_REGION = os.getenv("MINIO_REGION", "us-east-1")
+
+# Root directory of the local filesystem backend. Must be shared by all services.
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "/data/storage")
+
+# Size of the buffer used when copying a stream to disk
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class ObjectInfo:
+    """Information about a stored object.
+
+    metadata is only populated by StorageBackend.stat, listings leave it empty.
+    """
+
+    name: str
+    size: int
+    last_modified: datetime
+    etag: str | None = None
+    content_type: str | None = None
+    metadata: Mapping[str, str] = field(default_factory=dict)
+
+
+class StoredObject(ABC):
+    """An opened object. Close it to release the underlying connection or file."""
+
+    metadata: Mapping[str, str]
+    etag: str | None
+
+    @abstractmethod
+    def stream(self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the object content in chunks of at most chunk_size bytes."""
+
+    def read(self) -> bytes:
+        """Read the whole object content."""
+        return b"".join(self.stream(_COPY_BUFFER_SIZE))
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the resources held by the object."""
+
+
+class StorageBackend(ABC):
+    """Byte-level object storage used by StorageManager.
+
+    Objects are addressed by "user_id/job_id/filename" names. Metadata keys follow the
+    S3 user metadata convention ("X-Amz-Meta-*") and are matched case-insensitively.
+    """
+
+    name: str
+    # Whether objects are plain files on this host, see local_path
+    is_local: bool = False
+
+    @abstractmethod
+    def put(
+        self,
+        object_name: str,
+        data: BinaryIO,
+        length: int,
+        content_type: str,
+        metadata: dict | None,
+        part_size: int,
+    ) -> str | None:
+        """Store an object, replacing any existing one.
+
+        Args:
+            object_name (str): Object name
+            data (BinaryIO): Readable binary stream with the content
+            length (int): Content length, -1 if unknown
+            content_type (str): MIME type of the content
+            metadata (Optional[dict]): User metadata
+            part_size (int): Upload part size for streams of unknown length
+
+        Returns:
+            Optional[str]: ETag of the stored object
+        """
+
+    @abstractmethod
+    def open(self, object_name: str) -> StoredObject | None:
+        """Open an object for reading, None if it doesn't exist."""
+
+    @abstractmethod
+    def stat(self, object_name: str) -> ObjectInfo | None:
+        """Get an object's size, ETag and metadata, None if it doesn't exist."""
+
+    @abstractmethod
+    def list(self, prefix: str) -> Iterator[ObjectInfo]:
+        """Recursively list objects whose names start with prefix."""
+
+    @abstractmethod
+    def remove(self, object_name: str) -> None:
+        """Delete an object. Deleting a missing object is not an error."""
+
+    def remove_many(self, object_names: Iterable[str]) -> builtins.list[str]:
+        """Delete several objects, returning the names that could not be deleted."""
+        failed = []
+        for object_name in object_names:
+            try:
+                self.remove(object_name)
+            except Exception:
+                logger.exception(f"Failed to delete {object_name}")
+                failed.append(object_name)
+        return failed
+
+    def presign(
+        self, object_name: str, expires: int, response_headers: dict[str, str]
+    ) -> str | None:
+        """Sign a GET URL for an object, None if the backend can't serve URLs."""
+        return None
+
+    def local_path(self, object_name: str) -> str | None:
+        """Path of an object on the local filesystem, None if it isn't a local file."""
+        return None
+
+
+def _etag(value: str | None) -> str | None:
+    return value.replace('"', "") if value else None
+
+
+class _MinioObject(StoredObject):
+    def __init__(self, response: urllib3.response.HTTPResponse):
+        self._response = response
+        self.metadata = response.headers
+        self.etag = _etag(response.headers.get("ETag"))
+
+    def stream(self, chunk_size: int) -> Iterator[bytes]:
+        return self._response.stream(chunk_size)
+
+    def read(self) -> bytes:
+        return self._response.read()
+
+    def close(self) -> None:
+        self._response.close()
+        self._response.release_conn()
+
+
+class MinioBackend(StorageBackend):
+    """Stores objects in a MinIO (or any S3 compatible) bucket.
+
+    Attributes:
+        client (Minio): MinIO client instance
+        presign_client (Minio): Client used only to sign URLs for the public endpoint
+        bucket_name (str): Name of the MinIO bucket to use
+    """
+
+    name = "minio"
+
+    def __init__(self, max_connections: int = 10):
+        """Create the MinIO clients and ensure the bucket exists.
+
+        Args:
+            max_connections (int, optional): Size of the HTTP connection pool.
+                Defaults to 10.
+        """
+        # pass in http_client for tracing
+        http_client = urllib3.PoolManager(
+            timeout=Timeout(connect=5, read=5),
+            maxsize=max_connections,
+            retries=Retry(
+                total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+            ),
+        )
+        self.client = Minio(
+            MINIO_ENDPOINT,
+            access_key=MINIO_ACCESS_KEY,
+            secret_key=MINIO_SECRET_KEY,
+            secure=MINIO_SECURE,
+            http_client=http_client,
+        )
+        # Client used only to sign URLs for the endpoint clients can reach
+        self.presign_client = Minio(
+            MINIO_PUBLIC_ENDPOINT or MINIO_ENDPOINT,
+            access_key=MINIO_ACCESS_KEY,
+            secret_key=MINIO_SECRET_KEY,
+            secure=MINIO_PUBLIC_SECURE,
+            region=MINIO_REGION,
+        )
+        self.bucket_name = MINIO_BUCKET_NAME
+        self._ensure_bucket_exists()
+
+    def _ensure_bucket_exists(self):
+        """Ensure the configured bucket exists, creating it if necessary.
+
+        Raises:
+            Exception: If bucket creation fails
+        """
+        try:
+            if not self.client.bucket_exists(self.bucket_name):
+                self.client.make_bucket(self.bucket_name)
+        except Exception as e:
+            logger.error(f"Failed to ensure bucket exists: {e}")
+            raise
+
+    def put(
+        self,
+        object_name: str,
+        data: BinaryIO,
+        length: int,
+        content_type: str,
+        metadata: dict | None,
+        part_size: int,
+    ) -> str | None:
+        result = self.client.put_object(
+            self.bucket_name,
+            object_name,
+            data,
+            length=length,
+            content_type=content_type,
+            metadata=metadata,
+            part_size=0 if length >= 0 else part_size,
+            num_parallel_uploads=1,
+        )
+        return _etag(result.etag)
+
+    def open(self, object_name: str) -> StoredObject | None:
+        try:
+            return _MinioObject(self.client.get_object(self.bucket_name, object_name))
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+
+    def stat(self, object_name: str) -> ObjectInfo | None:
+        try:
+            stat = self.client.stat_object(self.bucket_name, object_name)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        return ObjectInfo(
+            name=object_name,
+            size=stat.size,
+            last_modified=stat.last_modified,
+            etag=_etag(stat.etag),
+            content_type=stat.content_type,
+            metadata=stat.metadata or {},
+        )
+
+    def list(self, prefix: str) -> Iterator[ObjectInfo]:
+        for obj in self.client.list_objects(
+            self.bucket_name, prefix=prefix, recursive=True
+        ):
+            yield ObjectInfo(
+                name=obj.object_name,
+                size=obj.size,
+                last_modified=obj.last_modified,
+                etag=_etag(obj.etag),
+            )
+
+    def remove(self, object_name: str) -> None:
+        self.client.remove_object(self.bucket_name, object_name)
+
+    def remove_many(self, object_names: Iterable[str]) -> builtins.list[str]:
+        # Multi-object delete, sent in batches of up to 1000 keys per request.
+        # Errors are returned lazily and the deletes only happen while iterating them.
+        errors = self.client.remove_objects(
+            self.bucket_name, (DeleteObject(name) for name in object_names)
+        )
+        failed = []
+        for error in errors:
+            logger.error(f"Failed to delete {error.name}: {error.message}")
+            failed.append(error.name)
+        return failed
+
+    def presign(
+        self, object_name: str, expires: int, response_headers: dict[str, str]
+    ) -> str | None:
+        return self.presign_client.presigned_get_object(
+            self.bucket_name,
+            object_name,
+            expires=timedelta(seconds=expires),
+            response_headers=response_headers or None,
+        )
+
+
+class _LocalObject(StoredObject):
+    def __init__(self, f: BinaryIO, metadata: Mapping[str, str], etag: str | None):
+        self._file = f
+        self.metadata = metadata
+        self.etag = etag
+
+    def stream(self, chunk_size: int) -> Iterator[bytes]:
+        while True:
+            chunk = self._file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def read(self) -> bytes:
+        return self._file.read()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LocalFilesystemBackend(StorageBackend):
+    """Stores objects as plain files under a root directory.
+
+    Files keep the "user_id/job_id/filename" layout under the root. Content type, ETag
+    and metadata live in JSON sidecars under "<root>/.meta". Writes go to a temporary
+    file in the target directory which is then renamed over the destination, so readers
+    never see a partial file. A sidecar records the inode of its data file, and an
+    object whose sidecar is missing or belongs to another write reads as missing.
+
+    Services read each other's objects, so every service must mount the same root;
+    docker-compose.yaml shares the storage_data volume at LOCAL_STORAGE_ROOT.
+
+    Attributes:
+        root (str): Absolute path of the storage root
+    """
+
+    name = "local"
+    is_local = True
+    META_DIR = ".meta"
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT):
+        """Create the storage root if needed.
+
+        Args:
+            root (str, optional): Storage root directory. Defaults to LOCAL_STORAGE_ROOT.
+        """
+        self.root = os.path.realpath(root)
+        os.makedirs(os.path.join(self.root, self.META_DIR), exist_ok=True)
+
+    def _path(self, object_name: str, meta: bool = False) -> str:
+        """Resolve an object name to a path, refusing names that escape the root."""
+        base = os.path.join(self.root, self.META_DIR) if meta else self.root
+        path = os.path.realpath(os.path.join(base, object_name))
+        if not path.startswith(base + os.sep):
+            raise ValueError(f"Invalid object name: {object_name}")
+        return path + ".json" if meta else path
+
+    @staticmethod
+    def _normalize_metadata(metadata: dict | None) -> dict[str, str]:
+        """Apply the S3 user metadata naming MinIO uses, so lookups work the same."""
+        normalized = {}
+        for key, value in (metadata or {}).items():
+            if not key.lower().startswith("x-amz-"):
+                key = f"X-Amz-Meta-{key}"
+            normalized[key] = value if isinstance(value, str) else json.dumps(value)
+        return normalized
+
+    @staticmethod
+    def _discard(path: str | None) -> None:
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def _write_temp(cls, path: str, chunks: Iterator[bytes]) -> str:
+        """Write chunks to a temp file next to path, returning the temp file's path."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            cls._discard(temp_path)
+            raise
+        return temp_path
+
+    def _read_meta(self, object_name: str, st: os.stat_result) -> dict | None:
+        """Read the sidecar of the data file st describes, None if it has none."""
+        try:
+            with open(self._path(object_name, meta=True), "rb") as f:
+                meta = json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        # Sidecars written before inodes were recorded are trusted as they are
+        if meta.get("inode", st.st_ino) != st.st_ino:
+            return None
+        return meta
+
+    def put(
+        self,
+        object_name: str,
+        data: BinaryIO,
+        length: int,
+        content_type: str,
+        metadata: dict | None,
+        part_size: int,
+    ) -> str | None:
+        md5 = hashlib.md5()
+
+        def _chunks():
+            remaining = length
+            while remaining != 0:
+                size = (
+                    _COPY_BUFFER_SIZE
+                    if remaining < 0
+                    else min(remaining, _COPY_BUFFER_SIZE)
+                )
+                chunk = data.read(size)
+                if not chunk:
+                    if remaining > 0:
+                        raise OSError(
+                            f"stream ended {remaining} bytes short of length {length}"
+                        )
+                    break
+                md5.update(chunk)
+                remaining -= len(chunk) if remaining > 0 else 0
+                yield chunk
+
+        path = self._path(object_name)
+        meta_path = self._path(object_name, meta=True)
+        temp_path = self._write_temp(path, _chunks())
+        temp_meta_path = None
+        try:
+            etag = md5.hexdigest()
+            sidecar = {
+                "content_type": content_type,
+                "etag": etag,
+                "metadata": self._normalize_metadata(metadata),
+                # Renaming keeps the inode, which ties the sidecar to this data file
+                "inode": os.stat(temp_path).st_ino,
+            }
+            temp_meta_path = self._write_temp(
+                meta_path, iter([json.dumps(sidecar).encode()])
+            )
+            # Until the sidecar follows, readers see a mismatched inode and a miss
+            os.replace(temp_path, path)
+            os.replace(temp_meta_path, meta_path)
+        except BaseException:
+            self._discard(temp_path)
+            self._discard(temp_meta_path)
+            raise
+        return etag
+
+    def open(self, object_name: str) -> StoredObject | None:
+        try:
+            # Closed by the returned object
+            f = open(self._path(object_name), "rb")  # noqa: SIM115
+        except FileNotFoundError:
+            return None
+        meta = self._read_meta(object_name, os.fstat(f.fileno()))
+        if meta is None:
+            f.close()
+            return None
+        return _LocalObject(
+            f, HTTPHeaderDict(meta.get("metadata", {})), meta.get("etag")
+        )
+
+    def stat(self, object_name: str) -> ObjectInfo | None:
+        try:
+            st = os.stat(self._path(object_name))
+        except FileNotFoundError:
+            return None
+        meta = self._read_meta(object_name, st)
+        if meta is None:
+            return None
+        return ObjectInfo(
+            name=object_name,
+            size=st.st_size,
+            last_modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+            etag=meta.get("etag"),
+            content_type=meta.get("content_type"),
+            metadata=HTTPHeaderDict(meta.get("metadata", {})),
+        )
+
+    def list(self, prefix: str) -> Iterator[ObjectInfo]:
+        # Only walk the deepest directory the prefix fully names
+        start = os.path.realpath(os.path.join(self.root, os.path.dirname(prefix)))
+        if start != self.root and not start.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid prefix: {prefix}")
+        for directory, dirnames, filenames in os.walk(start):
+            if directory == self.root:
+                dirnames[:] = [d for d in dirnames if d != self.META_DIR]
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.startswith("."):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if not name.startswith(prefix):
+                    continue
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield ObjectInfo(
+                    name=name,
+                    size=st.st_size,
+                    last_modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+                )
+
+    def remove(self, object_name: str) -> None:
+        for path in (self._path(object_name), self._path(object_name, meta=True)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            # Drop directories left empty, stopping at the root
+            directory = os.path.dirname(path)
+            while directory not in (self.root, os.path.join(self.root, self.META_DIR)):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+
+    def local_path(self, object_name: str) -> str | None:
+        path = self._path(object_name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not os.path.isfile(path) or self._read_meta(object_name, st) is None:
+            return None
+        return path
+
+
+def create_storage_backend(max_connections: int = 10) -> StorageBackend:
+    """Create the backend selected by STORAGE_BACKEND.
+
+    Args:
+        max_connections (int, optional): Connection pool size for network backends.
+            Defaults to 10.
+
+    Returns:
+        StorageBackend: Configured backend
+
+    Raises:
+        ValueError: If STORAGE_BACKEND names an unknown backend
+    """
+    if STORAGE_BACKEND == "minio":
+        return MinioBackend(max_connections=max_connections)
+    if STORAGE_BACKEND == "local":
+        return LocalFilesystemBackend()
+    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
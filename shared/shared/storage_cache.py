@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import ujson as json
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Read-through cache for stored artifacts. Both tiers are disabled by default.
+# In-process tier: total bytes kept in memory, 0 disables it
+STORAGE_CACHE_MAX_BYTES = int(os.getenv("STORAGE_CACHE_MAX_BYTES", "0"))
+# Largest single object kept in memory; bigger objects only go to the disk tier
+STORAGE_CACHE_MAX_ENTRY_BYTES = int(
+    os.getenv("STORAGE_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024))
+)
+# Disk tier: directory holding cached objects as plain files, empty disables it
+STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR", "")
+STORAGE_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("STORAGE_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+# Seconds an entry is served before its ETag is checked against storage again.
+# Catches objects rewritten by another process.
+STORAGE_CACHE_REVALIDATE = float(os.getenv("STORAGE_CACHE_REVALIDATE", "30"))
+
+
+@dataclass
+class CacheEntry:
+    """A cached object as stored: possibly compressed bytes plus their ETag.
+
+    Exactly one of data (memory tier) or path (disk tier) is set.
+    """
+
+    key: str
+    etag: str | None
+    encoding: str | None
+    size: int
+    validated_at: float
+    data: bytes | None = None
+    path: str | None = None
+
+    def read(self) -> bytes:
+        """Return the cached bytes, reading them from disk for disk entries."""
+        if self.data is not None:
+            return self.data
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the cached bytes in chunks without loading disk entries whole."""
+        if self.data is not None:
+            for start in range(0, len(self.data), chunk_size):
+                yield self.data[start : start + chunk_size]
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class StorageCache:
+    """Two-tier read-through cache for objects in storage.
+
+    Small objects are kept in a byte-bounded in-process LRU. All objects can also be
+    kept in a local disk directory as plain files (with a JSON sidecar holding the ETag
+    and encoding), so they survive restarts and can be served straight from disk.
+    Entries are invalidated when the owning StorageManager writes or deletes the object,
+    and are revalidated against the object's ETag after STORAGE_CACHE_REVALIDATE
+    seconds.
+
+    Attributes:
+        max_bytes (int): Byte budget of the in-process tier
+        max_entry_bytes (int): Largest object kept in the in-process tier
+        cache_dir (Optional[str]): Directory of the disk tier, None if disabled
+        disk_max_bytes (int): Byte budget of the disk tier
+        revalidate_after (float): Seconds before an entry's ETag is checked again
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = STORAGE_CACHE_MAX_BYTES,
+        cache_dir: str | None = STORAGE_CACHE_DIR,
+        disk_max_bytes: int = STORAGE_CACHE_DISK_MAX_BYTES,
+        max_entry_bytes: int = STORAGE_CACHE_MAX_ENTRY_BYTES,
+        revalidate_after: float = STORAGE_CACHE_REVALIDATE,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.cache_dir = cache_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self.revalidate_after = revalidate_after
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._disk_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @classmethod
+    def from_env(cls) -> StorageCache | None:
+        """Build a cache from the STORAGE_CACHE_* settings, None if both tiers are off."""
+        if STORAGE_CACHE_MAX_BYTES <= 0 and not STORAGE_CACHE_DIR:
+            return None
+        return cls()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest())
+
+    def _load_disk_index(self):
+        """Index entries left in the cache directory by a previous process."""
+        names = os.listdir(self.cache_dir)
+        # Partial writes from a process that died mid-download
+        for name in names:
+            if name.endswith(".part"):
+                self._remove_files(os.path.join(self.cache_dir, name))
+        sidecars = [name for name in names if name.endswith(".json")]
+        entries = []
+        for name in sidecars:
+            meta_path = os.path.join(self.cache_dir, name)
+            data_path = meta_path[: -len(".json")]
+            try:
+                with open(meta_path, "rb") as f:
+                    meta = json.loads(f.read())
+                entries.append(
+                    (
+                        os.path.getmtime(data_path),
+                        CacheEntry(
+                            key=meta["key"],
+                            etag=meta.get("etag"),
+                            encoding=meta.get("encoding"),
+                            size=os.path.getsize(data_path),
+                            validated_at=0.0,
+                            path=data_path,
+                        ),
+                    )
+                )
+            except (OSError, ValueError, KeyError):
+                self._remove_files(data_path)
+        # Oldest first so the least recently written entries are evicted first
+        for _, entry in sorted(entries, key=lambda item: item[0]):
+            self._disk[entry.key] = entry
+            self._disk_bytes += entry.size
+        self._evict_disk()
+        logger.info(
+            f"Loaded {len(self._disk)} cached objects ({self._disk_bytes} bytes) from {self.cache_dir}"
+        )
+
+    @staticmethod
+    def _remove_files(data_path: str):
+        for path in (data_path, data_path + ".json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, key: str) -> bool:
+        """Whether an object is cached, without counting a lookup."""
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Look up an object, checking memory before disk.
+
+        Args:
+            key (str): Object name
+
+        Returns:
+            Optional[CacheEntry]: Cached entry, None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry
+            entry = self._disk.get(key)
+            if entry is not None and os.path.exists(entry.path):
+                self._disk.move_to_end(key)
+                self._stats["disk_hits"] += 1
+                hit = entry
+            else:
+                if entry is not None:
+                    self._drop_disk(key)
+                self._stats["misses"] += 1
+                return None
+
+        # Promote small disk entries so repeated reads skip the filesystem
+        if hit.size <= self.max_entry_bytes:
+            try:
+                data = hit.read()
+            except OSError:
+                return hit
+            self._put_memory(
+                CacheEntry(
+                    key=key,
+                    etag=hit.etag,
+                    encoding=hit.encoding,
+                    size=len(data),
+                    validated_at=hit.validated_at,
+                    data=data,
+                )
+            )
+        return hit
+
+    def needs_revalidation(self, entry: CacheEntry) -> bool:
+        """Whether an entry's ETag should be checked against storage before use."""
+        return time.time() - entry.validated_at >= self.revalidate_after
+
+    def mark_validated(self, key: str):
+        """Record that an entry's ETag still matches the stored object."""
+        now = time.time()
+        with self._lock:
+            for tier in (self._memory, self._disk):
+                if key in tier:
+                    tier[key].validated_at = now
+
+    def put(self, key: str, data: bytes, etag: str | None, encoding: str | None):
+        """Cache an object's stored bytes in every enabled tier that fits them.
+
+        Args:
+            key (str): Object name
+            data (bytes): Object content as stored (possibly compressed)
+            etag (Optional[str]): ETag of the stored object
+            encoding (Optional[str]): Content encoding of data, None if uncompressed
+        """
+        now = time.time()
+        if self.max_bytes > 0 and len(data) <= self.max_entry_bytes:
+            self._put_memory(
+                CacheEntry(
+                    key=key,
+                    etag=etag,
+                    encoding=encoding,
+                    size=len(data),
+                    validated_at=now,
+                    data=data,
+                )
+            )
+        if self.cache_dir:
+            self._commit_disk(key, self._write_temp([data]), etag, encoding)
+
+    def tee(
+        self,
+        key: str,
+        chunks: Iterable[bytes],
+        etag: str | None,
+        encoding: str | None,
+    ) -> Iterator[bytes]:
+        """Pass chunks through while caching them.
+
+        The object is only cached once the stream is fully consumed, so an aborted
+        download never leaves a truncated entry.
+
+        Args:
+            key (str): Object name
+            chunks (Iterable[bytes]): Object content as stored
+            etag (Optional[str]): ETag of the stored object
+            encoding (Optional[str]): Content encoding of the chunks
+
+        Yields:
+            bytes: The chunks, unchanged
+        """
+        buffer = [] if self.max_bytes > 0 else None
+        buffered = 0
+        temp_path = None
+        temp_file = None
+        if self.cache_dir:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            temp_file = os.fdopen(fd, "wb")
+        completed = False
+        try:
+            for chunk in chunks:
+                if buffer is not None:
+                    buffered += len(chunk)
+                    if buffered > self.max_entry_bytes:
+                        buffer = None
+                    else:
+                        buffer.append(chunk)
+                if temp_file is not None:
+                    temp_file.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if temp_file is not None:
+                temp_file.close()
+            if completed:
+                now = time.time()
+                if buffer is not None:
+                    data = b"".join(buffer)
+                    self._put_memory(
+                        CacheEntry(
+                            key=key,
+                            etag=etag,
+                            encoding=encoding,
+                            size=len(data),
+                            validated_at=now,
+                            data=data,
+                        )
+                    )
+                if temp_path:
+                    self._commit_disk(key, temp_path, etag, encoding)
+            elif temp_path:
+                self._remove_files(temp_path)
+
+    def invalidate(self, key: str):
+        """Drop an object from both tiers."""
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= entry.size
+            self._drop_disk(key)
+
+    def invalidate_prefix(self, prefix: str):
+        """Drop every object whose name starts with prefix from both tiers."""
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(prefix)]:
+                self._memory_bytes -= self._memory.pop(key).size
+            for key in [k for k in self._disk if k.startswith(prefix)]:
+                self._drop_disk(key)
+
+    def stats(self) -> dict[str, float]:
+        """Hit and occupancy statistics for both tiers.
+
+        Returns:
+            Dict[str, float]: memory_hits, disk_hits, misses, evictions, hit_rate,
+                memory_bytes, memory_entries, disk_bytes and disk_entries
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (
+                (stats["memory_hits"] + stats["disk_hits"]) / lookups
+                if lookups
+                else 0.0
+            )
+            stats["memory_bytes"] = self._memory_bytes
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+            stats["disk_entries"] = len(self._disk)
+        return stats
+
+    def _put_memory(self, entry: CacheEntry):
+        if self.max_bytes <= 0 or entry.size > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(entry.key, None)
+            if previous is not None:
+                self._memory_bytes -= previous.size
+            self._memory[entry.key] = entry
+            self._memory_bytes += entry.size
+            while self._memory_bytes > self.max_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.size
+                self._stats["evictions"] += 1
+
+    def _write_temp(self, chunks: Iterable[bytes]) -> str:
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return temp_path
+
+    def _commit_disk(
+        self, key: str, temp_path: str, etag: str | None, encoding: str | None
+    ):
+        """Atomically move a fully written temp file into the disk tier."""
+        data_path = self._disk_path(key)
+        try:
+            size = os.path.getsize(temp_path)
+            if size > self.disk_max_bytes:
+                os.remove(temp_path)
+                return
+            with open(data_path + ".json.part", "wb") as f:
+                f.write(
+                    json.dumps(
+                        {"key": key, "etag": etag, "encoding": encoding}
+                    ).encode()
+                )
+            with self._lock:
+                self._drop_disk(key)
+                os.replace(temp_path, data_path)
+                os.replace(data_path + ".json.part", data_path + ".json")
+                self._disk[key] = CacheEntry(
+                    key=key,
+                    etag=etag,
+                    encoding=encoding,
+                    size=size,
+                    validated_at=time.time(),
+                    path=data_path,
+                )
+                self._disk_bytes += size
+                self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write {key} to the disk cache: {e}")
+            self._remove_files(temp_path)
+
+    def _drop_disk(self, key: str):
+        """Remove a disk entry. Caller must hold the lock."""
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry.size
+            self._remove_files(entry.path)
+
+    def _evict_disk(self):
+        """Evict least recently used disk entries over budget. Caller must hold the lock."""
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            key = next(iter(self._disk))
+            self._drop_disk(key)
+            self._stats["evictions"] += 1
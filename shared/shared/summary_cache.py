@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from collections.abc import Awaitable
+from typing import Callable
+
+import redis
+import redis.asyncio as aioredis
+
+from .redis_pool import get_async_redis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds a document summary is reused; 0 disables the cache
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 60 * 60)))
+# Seconds another replica may spend generating a summary before others take over
+SUMMARY_CACHE_LOCK_TTL = int(os.getenv("SUMMARY_CACHE_LOCK_TTL", "900"))
+# Seconds between checks for a summary another replica is generating
+SUMMARY_CACHE_POLL_INTERVAL = float(os.getenv("SUMMARY_CACHE_POLL_INTERVAL", "1"))
+
+
+def prompt_version(*parts: str) -> str:
+    """Short digest of everything that shapes a prompt, e.g. template sources.
+
+    Any edit to a template gives a new version, so summaries made with the old
+    prompt are not reused.
+    """
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()[:16]
+
+
+def summary_key(markdown: str, version: str, model: str) -> str:
+    """Cache key of the summary of a document by a prompt version and model."""
+    digest = hashlib.sha256(markdown.encode()).hexdigest()
+    return f"summary:{model}:{version}:{digest}"
+
+
+class SummaryCache:
+    """Share document summaries between jobs, with single-flight generation.
+
+    Summaries are stored in Redis for SUMMARY_CACHE_TTL seconds. Concurrent
+    requests for the same summary make one LLM call: within a process they await
+    the same future, and across replicas the first to take a Redis lock generates
+    while the others poll for its result. If the generating request fails or is
+    cancelled, a waiting one takes over: in-process waiters retry, and a replica
+    releases its lock. Redis errors fall back to generating uncached.
+
+    Uses the async Redis pool, so it must be used from a single event loop.
+
+    Attributes:
+        hits (int): Summaries served from Redis or another request's call
+        misses (int): Summaries generated by this process
+    """
+
+    def __init__(self, redis_client: aioredis.Redis | None = None):
+        self.redis = redis_client if redis_client is not None else get_async_redis()
+        self.hits = 0
+        self.misses = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def _get(self, key: str) -> str | None:
+        try:
+            value = await self.redis.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to read cached summary {key}: {e}")
+            return None
+        return value.decode() if value is not None else None
+
+    async def _set(self, key: str, value: str):
+        try:
+            await self.redis.set(key, value.encode(), ex=SUMMARY_CACHE_TTL)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to cache summary {key}: {e}")
+
+    async def _acquire(self, key: str, token: str) -> bool:
+        try:
+            return bool(
+                await self.redis.set(
+                    f"{key}:lock", token, nx=True, ex=SUMMARY_CACHE_LOCK_TTL
+                )
+            )
+        except redis.RedisError as e:
+            logger.warning(
+                f"Failed to lock summary {key}, generating uncoordinated: {e}"
+            )
+            return True
+
+    async def _release(self, key: str, token: str):
+        try:
+            if await self.redis.get(f"{key}:lock") == token.encode():
+                await self.redis.delete(f"{key}:lock")
+        except redis.RedisError as e:
+            logger.warning(f"Failed to unlock summary {key}: {e}")
+
+    async def _generate(
+        self, key: str, create: Callable[[], Awaitable[str]]
+    ) -> tuple[str, bool]:
+        """Generate under the cross-replica lock, or wait for the replica holding it."""
+        token = uuid.uuid4().hex
+        while not await self._acquire(key, token):
+            await asyncio.sleep(SUMMARY_CACHE_POLL_INTERVAL)
+            cached = await self._get(key)
+            if cached is not None:
+                return cached, False
+        try:
+            # It may have been stored between the last check and taking the lock
+            cached = await self._get(key)
+            if cached is not None:
+                return cached, False
+            value = await create()
+            await self._set(key, value)
+            return value, True
+        finally:
+            await self._release(key, token)
+
+    async def get_or_create(
+        self,
+        markdown: str,
+        version: str,
+        model: str,
+        create: Callable[[], Awaitable[str]],
+    ) -> tuple[str, bool]:
+        """Get the summary of a document, generating it only if nobody has.
+
+        Args:
+            markdown (str): Document being summarized
+            version (str): Version of the summary prompt, see prompt_version()
+            model (str): Model generating the summary
+            create (Callable[[], Awaitable[str]]): Generates the summary on a miss
+
+        Returns:
+            Tuple[str, bool]: The summary, and whether this call generated it
+        """
+        if SUMMARY_CACHE_TTL <= 0:
+            return await create(), True
+
+        key = summary_key(markdown, version, model)
+        while key in self._inflight:
+            future = self._inflight[key]
+            # Unlike awaiting the future, cancelling this request leaves it running
+            await asyncio.wait([future])
+            if future.cancelled() or future.exception() is not None:
+                # The generating request failed or was cancelled; take over
+                logger.info(f"Taking over generation of summary {key}")
+                continue
+            self.hits += 1
+            logger.info(f"Shared in-flight summary {key}")
+            return future.result(), False
+
+        cached = await self._get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Reusing cached summary {key}")
+            return cached, False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value, created = await self._generate(key, create)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved; waiters, if any, take over
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        if created:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.info(f"Reusing summary {key} generated by another replica")
+        return value, created
+
+
+_summary_cache: SummaryCache | None = None
+
+
+def get_summary_cache() -> SummaryCache:
+    """Get the process-wide summary cache, creating it on first use."""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = SummaryCache()
+    return _summary_cache
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Callable
+
+# Average characters per token of a word for Llama-style BPE vocabularies; digit
+# runs are split into groups of three
+_CHARS_PER_TOKEN = 4
+_DIGITS_PER_TOKEN = 3
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_HEADING = re.compile(r"(?m)^(?=#{1,6}\s)")
+_PARAGRAPH = re.compile(r"(?<=\n\n)")
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens a model needs for a text, without a tokenizer.
+
+    Counts each punctuation mark as one token, and each word as one token per four
+    characters (three for numbers). Rough, but close enough to budget prompts.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    tokens = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        per_token = _DIGITS_PER_TOKEN if piece.isdigit() else _CHARS_PER_TOKEN
+        tokens += math.ceil(len(piece) / per_token)
+    return tokens
+
+
+def _split_headings(text: str) -> list[str]:
+    return [piece for piece in _HEADING.split(text) if piece]
+
+
+def _split_paragraphs(text: str) -> list[str]:
+    return [piece for piece in _PARAGRAPH.split(text) if piece]
+
+
+def _split_lines(text: str) -> list[str]:
+    return text.splitlines(keepends=True)
+
+
+def _split_words(text: str) -> list[str]:
+    return _WORD.findall(text)
+
+
+# Boundaries to split at, coarsest first
+_SPLITTERS: list[Callable[[str], list[str]]] = [
+    _split_headings,
+    _split_paragraphs,
+    _split_lines,
+    _split_words,
+]
+
+
+def _split_chars(text: str, max_tokens: int) -> list[str]:
+    """Last resort for a single word over the limit; no character is over one token."""
+    size = max(max_tokens, 1)
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _split(text: str, max_tokens: int, level: int) -> list[str]:
+    if level == len(_SPLITTERS):
+        return _split_chars(text, max_tokens)
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for piece in _SPLITTERS[level](text):
+        piece_tokens = estimate_tokens(piece)
+        parts = (
+            [(piece, piece_tokens)]
+            if piece_tokens <= max_tokens
+            else [
+                (part, estimate_tokens(part))
+                for part in _split(piece, max_tokens, level + 1)
+            ]
+        )
+        for part, part_tokens in parts:
+            if current and current_tokens + part_tokens > max_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def split_markdown(text: str, max_tokens: int) -> list[str]:
+    """Split markdown into chunks of at most max_tokens estimated tokens.
+
+    Chunks end at headings where possible, then at paragraphs, lines or words; only
+    a single word longer than the limit is cut. Consecutive small sections
+    share a chunk. Joining the chunks gives back the original text.
+
+    Args:
+        text (str): Markdown to split
+        max_tokens (int): Estimated token limit per chunk
+
+    Returns:
+        List[str]: Chunks in document order
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    return _split(text, max_tokens, 0)
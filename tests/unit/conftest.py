@@ -0,0 +1,28 @@
+"""
+Fixtures for the unit tests, which run without Redis, MinIO or model endpoints.
+
+The shared package must be installed (pip install -e shared); Redis is replaced by
+fakeredis and telemetry by a mock. Agent service modules are imported the way the
+service imports them, by their top-level names.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "services" / "AgentService"))
+
+
+@pytest.fixture
+def telemetry():
+    """Telemetry whose spans record nothing."""
+    return MagicMock()
+
+
+@pytest.fixture
+def redis_client():
+    """In-memory Redis client."""
+    return fakeredis.FakeRedis()
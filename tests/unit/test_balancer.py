@@ -0,0 +1,47 @@
+import pytest
+from shared.balancer import EndpointBalancer
+
+from shared import balancer as balancer_module
+
+
+@pytest.fixture(autouse=True)
+def few_samples(monkeypatch):
+    monkeypatch.setattr(balancer_module, "LLM_HEDGE_MIN_SAMPLES", 5)
+
+
+def test_latency_percentiles_are_kept_per_stage():
+    balancer = EndpointBalancer("model")
+    for i in range(10):
+        balancer.record("a", 1.0 + i / 10, None, "summarize_chunk")
+        balancer.record("a", 30.0 + i, None, "raw_outline")
+
+    assert balancer.latency_percentile(50, "summarize_chunk") == pytest.approx(1.5)
+    assert balancer.latency_percentile(50, "raw_outline") == pytest.approx(35.0)
+    assert set(balancer.stats()["latency"]) == {"summarize_chunk", "raw_outline"}
+
+
+def test_no_percentile_until_enough_samples():
+    balancer = EndpointBalancer("model")
+    for _ in range(4):
+        balancer.record("a", 1.0, None, "summarize_chunk")
+
+    assert balancer.latency_percentile(50, "summarize_chunk") is None
+    assert balancer.latency_percentile(50, "raw_outline") is None
+
+
+def test_calls_without_a_stage_are_not_sampled():
+    balancer = EndpointBalancer("model")
+    for _ in range(10):
+        balancer.record("a", 1.0, None)
+
+    assert balancer.stats()["latency"] == {}
+
+
+def test_failing_endpoint_is_ejected(monkeypatch):
+    monkeypatch.setattr(balancer_module, "LLM_EJECT_FAILURES", 2)
+    balancer = EndpointBalancer("model")
+    balancer.record("a", 1.0, RuntimeError("down"))
+    balancer.record("a", 1.0, RuntimeError("down"))
+
+    assert balancer.is_ejected("a")
+    assert balancer.choose([("a", 1.0), ("b", 1.0)]) == "b"
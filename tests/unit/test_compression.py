@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+from shared.compression import (
+    GZIP,
+    ZSTD,
+    accepts_encoding,
+    compress,
+    decompress,
+    iter_decompress,
+    resolve_encoding,
+)
+
+from shared import compression
+
+DATA = b'{"dialogue": "' + b"lorem ipsum " * 5000 + b'"}'
+
+
+@pytest.mark.parametrize("encoding", [GZIP, ZSTD])
+def test_round_trip(encoding):
+    compressed = compress(DATA, encoding)
+    assert len(compressed) < len(DATA)
+    assert decompress(compressed, encoding) == DATA
+
+
+@pytest.mark.parametrize("encoding", [GZIP, ZSTD])
+def test_iter_decompress_small_chunks(encoding):
+    compressed = compress(DATA, encoding)
+    chunks = [compressed[i : i + 7] for i in range(0, len(compressed), 7)]
+    assert b"".join(iter_decompress(chunks, encoding)) == DATA
+
+
+def test_no_encoding_passes_data_through():
+    assert resolve_encoding("") is None
+    assert decompress(DATA, None) == DATA
+    assert list(iter_decompress([b"a", b"b"], None)) == [b"a", b"b"]
+
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError):
+        resolve_encoding("brotli")
+
+
+def test_zstd_falls_back_to_gzip_with_one_warning(monkeypatch, caplog):
+    monkeypatch.setattr(compression, "zstandard", None)
+    compression._warn_zstd_fallback.cache_clear()
+    with caplog.at_level(logging.WARNING, logger=compression.__name__):
+        assert resolve_encoding("ZSTD") == GZIP
+        assert resolve_encoding(ZSTD) == GZIP
+    assert len(caplog.records) == 1
+    compression._warn_zstd_fallback.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("header", "encoding", "accepted"),
+    [
+        ("gzip, deflate, br", GZIP, True),
+        ("gzip;q=0, zstd", GZIP, False),
+        ("zstd", GZIP, False),
+        (None, GZIP, False),
+        ("gzip", None, False),
+    ],
+)
+def test_accepts_encoding(header, encoding, accepted):
+    assert accepts_encoding(header, encoding) is accepted
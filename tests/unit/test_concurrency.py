@@ -0,0 +1,150 @@
+import asyncio
+import threading
+
+import pytest
+from shared.concurrency import AdaptiveLimiter, is_overload_error
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__("request failed")
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (StatusError(429), True),
+        (StatusError(503), True),
+        (StatusError(400), False),
+        (asyncio.TimeoutError(), True),
+        (ValueError("Error code: 502 - bad gateway"), True),
+        (ValueError("Request timed out"), True),
+        (ValueError("invalid JSON in response"), False),
+    ],
+)
+def test_is_overload_error(error, expected):
+    assert is_overload_error(error) is expected
+
+
+def test_success_raises_limit_additively():
+    limiter = AdaptiveLimiter("test", initial=4, max_limit=4.5)
+    for _ in range(2):
+        with limiter.slot():
+            pass
+    # The first call only sets the latency baseline
+    assert limiter.limit == pytest.approx(4.25)
+
+    for _ in range(5):
+        with limiter.slot():
+            pass
+    assert limiter.limit == 4.5
+
+
+def test_overload_error_cuts_limit_once_per_burst():
+    limiter = AdaptiveLimiter("test", initial=8, min_limit=3)
+    limiter.latency = 60.0
+
+    for _ in range(2):
+        with pytest.raises(StatusError), limiter.slot():
+            raise StatusError(429)
+    assert limiter.limit == 4
+
+    limiter._last_decrease = 0.0
+    limiter.latency = None
+    with pytest.raises(StatusError), limiter.slot():
+        raise StatusError(429)
+    assert limiter.limit == 3
+
+
+def test_other_errors_keep_the_limit():
+    limiter = AdaptiveLimiter("test", initial=8)
+    with pytest.raises(ValueError), limiter.slot():
+        raise ValueError("bad request")
+    assert (limiter.limit, limiter.in_flight) == (8, 0)
+
+
+def test_slow_call_lowers_the_limit():
+    limiter = AdaptiveLimiter("test", initial=10)
+    limiter._observe_latency(1.0)
+    limiter._observe_latency(5.0)
+    assert limiter.limit == pytest.approx(9)
+    assert limiter.latency == pytest.approx(1.8)
+
+
+def test_thread_waits_for_a_free_slot():
+    limiter = AdaptiveLimiter("test", initial=1)
+    entered = threading.Event()
+
+    def call():
+        with limiter.slot():
+            entered.set()
+
+    with limiter.slot():
+        waiter = threading.Thread(target=call)
+        waiter.start()
+        assert not entered.wait(0.1)
+        assert limiter.queued == 1
+    assert entered.wait(5)
+    waiter.join()
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_async_waiters_are_served_in_order():
+    limiter = AdaptiveLimiter("test", initial=1)
+    order = []
+
+    async def call(i):
+        async with limiter.async_slot():
+            order.append(i)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(call(i) for i in range(5)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+    assert (limiter.in_flight, limiter.queued) == (0, 0)
+
+
+def test_cancelled_waiter_passes_its_slot_on():
+    limiter = AdaptiveLimiter("test", initial=1)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def holder():
+            async with limiter.async_slot():
+                await release.wait()
+
+        async def waiter():
+            async with limiter.async_slot():
+                return "served"
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(waiter())
+        served = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert limiter.queued == 2
+
+        cancelled.cancel()
+        release.set()
+        await held
+        assert await asyncio.wait_for(served, 5) == "served"
+        assert cancelled.cancelled()
+
+    asyncio.run(main())
+    assert limiter.in_flight == 0
+
+
+def test_reported_latency_replaces_the_time_held():
+    limiter = AdaptiveLimiter("test")
+
+    async def main():
+        async with limiter.async_slot() as slot:
+            await asyncio.sleep(0.1)
+            slot.latency = 0.01
+
+    asyncio.run(main())
+    assert limiter.latency == pytest.approx(0.01)
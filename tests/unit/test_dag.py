@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from shared.dag import TaskGraph
+
+
+def constant(value, delay=0.0):
+    async def task(*deps):
+        await asyncio.sleep(delay)
+        return value
+
+    return task
+
+
+def test_tasks_get_their_dependencies_results_in_order():
+    graph = TaskGraph("test")
+    a = graph.add("a", constant(2))
+    b = graph.add("b", constant(3))
+
+    async def combine(x, y):
+        return x * 10 + y
+
+    graph.add("c", combine, deps=[b, a])
+
+    assert asyncio.run(graph.run()) == {"a": 2, "b": 3, "c": 32}
+
+
+def test_independent_tasks_run_concurrently():
+    graph = TaskGraph("test")
+    for name in "abcd":
+        graph.add(name, constant(name, delay=0.1))
+
+    asyncio.run(graph.run())
+    assert graph.timing().total < 0.3
+
+
+def test_add_rejects_duplicates_and_unknown_dependencies():
+    graph = TaskGraph("test")
+    graph.add("a", constant(1))
+
+    with pytest.raises(ValueError):
+        graph.add("a", constant(2))
+    with pytest.raises(ValueError):
+        graph.add("b", constant(2), deps=["missing"])
+
+
+def test_tasks_added_while_running_are_run():
+    graph = TaskGraph("test")
+
+    async def fan_out():
+        for i in range(3):
+            graph.add(f"item_{i}", constant(i, delay=0.01))
+        return "listed"
+
+    graph.add("list", fan_out)
+
+    assert asyncio.run(graph.run()) == {
+        "list": "listed",
+        "item_0": 0,
+        "item_1": 1,
+        "item_2": 2,
+    }
+
+
+def test_failure_cancels_the_other_tasks():
+    graph = TaskGraph("test")
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    graph.add("slow", slow)
+    graph.add("fail", fail)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(graph.run())
+    assert cancelled == ["slow"]
+
+
+def test_timing_follows_the_dependency_finishing_last():
+    graph = TaskGraph("test")
+    fast = graph.add("fast", constant(None, delay=0.01))
+    slow = graph.add("slow", constant(None, delay=0.1))
+    graph.add("join", constant(None, delay=0.01), deps=[fast, slow])
+    graph.add("side", constant(None))
+
+    asyncio.run(graph.run())
+    timing = graph.timing()
+
+    assert timing.critical_path == ["slow", "join"]
+    assert [task.name for task in timing.tasks] == ["fast", "slow", "join", "side"]
+    join = timing.tasks[2]
+    assert join.ready >= timing.tasks[1].end
+    assert timing.critical_path_time == pytest.approx(0.11, abs=0.05)
+
+
+def test_timing_of_a_graph_that_has_not_run():
+    timing = TaskGraph("test").timing()
+    assert (timing.total, timing.critical_path, timing.tasks) == (0.0, [], [])
+
+
+def test_tasks_run_in_spans(telemetry):
+    graph = TaskGraph("test", telemetry)
+    graph.add("a", constant(1))
+
+    asyncio.run(graph.run())
+    telemetry.tracer.start_as_current_span.assert_called_once_with("test.a")
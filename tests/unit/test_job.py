@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+from shared.api_types import JobStatus, ServiceType
+from shared.job import SPILL_USER_ID, JobStatusManager
+from shared.storage import StorageManager
+from shared.storage_backends import LocalFilesystemBackend
+
+from shared import job as job_module
+
+
+@pytest.fixture
+def make_manager(monkeypatch, redis_client, telemetry):
+    monkeypatch.setattr(job_module, "get_redis", lambda url=None: redis_client)
+
+    def make(**kwargs):
+        return JobStatusManager(ServiceType.TTS, telemetry, **kwargs)
+
+    return make
+
+
+def test_held_back_update_is_written_when_interval_ends(make_manager):
+    manager = make_manager(coalesce_interval=0.2)
+    manager.update_status("j1", JobStatus.PROCESSING, "first")
+    manager.update_status("j1", JobStatus.PROCESSING, "second")
+    manager.update_status("j1", JobStatus.PROCESSING, "third")
+    assert manager.get_status("j1")["message"] == "first"
+
+    time.sleep(0.4)
+    assert manager.get_status("j1")["message"] == "third"
+    assert not manager._held and not manager._flush_timers
+
+
+def test_terminal_update_drops_held_back_update(make_manager):
+    manager = make_manager(coalesce_interval=0.2)
+    manager.update_status("j1", JobStatus.PROCESSING, "working")
+    manager.update_status("j1", JobStatus.PROCESSING, "still working")
+    manager.update_status("j1", JobStatus.COMPLETED, "done")
+
+    time.sleep(0.4)
+    assert manager.get_status("j1")["message"] == "done"
+    assert not manager._last_update and not manager._held
+
+
+def test_delete_and_cleanup_forget_coalescing_state(make_manager):
+    manager = make_manager(coalesce_interval=60)
+    for job_id in ("j1", "j2"):
+        manager.create_job(job_id)
+        manager.update_status(job_id, JobStatus.PROCESSING, "working")
+        manager.update_status(job_id, JobStatus.PROCESSING, "held")
+
+    manager.delete_job("j1")
+    assert "j1" not in manager._last_update and "j1" not in manager._flush_timers
+
+    assert manager.cleanup_old_jobs(max_age=0) == 1
+    assert not manager._last_update and not manager._held and not manager._flush_timers
+
+
+@pytest.fixture
+def spilling(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_module, "RESULT_SPILL_THRESHOLD", 16)
+    monkeypatch.setattr(job_module, "RESULT_SPILL_DIR", str(tmp_path / "spill"))
+
+
+def _expire_pointer(manager, job_id):
+    manager.redis.delete(f"result:{job_id}:{manager.service_type!s}")
+
+
+def test_cleanup_deletes_spilled_disk_result_after_pointer_expired(
+    make_manager, spilling
+):
+    manager = make_manager()
+    manager.create_job("j3")
+    manager.set_result("j3", b"x" * 64)
+    path = manager._spill_path("j3")
+    assert os.path.exists(path)
+    assert manager.get_result("j3") == b"x" * 64
+
+    _expire_pointer(manager, "j3")
+    assert manager.cleanup_old_jobs(max_age=0) == 1
+    assert not os.path.exists(path)
+
+
+def test_delete_job_deletes_spilled_storage_result_after_pointer_expired(
+    make_manager, spilling, telemetry, tmp_path
+):
+    storage = StorageManager(telemetry, LocalFilesystemBackend(str(tmp_path / "store")))
+    manager = make_manager(storage_manager=storage)
+    manager.create_job("j3")
+    manager.set_result("j3", b"x" * 64, compression="gzip")
+    assert manager.get_result("j3") == b"x" * 64
+    assert storage.list_job_files(SPILL_USER_ID, "j3") == [manager._spill_filename()]
+
+    _expire_pointer(manager, "j3")
+    manager.delete_job("j3")
+    assert storage.list_job_files(SPILL_USER_ID, "j3") == []
+
+
+def test_small_results_stay_in_redis(make_manager, spilling):
+    manager = make_manager()
+    manager.set_result("j4", b"small")
+    assert manager.get_result("j4") == b"small"
+    assert not os.path.exists(manager._spill_path("j4"))
@@ -0,0 +1,32 @@
+from shared.llm_usage import JobUsageTracker, UsageCallbackHandler, query_stage
+
+
+def handler(prompt_tokens, completion_tokens, attempts=1):
+    usage = UsageCallbackHandler()
+    usage.prompt_tokens = prompt_tokens
+    usage.completion_tokens = completion_tokens
+    usage.attempts = attempts
+    return usage
+
+
+def test_query_stage_drops_the_trailing_index():
+    assert query_stage("segment_transcript_3") == "segment_transcript"
+    assert query_stage("raw_outline") == "raw_outline"
+
+
+def test_totals_include_hedged_requests():
+    tracker = JobUsageTracker("job", "user", storage_manager=None)
+    tracker.add(handler(100, 20).usage("segment_transcript_0", "iteration", "m", True))
+    tracker.add(
+        handler(100, 0).usage("segment_transcript_0", "iteration", "m", False, True)
+    )
+    tracker.add(
+        handler(50, 10, attempts=2).usage("raw_outline", "reasoning", "m", True)
+    )
+
+    summary = tracker.summary()
+    assert (summary.totals.calls, summary.totals.hedged) == (3, 1)
+    assert summary.totals.prompt_tokens == 250
+    assert summary.totals.retries == 1
+    stage = summary.stages["segment_transcript"]
+    assert (stage.calls, stage.hedged, stage.prompt_tokens) == (2, 1, 200)
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from shared.llm_usage import UsageCallbackHandler
+from shared.llmmanager import LLMManager
+from shared.tokens import estimate_tokens
+
+
+class FakeManager:
+    """Stands in for LLMManager with two endpoints and scripted calls.
+
+    Each endpoint's call sleeps for its delay, counts 10 prompt and 5 completion
+    tokens on its usage handler, then returns or raises the scripted result. Hedged
+    usage records are collected in hedged.
+    """
+
+    _ainvoke_hedged = LLMManager._ainvoke_hedged
+    _record_hedged_usage = LLMManager._record_hedged_usage
+
+    def __init__(self, results, hedge_after=0.05):
+        self.results = results
+        self.hedge_after = hedge_after
+        self.cancelled = []
+        self.tasks = {}
+        self.stages = []
+        self.hedged = []
+
+    def get_config(self, model_key):
+        return SimpleNamespace(hedge_percentile=0.9, endpoints=list(self.results))
+
+    def choose_endpoint(self, model_key, exclude=()):
+        return next((e for e in self.results if e not in exclude), None)
+
+    def get_limiter(self, model_key, api_base):
+        return SimpleNamespace(limit=8)
+
+    def get_balancer(self, model_key):
+        return SimpleNamespace(latency_percentile=self.latency_percentile)
+
+    def latency_percentile(self, percentile, stage):
+        self.stages.append(stage)
+        return self.hedge_after
+
+    def _record_usage(self, usage, query_name, model_key, span, success, hedged=False):
+        self.hedged.append(usage.usage(query_name, model_key, "model", success, hedged))
+
+    async def _ainvoke_endpoint(
+        self, model_key, api_base, messages, json_schema, retries, usage, stage
+    ):
+        self.tasks[api_base] = asyncio.current_task()
+        delay, result = self.results[api_base]
+        usage.attempts += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(api_base)
+            raise
+        usage.prompt_tokens += 10
+        usage.completion_tokens += 5
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+QUERY = "segment_transcript_3"
+MESSAGES = [{"role": "user", "content": "Write the third segment"}]
+
+
+def invoke(manager):
+    usage = UsageCallbackHandler()
+    result = asyncio.run(
+        manager._ainvoke_hedged("json", MESSAGES, None, 0, MagicMock(), usage, QUERY)
+    )
+    return result, usage
+
+
+def test_fast_primary_is_not_hedged():
+    manager = FakeManager({"a": (0, "from a"), "b": (0, "from b")})
+    result, usage = invoke(manager)
+
+    assert result == "from a"
+    assert (usage.attempts, usage.prompt_tokens) == (1, 10)
+    assert manager.hedged == []
+
+
+def test_hedge_wins_and_the_loser_is_recorded_as_hedged():
+    manager = FakeManager({"a": (5, "from a"), "b": (0, "from b")})
+    result, usage = invoke(manager)
+
+    assert result == "from b"
+    assert (usage.attempts, usage.prompt_tokens, usage.completion_tokens) == (1, 10, 5)
+    assert manager.cancelled == ["a"]
+
+    (loser,) = manager.hedged
+    assert (loser.query_name, loser.hedged, loser.success) == (QUERY, True, False)
+    # Cancelled before reporting usage, so the prompt is estimated
+    assert loser.prompt_tokens == estimate_tokens(MESSAGES[0]["content"])
+
+
+def test_hedge_delay_comes_from_the_query_stage():
+    manager = FakeManager({"a": (0, "from a"), "b": (0, "from b")})
+    invoke(manager)
+
+    assert manager.stages == ["segment_transcript"]
+
+
+def test_failed_primary_falls_back_to_the_hedge():
+    manager = FakeManager({"a": (0.1, ValueError("bad")), "b": (0.2, "from b")})
+    result, usage = invoke(manager)
+
+    assert result == "from b"
+    assert usage.prompt_tokens == 10
+    assert [record.prompt_tokens for record in manager.hedged] == [10]
+
+
+def test_both_failing_raises_and_records_the_hedge():
+    manager = FakeManager(
+        {"a": (0.1, ValueError("a failed")), "b": (0.1, ValueError("b failed"))}
+    )
+    usage = UsageCallbackHandler()
+    with pytest.raises(ValueError):
+        asyncio.run(
+            manager._ainvoke_hedged(
+                "json", MESSAGES, None, 0, MagicMock(), usage, QUERY
+            )
+        )
+    assert (usage.attempts, usage.prompt_tokens) == (1, 10)
+    assert [record.prompt_tokens for record in manager.hedged] == [10]
+
+
+def test_cancelled_attempt_is_skipped():
+    manager = FakeManager({"a": (5, "from a"), "b": (0.2, "from b")})
+
+    async def main():
+        usage = UsageCallbackHandler()
+        call = asyncio.ensure_future(
+            manager._ainvoke_hedged(
+                "json", MESSAGES, None, 0, MagicMock(), usage, QUERY
+            )
+        )
+        await asyncio.sleep(0.1)
+        # Cancelled from outside, e.g. by a shutting-down event loop
+        manager.tasks["a"].cancel()
+        return await call
+
+    assert asyncio.run(main()) == "from b"
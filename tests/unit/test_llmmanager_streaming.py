@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from shared.balancer import EndpointBalancer
+from shared.concurrency import AdaptiveLimiter
+from shared.llmmanager import LLMManager
+
+from shared import balancer as balancer_module
+
+CHUNKS = ["The ", "quarter ", "closed."]
+
+
+class FakeRunnable:
+    """Streams CHUNKS as chat model events, each after a short delay."""
+
+    async def astream_events(self, messages, version, config):
+        for text in CHUNKS:
+            await asyncio.sleep(0.01)
+            yield {
+                "event": "on_chat_model_stream",
+                "data": {"chunk": SimpleNamespace(content=text)},
+                "parent_ids": ["run"],
+            }
+
+
+class FakeManager:
+    """Stands in for LLMManager with one endpoint and a real limiter and balancer."""
+
+    stream_tokens_async = LLMManager.stream_tokens_async
+    _async_endpoint_slot = LLMManager._async_endpoint_slot
+    _slot_latency = staticmethod(LLMManager._slot_latency)
+
+    def __init__(self):
+        self.telemetry = MagicMock()
+        self.limiter = AdaptiveLimiter("test")
+        self.balancer = EndpointBalancer("model")
+        self.recorded = []
+
+    def choose_endpoint(self, model_key):
+        return "a"
+
+    def get_runnable(self, model_key, json_schema, retries, api_base):
+        return FakeRunnable()
+
+    def get_limiter(self, model_key, api_base):
+        return self.limiter
+
+    def get_balancer(self, model_key):
+        return self.balancer
+
+    def _record_usage(self, usage, query_name, model_key, span, success):
+        self.recorded.append(success)
+
+
+async def consume(stream, delay=0.0):
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        await asyncio.sleep(delay)
+    return chunks
+
+
+def test_slow_consumer_is_left_out_of_the_latency(monkeypatch):
+    monkeypatch.setattr(balancer_module, "LLM_HEDGE_MIN_SAMPLES", 1)
+    manager = FakeManager()
+
+    chunks = asyncio.run(
+        consume(manager.stream_tokens_async("m", [], "outline_0"), delay=0.2)
+    )
+
+    assert chunks == CHUNKS
+    assert manager.recorded == [True]
+    assert manager.limiter.latency < 0.15
+    assert manager.balancer.latency_percentile(50, "outline") < 0.15
+
+
+def test_retries_must_be_positive():
+    manager = FakeManager()
+
+    with pytest.raises(ValueError):
+        asyncio.run(consume(manager.stream_tokens_async("m", [], "q", retries=0)))
+    assert manager.recorded == []
@@ -0,0 +1,87 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from shared.prompt_tracker import PromptTracker, fold_segments, segment_filenames
+
+
+class SlowStorage:
+    """Stores segments in memory; uploads wait until released or fail on request."""
+
+    def __init__(self):
+        self.files = {}
+        self.uploading = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def store_file(self, user_id, job_id, content, filename, content_type, **kwargs):
+        self.uploading.set()
+        self.release.wait(5)
+        if self.fail:
+            raise OSError("storage down")
+        self.files[filename] = (content, kwargs.get("compression"))
+
+
+@pytest.fixture
+def storage():
+    return SlowStorage()
+
+
+@pytest.fixture
+def tracker(storage):
+    # No background flushes; the tests flush explicitly
+    tracker = PromptTracker("j1", "u1", storage, flush_interval=3600)
+    yield tracker
+    tracker._closed.set()
+
+
+def history(storage):
+    segments = segment_filenames(storage.files)
+    return fold_segments(storage.files[name][0] for name in segments)
+
+
+def test_tracking_does_not_wait_for_an_upload(storage, tracker):
+    tracker.track("first", "prompt 1", "model")
+    storage.release.clear()
+    flushing = threading.Thread(target=tracker.flush)
+    flushing.start()
+    assert storage.uploading.wait(5)
+
+    tracked = threading.Thread(target=tracker.track, args=("second", "p2", "model"))
+    tracked.start()
+    tracked.join(1)
+    assert not tracked.is_alive()
+
+    storage.release.set()
+    flushing.join()
+    tracker.flush()
+    assert [step.step_name for step in history(storage).steps] == ["first", "second"]
+
+
+def test_failed_flush_requeues_records_in_order(storage, tracker):
+    tracker.track("first", "prompt 1", "model")
+    storage.fail = True
+    tracker.flush()
+    assert not storage.files
+
+    tracker.update_result("first", "response 1")
+    storage.fail = False
+    tracker.flush()
+
+    assert segment_filenames(storage.files) == ["j1_prompt_tracker.000000.jsonl"]
+    (step,) = history(storage).steps
+    assert (step.step_name, step.response) == ("first", "response 1")
+
+
+def test_close_compacts_and_deletes_segments(storage):
+    storage.delete_files = MagicMock(return_value=True)
+    tracker = PromptTracker("j1", "u1", storage, flush_interval=3600)
+    tracker.track("first", "prompt 1", "model")
+    tracker.flush()
+    tracker.close()
+
+    assert "j1_prompt_tracker.json" in storage.files
+    storage.delete_files.assert_called_once_with(
+        "u1", "j1", ["j1_prompt_tracker.000000.jsonl"]
+    )
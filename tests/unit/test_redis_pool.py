@@ -0,0 +1,74 @@
+import threading
+
+import fakeredis
+import pytest
+import redis
+
+from shared import redis_pool
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Start each test without process-wide pools."""
+    monkeypatch.setattr(redis_pool, "_sync_pools", {})
+    monkeypatch.setattr(redis_pool, "_async_pools", {})
+    monkeypatch.setattr(redis_pool, "_pubsub_pools", {})
+
+
+@pytest.fixture
+def make_pool():
+    server = fakeredis.FakeServer()
+
+    def make(max_connections, timeout):
+        return redis_pool._BlockingPool(
+            max_connections=max_connections,
+            timeout=timeout,
+            connection_class=fakeredis.FakeRedisConnection,
+            server=server,
+        )
+
+    return make
+
+
+def test_exhausted_pool_waits_for_a_released_connection(make_pool):
+    pool = make_pool(max_connections=1, timeout=5)
+    client = redis.Redis(connection_pool=pool)
+    held = pool.get_connection()
+    released = threading.Timer(0.2, pool.release, args=(held,))
+    released.start()
+
+    assert client.set("key", "value")
+    released.join()
+    assert client.get("key") == b"value"
+
+
+def test_exhausted_pool_times_out_with_connection_error(make_pool):
+    pool = make_pool(max_connections=1, timeout=0.1)
+    held = pool.get_connection()
+
+    with pytest.raises(redis.ConnectionError):
+        redis.Redis(connection_pool=pool).ping()
+    pool.release(held)
+
+
+def test_stats_count_checked_out_connections(pools, monkeypatch, make_pool):
+    pool = make_pool(max_connections=4, timeout=1)
+    monkeypatch.setitem(redis_pool._sync_pools, "redis://test", pool)
+    first = pool.get_connection()
+    pool.get_connection()
+    pool.release(first)
+
+    assert redis_pool.pool_stats()["sync:redis://test"] == {
+        "in_use": 1,
+        "available": 3,
+        "max": 4,
+        "utilization": 0.25,
+    }
+
+
+def test_pubsub_uses_a_separate_pool(pools):
+    url = "redis://redis-test:6379"
+    pubsub = redis_pool.get_pubsub(url)
+
+    assert pubsub.connection_pool is not redis_pool.get_redis(url).connection_pool
+    assert list(redis_pool.pool_stats()) == [f"sync:{url}"]
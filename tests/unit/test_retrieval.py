@@ -0,0 +1,100 @@
+import pytest
+from shared.retrieval import (
+    ChunkIndex,
+    delete_index,
+    load_index,
+    save_index,
+    tokenize,
+)
+from shared.storage import StorageManager
+from shared.storage_backends import LocalFilesystemBackend
+
+from shared import retrieval
+
+DOCUMENTS = [
+    (
+        "earnings.pdf",
+        (
+            "# Revenue\n\nQuarterly revenue grew 12% on strong cloud demand.\n\n"
+            "# Margins\n\nOperating margins narrowed because of hiring costs.\n"
+        ),
+    ),
+    (
+        "outlook.pdf",
+        (
+            "# Guidance\n\nManagement expects revenue growth to slow next year.\n\n"
+            "# Risks\n\nSupply chain disruptions remain the main risk.\n"
+        ),
+    ),
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    # One chunk per section
+    monkeypatch.setattr(retrieval, "RETRIEVAL_CHUNK_TOKENS", 24)
+    return ChunkIndex.build(DOCUMENTS)
+
+
+def test_tokenize_drops_stopwords_and_keeps_numbers():
+    assert tokenize("The revenue grew 3.5% in Q3") == ["revenue", "grew", "3.5", "q3"]
+
+
+def test_build_chunks_documents_in_order(index):
+    assert [(chunk.source, chunk.position) for chunk in index.chunks] == [
+        ("earnings.pdf", 0),
+        ("earnings.pdf", 1),
+        ("outlook.pdf", 0),
+        ("outlook.pdf", 1),
+    ]
+
+
+def test_best_match_comes_first(index):
+    (best, score), *_ = index.search_scored("operating margins")
+
+    assert best.text.startswith("# Margins")
+    assert 0 < score <= 1
+
+
+def test_trigram_embeddings_match_inflections(index):
+    (best, _), *_ = index.search_scored("disrupted supplies")
+    assert best.text.startswith("# Risks")
+
+
+def test_search_is_limited_by_k_and_sources(index):
+    assert len(index.search("revenue", k=1)) == 1
+
+    matches = index.search("revenue", sources=["outlook.pdf"])
+    assert matches and {chunk.source for chunk in matches} == {"outlook.pdf"}
+
+
+def test_search_returns_document_order(index):
+    matches = index.search("revenue growth")
+    positions = [index.chunks.index(chunk) for chunk in matches]
+    assert positions == sorted(positions)
+
+
+def test_unmatched_query_finds_nothing(index):
+    assert index.search("") == []
+    assert ChunkIndex.build([]).search("revenue") == []
+
+
+def test_serialization_round_trip(index):
+    loaded = ChunkIndex.from_bytes(index.to_bytes())
+
+    assert loaded.chunks == index.chunks
+    assert loaded.scores("cloud demand") == pytest.approx(
+        index.scores("cloud demand"), abs=1e-3
+    )
+
+
+def test_persisted_index_is_cached_and_deleted(index, tmp_path, telemetry):
+    storage_manager = StorageManager(telemetry, LocalFilesystemBackend(str(tmp_path)))
+    save_index(storage_manager, "j1", index)
+
+    loaded = load_index(storage_manager, "j1")
+    assert loaded.chunks == index.chunks
+    assert load_index(storage_manager, "j1") is loaded
+
+    assert delete_index(storage_manager, "j1")
+    assert load_index(storage_manager, "j1") is None
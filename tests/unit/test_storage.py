@@ -0,0 +1,29 @@
+import pytest
+from shared.storage import _IterableReader
+
+CHUNKS = [b"abc", b"", b"defgh", b"i", b"jklmnop"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 4, 100])
+def test_reads_of_any_size_rejoin_the_chunks(size):
+    reader = _IterableReader(CHUNKS)
+    parts = iter(lambda: reader.read(size), b"")
+
+    assert b"".join(parts) == b"".join(CHUNKS)
+    assert reader.bytes_read == len(b"".join(CHUNKS))
+
+
+def test_read_all_returns_the_unread_remainder():
+    reader = _IterableReader(CHUNKS)
+
+    assert reader.read(4) == b"abcd"
+    assert reader.read() == b"efghijklmnop"
+    assert reader.read(1) == b""
+
+
+def test_readinto_fills_the_buffer():
+    reader = _IterableReader(CHUNKS)
+    buffer = bytearray(6)
+
+    assert reader.readinto(buffer) == 6
+    assert buffer == b"abcdef"
@@ -0,0 +1,95 @@
+import io
+import os
+
+import pytest
+from shared.storage_backends import LocalFilesystemBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalFilesystemBackend(str(tmp_path))
+
+
+def put(backend, name, content, metadata=None):
+    return backend.put(
+        name, io.BytesIO(content), len(content), "text/plain", metadata, 0
+    )
+
+
+def read(backend, name):
+    stored = backend.open(name)
+    try:
+        return stored.read()
+    finally:
+        stored.close()
+
+
+def test_put_open_and_stat_round_trip(backend):
+    etag = put(backend, "u/j/a.txt", b"hello", {"encoding": "gzip"})
+
+    stored = backend.open("u/j/a.txt")
+    assert stored.read() == b"hello"
+    assert stored.etag == etag
+    assert stored.metadata["x-amz-meta-encoding"] == "gzip"
+    stored.close()
+
+    info = backend.stat("u/j/a.txt")
+    assert (info.size, info.etag, info.content_type) == (5, etag, "text/plain")
+
+
+def test_unknown_length_stream(backend):
+    backend.put("u/j/a.txt", io.BytesIO(b"abc" * 10), -1, "text/plain", None, 0)
+    assert read(backend, "u/j/a.txt") == b"abc" * 10
+
+
+def test_short_stream_leaves_no_files(backend, tmp_path):
+    with pytest.raises(OSError):
+        backend.put("u/j/a.txt", io.BytesIO(b"abc"), 10, "text/plain", None, 0)
+
+    assert backend.open("u/j/a.txt") is None
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names]
+
+
+def test_replacing_an_object_keeps_data_and_sidecar_together(backend):
+    put(backend, "u/j/a.txt", b"first", {"version": "1"})
+    put(backend, "u/j/a.txt", b"second", {"version": "2"})
+
+    stored = backend.open("u/j/a.txt")
+    assert stored.read() == b"second"
+    assert stored.metadata["x-amz-meta-version"] == "2"
+    stored.close()
+
+
+def test_data_without_its_sidecar_reads_as_missing(backend):
+    put(backend, "u/j/a.txt", b"first")
+    sidecar_path = backend._path("u/j/a.txt", meta=True)
+    with open(sidecar_path, "rb") as f:
+        old_sidecar = f.read()
+    put(backend, "u/j/a.txt", b"second")
+
+    # A reader between the data and sidecar renames sees the old sidecar
+    with open(sidecar_path, "wb") as f:
+        f.write(old_sidecar)
+    assert backend.open("u/j/a.txt") is None
+    assert backend.stat("u/j/a.txt") is None
+    assert backend.local_path("u/j/a.txt") is None
+
+    os.remove(sidecar_path)
+    assert backend.open("u/j/a.txt") is None
+
+
+def test_list_and_remove(backend, tmp_path):
+    put(backend, "u/j1/a.txt", b"a")
+    put(backend, "u/j1/b.txt", b"bb")
+    put(backend, "u/j2/c.txt", b"c")
+
+    assert [info.name for info in backend.list("u/j1/")] == ["u/j1/a.txt", "u/j1/b.txt"]
+
+    assert backend.remove_many(["u/j1/a.txt", "u/j1/b.txt", "u/j1/missing"]) == []
+    assert [info.name for info in backend.list("u/")] == ["u/j2/c.txt"]
+    assert not os.path.exists(tmp_path / "u" / "j1")
+
+
+def test_names_outside_the_root_are_refused(backend):
+    with pytest.raises(ValueError):
+        backend.open("../outside")
@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import jinja2
+import pytest
+import structurer
+from structurer import split_turns, structure_in_chunks, turn_pattern
+
+TRANSCRIPT = (
+    "Intro music plays.\n"
+    "Alice: Welcome to the show. Today we look at quarterly results.\n"
+    "**Bob**: Thanks, Alice. Revenue grew twelve percent.\n"
+    "alice: That is strong growth.\n"
+    "Bob: Margins narrowed, though.\n"
+)
+
+
+def test_turn_pattern_matches_plain_bold_and_any_case():
+    names = [
+        match.group("name")
+        for match in turn_pattern(["Alice", "Bob"]).finditer(TRANSCRIPT)
+    ]
+    assert names == ["Alice", "Bob", "alice", "Bob"]
+
+
+@pytest.mark.parametrize("max_tokens", [1, 5, 20, 1000])
+def test_chunks_rejoin_to_the_transcript(max_tokens):
+    chunks = split_turns(TRANSCRIPT, ["Alice", "Bob"], max_tokens)
+    assert "".join(chunks) == TRANSCRIPT
+
+
+def test_chunks_hold_whole_turns():
+    chunks = split_turns(TRANSCRIPT, ["Alice", "Bob"], 20)
+
+    assert len(chunks) > 1
+    pattern = turn_pattern(["Alice", "Bob"])
+    assert all(pattern.match(chunk) for chunk in chunks[1:])
+
+
+def test_small_transcript_is_one_chunk():
+    assert split_turns(TRANSCRIPT, ["Alice", "Bob"], 1000) == [TRANSCRIPT]
+
+
+def test_transcript_without_turns_is_split_by_size():
+    text = "word " * 50
+    chunks = split_turns(text, ["Alice"], 10)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+
+
+class FakeLLM:
+    """Answers each chunk prompt with one entry per line, after scripted failures."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.model_configs = {"json": SimpleNamespace(name="json-model")}
+        self.calls = []
+
+    async def stream_async(self, model_key, messages, name, json_schema=None):
+        self.calls.append(name)
+        if self.failures:
+            self.failures -= 1
+            return {"scratchpad": "", "dialogue": []}
+        text = messages[0]["content"]
+        return {
+            "scratchpad": f"notes for {name}",
+            "dialogue": [
+                {"text": line, "speaker": "speaker-1"}
+                for line in text.splitlines()
+                if line.strip()
+            ],
+        }
+
+
+def structure(llm, monkeypatch, max_tokens=20):
+    monkeypatch.setattr(structurer, "FINAL_CONVERSATION_CHUNK_TOKENS", max_tokens)
+    return asyncio.run(
+        structure_in_chunks(
+            TRANSCRIPT,
+            ["Alice", "Bob"],
+            jinja2.Template("{{ text }}"),
+            {},
+            "create_final_conversation",
+            llm,
+            MagicMock(),
+            lambda text: text.strip(),
+        )
+    )
+
+
+def test_chunk_entries_are_concatenated_in_order(monkeypatch):
+    conversation = structure(FakeLLM(), monkeypatch)
+
+    assert "\n".join(entry.text for entry in conversation.dialogue) == (
+        TRANSCRIPT.strip()
+    )
+    assert conversation.scratchpad.startswith(
+        "notes for create_final_conversation_chunk_0"
+    )
+
+
+def test_invalid_chunk_response_is_retried(monkeypatch):
+    llm = FakeLLM(failures=1)
+    conversation = structure(llm, monkeypatch, max_tokens=1000)
+
+    assert llm.calls == ["create_final_conversation_chunk_0"] * 2
+    assert len(conversation.dialogue) == 5
+
+
+def test_chunk_failing_every_retry_raises(monkeypatch):
+    monkeypatch.setattr(structurer, "FINAL_CONVERSATION_CHUNK_RETRIES", 1)
+    with pytest.raises(RuntimeError, match="after 2 attempts"):
+        structure(FakeLLM(failures=2), monkeypatch, max_tokens=1000)
@@ -0,0 +1,132 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import fakeredis
+import pytest
+import redis
+from shared.summary_cache import SummaryCache, summary_key
+
+from shared import summary_cache as summary_cache_module
+
+
+@pytest.fixture
+def async_redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(summary_cache_module, "SUMMARY_CACHE_POLL_INTERVAL", 0.01)
+
+
+def generator(value, delay=0.0, error=None):
+    calls = []
+
+    async def create():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+
+    create.calls = calls
+    return create
+
+
+def test_summary_is_generated_once_then_reused(async_redis):
+    cache = SummaryCache(async_redis)
+    create = generator("summary")
+
+    async def main():
+        first = await cache.get_or_create("doc", "v1", "model", create)
+        second = await cache.get_or_create("doc", "v1", "model", create)
+        other_version = await cache.get_or_create("doc", "v2", "model", create)
+        return first, second, other_version
+
+    assert asyncio.run(main()) == (
+        ("summary", True),
+        ("summary", False),
+        ("summary", True),
+    )
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_concurrent_requests_share_one_call(async_redis):
+    cache = SummaryCache(async_redis)
+    create = generator("summary", delay=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_create("doc", "v1", "model", create) for _ in range(3))
+        )
+
+    assert asyncio.run(main()) == [
+        ("summary", True),
+        ("summary", False),
+        ("summary", False),
+    ]
+    assert create.calls == ["summary"]
+
+
+def test_waiter_takes_over_when_generation_fails(async_redis):
+    cache = SummaryCache(async_redis)
+    failing = generator("lost", delay=0.05, error=RuntimeError("LLM down"))
+    working = generator("summary")
+
+    async def main():
+        return await asyncio.gather(
+            cache.get_or_create("doc", "v1", "model", failing),
+            cache.get_or_create("doc", "v1", "model", working),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, RuntimeError)
+    assert second == ("summary", True)
+
+
+def test_waiter_takes_over_when_generator_is_cancelled(async_redis):
+    cache = SummaryCache(async_redis)
+
+    async def main():
+        generating = asyncio.create_task(
+            cache.get_or_create("doc", "v1", "model", generator("lost", delay=5))
+        )
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(
+            cache.get_or_create("doc", "v1", "model", generator("summary"))
+        )
+        await asyncio.sleep(0.01)
+        generating.cancel()
+        return await asyncio.wait_for(waiting, 5)
+
+    assert asyncio.run(main()) == ("summary", True)
+
+
+def test_replica_waits_for_the_lock_holder(async_redis):
+    holder, waiter = SummaryCache(async_redis), SummaryCache(async_redis)
+    create = generator("summary", delay=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            holder.get_or_create("doc", "v1", "model", create),
+            waiter.get_or_create("doc", "v1", "model", create),
+        )
+
+    assert asyncio.run(main()) == [("summary", True), ("summary", False)]
+    assert create.calls == ["summary"]
+
+    key = summary_key("doc", "v1", "model")
+    assert not asyncio.run(async_redis.exists(f"{key}:lock"))
+
+
+def test_redis_errors_fall_back_to_generating():
+    broken = AsyncMock()
+    broken.get.side_effect = redis.ConnectionError("down")
+    broken.set.side_effect = redis.ConnectionError("down")
+    cache = SummaryCache(broken)
+
+    result = asyncio.run(
+        cache.get_or_create("doc", "v1", "model", generator("summary"))
+    )
+    assert result == ("summary", True)
@@ -0,0 +1,55 @@
+import pytest
+from shared.tokens import estimate_tokens, split_markdown
+
+DOCUMENT = "\n".join(
+    f"# Section {s}\n\n"
+    + "\n\n".join(
+        f"Paragraph {s}.{p} " + "with several ordinary words " * 12 for p in range(4)
+    )
+    + "\n"
+    for s in range(5)
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("word") == 1
+    assert estimate_tokens("tokenizer") == 3
+    assert estimate_tokens("123456") == 2
+    assert estimate_tokens("Hi, there!") == 5
+
+
+def test_small_text_is_one_chunk():
+    assert split_markdown("# Title\n\nShort.", 100) == ["# Title\n\nShort."]
+
+
+@pytest.mark.parametrize("max_tokens", [5, 40, 100, 250, 1000])
+def test_chunks_rejoin_and_stay_within_the_limit(max_tokens):
+    chunks = split_markdown(DOCUMENT, max_tokens)
+
+    assert "".join(chunks) == DOCUMENT
+    assert all(estimate_tokens(chunk) <= max_tokens for chunk in chunks)
+
+
+def test_chunks_end_at_headings_when_sections_fit():
+    section_tokens = max(estimate_tokens(section) for section in DOCUMENT.split("\n# "))
+    chunks = split_markdown(DOCUMENT, section_tokens + 5)
+
+    assert len(chunks) > 1
+    assert all(chunk.startswith("# Section") for chunk in chunks)
+
+
+def test_long_paragraph_is_split_at_words():
+    text = "word " * 100
+    chunks = split_markdown(text, 10)
+
+    assert "".join(chunks) == text
+    assert all(chunk.startswith("word") for chunk in chunks)
+
+
+def test_single_long_word_is_cut():
+    text = "x" * 100
+    chunks = split_markdown(text, 5)
+
+    assert "".join(chunks) == text
+    assert all(estimate_tokens(chunk) <= 5 for chunk in chunks)
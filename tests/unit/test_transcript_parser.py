@@ -0,0 +1,142 @@
+import pytest
+import transcript_parser
+from transcript_parser import (
+    int_to_words,
+    normalize_text,
+    parse_transcript,
+    try_parse_transcript,
+    year_to_words,
+)
+
+SPEAKERS = ["Alice", "Bob"]
+
+
+@pytest.mark.parametrize(
+    "number, words",
+    [
+        (0, "zero"),
+        (15, "fifteen"),
+        (42, "forty two"),
+        (1500, "one thousand five hundred"),
+        (2_000_001, "two million one"),
+    ],
+)
+def test_int_to_words(number, words):
+    assert int_to_words(number) == words
+
+
+@pytest.mark.parametrize(
+    "year, words",
+    [
+        (1995, "nineteen ninety five"),
+        (2000, "two thousand"),
+        (2005, "two thousand five"),
+        (2024, "twenty twenty four"),
+    ],
+)
+def test_year_to_words(year, words):
+    assert year_to_words(year) == words
+
+
+@pytest.mark.parametrize(
+    "text, spoken",
+    [
+        ("$3.5M", "three point five million dollars"),
+        ("grew 12%", "grew twelve percent"),
+        ("the 3rd quarter", "the third quarter"),
+        ("the 1990s", "the nineteen nineties"),
+        ("2020-2024", "twenty twenty to twenty twenty four"),
+        ("since 1995", "since nineteen ninety five"),
+        ("We had 1500 people", "We had one thousand five hundred people"),
+    ],
+)
+def test_normalize_text(text, spoken):
+    assert normalize_text(text) == spoken
+
+
+@pytest.mark.parametrize(
+    "text, spoken",
+    [
+        ("Q3 2024", "Q three twenty twenty four"),
+        ("in Q3 2024", "in Q three twenty twenty four"),
+        ("H1 2023", "H one twenty twenty three"),
+        ("March 15, 2024", "March fifteen, twenty twenty four"),
+    ],
+)
+def test_years_after_period_tokens(text, spoken):
+    assert normalize_text(text) == spoken
+
+
+@pytest.mark.parametrize(
+    "text, spoken",
+    [
+        ("at 3:30.", "at three thirty."),
+        ("at 9:05 am", "at nine oh five AM"),
+        ("at 3:00 PM", "at three PM"),
+        ("at 14:00", "at fourteen o'clock"),
+        ("We meet at 3:30 pm.", "We meet at three thirty PM."),
+        ("at 3:30 p.m. Then", "at three thirty PM. Then"),
+        ("at 9:05 a.m., then", "at nine oh five AM, then"),
+    ],
+)
+def test_clock_times(text, spoken):
+    assert normalize_text(text) == spoken
+
+
+def test_turns_are_attributed_and_normalized():
+    parsed = parse_transcript(
+        "# Episode 1\n\n"
+        "**Alice**: Revenue grew 12% in Q3 2024.\n"
+        "Bob: We meet again at 3:30.\n"
+        "It went on.\n",
+        SPEAKERS,
+    )
+
+    assert [(e.speaker, e.text) for e in parsed.conversation.dialogue] == [
+        ("speaker-1", "Revenue grew twelve percent in Q three twenty twenty four."),
+        ("speaker-2", "We meet again at three thirty. It went on."),
+    ]
+    assert parsed.confidence == 1.0
+
+
+def test_unknown_speakers_lower_the_confidence():
+    parsed = parse_transcript(
+        "Alice: Hello there.\nCarol: I should not be here at all.\nBob: Hi.\n",
+        SPEAKERS,
+    )
+
+    assert [e.speaker for e in parsed.conversation.dialogue] == [
+        "speaker-1",
+        "speaker-2",
+    ]
+    assert parsed.confidence < 1.0
+
+
+@pytest.mark.parametrize("text", ["A ratio of 3:1.", "About 3/4 of it."])
+def test_unhandled_digit_punctuation_lowers_the_confidence(text):
+    parsed = parse_transcript(f"Alice: {text}\nBob: Right.\n", SPEAKERS)
+    assert parsed.confidence < 1.0
+
+
+def test_single_speaker_paragraphs_become_entries():
+    parsed = parse_transcript(
+        "Alice: Welcome to the update.\n\nMargins narrowed.\nCosts rose.\n",
+        ["Alice"],
+    )
+
+    assert [(e.speaker, e.text) for e in parsed.conversation.dialogue] == [
+        ("speaker-1", "Welcome to the update."),
+        ("speaker-1", "Margins narrowed. Costs rose."),
+    ]
+
+
+def test_try_parse_falls_back_below_the_threshold(monkeypatch):
+    text = "Alice: About 3/4 of it.\nBob: Right.\n"
+    assert try_parse_transcript(text, SPEAKERS) is None
+
+    monkeypatch.setattr(transcript_parser, "TRANSCRIPT_PARSER_MIN_CONFIDENCE", 0.0)
+    assert try_parse_transcript(text, SPEAKERS) is not None
+
+
+def test_try_parse_rejects_text_without_turns():
+    assert try_parse_transcript("Just some prose.", SPEAKERS) is None